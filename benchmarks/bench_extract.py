@@ -0,0 +1,95 @@
+"""
+Compare serial and parallel extraction of multi-executable archives.
+
+Builds synthetic release ZIPs with several deflated `.exe` members and times
+`extract_zip.extract_zip_file` with 1 worker and with N workers.
+
+Usage:
+    python benchmarks/bench_extract.py [--members 6] [--size-mib 32] [--workers 4]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+if sys.platform != "win32":
+    os.environ.setdefault("LOCALAPPDATA", tempfile.gettempdir())
+
+import ayushman.extract_zip as extract_zip  # noqa: E402
+from ayushman.result import InstallResult  # noqa: E402
+
+
+def build_archive(path: Path, members: int, size: int) -> None:
+    """Write a ZIP with `members` pseudo-binaries of `size` bytes each."""
+    # Half random, half zeros, repeating beyond deflate's 32 KiB window so the
+    # members compress about as well as real executables
+    block = b"".join(os.urandom(512) + bytes(512) for _ in range(1024))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(members):
+            with zf.open(f"bin/tool_{i}.exe", "w") as member:
+                written = 0
+                while written < size:
+                    chunk = block[: size - written]
+                    member.write(chunk)
+                    written += len(chunk)
+
+
+def time_extraction(
+    archive: Path, root: Path, workers: int, repeat: int
+) -> list[float]:
+    timings = []
+    for run in range(repeat):
+        extract_zip.global_paths.PACKAGE_DIR = root / f"packages-{workers}-{run}"
+        extract_zip.global_paths.BIN_DIR = root / f"bin-{workers}-{run}"
+        # A fresh store each run, or later runs would only link stored files
+        extract_zip.global_paths.OBJECTS_DIR = root / f"objects-{workers}-{run}"
+        install_result = InstallResult(
+            package_name="bench",
+            version="1.0.0",
+            zip_file_name=str(archive),
+            install_path="",
+            success=False,
+            error_message=None,
+            metadata={},
+            metadata_path="",
+        )
+        start = time.perf_counter()
+        outcome = extract_zip.extract_zip_file(install_result, workers=workers)
+        timings.append(time.perf_counter() - start)
+        if not outcome.success:
+            raise SystemExit(f"extraction failed: {outcome.error_message}")
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--members", type=int, default=6)
+    parser.add_argument("--size-mib", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        archive = root / "bench.zip"
+        build_archive(archive, args.members, args.size_mib * 1024 * 1024)
+        print(
+            f"{args.members} members x {args.size_mib} MiB, "
+            f"archive {archive.stat().st_size / 2**20:.1f} MiB"
+        )
+
+        for workers in (1, args.workers):
+            timings = time_extraction(archive, root, workers, args.repeat)
+            print(
+                f"workers={workers:<3} median {statistics.median(timings):.3f}s "
+                f"(min {min(timings):.3f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Measure registry lookup and update latency as the number of packages grows.
+
+Fills a registry with N packages (two versions each) and times, per call:
+    - lookup:  `registry.get_installed_version` of a random package
+    - json:    `registry.add_package` of a new version of a random package
+               with the default backend, including the rewrite and fsync of
+               the whole metadata file, so it grows with N
+    - journal: the same with AYUSHMAN_REGISTRY_BACKEND=journal, one appended
+               and fsynced line (compaction disabled)
+    - sqlite:  the same with AYUSHMAN_REGISTRY_BACKEND=sqlite, one committed
+               transaction
+
+Usage:
+    python benchmarks/bench_registry.py [--sizes 10 100 1000 10000] [--calls 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+if sys.platform != "win32":
+    os.environ.setdefault("LOCALAPPDATA", tempfile.gettempdir())
+
+import ayushman.registry as registry  # noqa: E402
+from ayushman.result import InstallResult  # noqa: E402
+
+
+def fill(path: Path, packages: int) -> list[str]:
+    """Write a registry with `packages` packages and return their names."""
+    names = [f"pkg-{i:05d}" for i in range(packages)]
+    record = {
+        "install_path": "C:\\packages\\pkg\\1.0.0",
+        "zip_file_name": "pkg.zip",
+        "metadata_path": "C:\\packages\\pkg\\1.0.0\\metadata.json",
+        "asset_url": "https://github.com/owner/pkg/releases/download/v1/pkg.zip",
+        "asset_size": 1048576,
+        "sha256": "0" * 64,
+    }
+    registry.Registry(path).save(
+        {
+            "schema_version": registry.SCHEMA_VERSION,
+            "packages": {
+                name: {"versions": {"1.0.0": dict(record), "2.0.0": dict(record)}}
+                for name in names
+            },
+        }
+    )
+    return names
+
+
+def per_call(func, calls: int) -> float:
+    """Return the median of `calls` timings of `func()`, in microseconds."""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def add(name: str) -> None:
+    """Record version 3.0.0 of `name` as an install would."""
+    registry.add_package(
+        InstallResult(
+            package_name=name,
+            version="3.0.0",
+            zip_file_name="pkg.zip",
+            install_path="C:\\packages\\pkg\\3.0.0",
+            success=True,
+            error_message=None,
+            metadata={},
+            metadata_path="C:\\packages\\pkg\\3.0.0\\metadata.json",
+        )
+    )
+
+
+def measure(path: Path, size: int, calls: int, rng: random.Random) -> tuple:
+    """Return (lookup, json, journal, sqlite) latencies for `size` packages."""
+    registry.REGISTRY_PATH = path
+    names = fill(path, size)
+    os.environ[registry.BACKEND_ENV] = registry.JSON_BACKEND
+    registry.get_installed_version(names[0])  # parse once
+
+    lookup = per_call(lambda: registry.get_installed_version(rng.choice(names)), calls)
+    json_add = per_call(lambda: add(rng.choice(names)), max(1, calls // 100))
+
+    os.environ[registry.BACKEND_ENV] = registry.JOURNAL_BACKEND
+    journal_add = per_call(lambda: add(rng.choice(names)), max(1, calls // 10))
+
+    os.environ[registry.BACKEND_ENV] = registry.SQLITE_BACKEND
+    registry.get_installed_version(names[0])  # import the JSON file once
+    sqlite_add = per_call(lambda: add(rng.choice(names)), max(1, calls // 10))
+    return lookup, json_add, journal_add, sqlite_add
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000]
+    )
+    parser.add_argument("--calls", type=int, default=2_000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    os.environ[registry.COMPACT_ENTRIES_ENV] = str(10**9)
+
+    print(
+        f"{'packages':>9}  {'lookup':>10}  {'json':>10}  {'journal':>10}"
+        f"  {'sqlite':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            # The SQLite database lives next to the JSON file, so one
+            # directory per size
+            path = Path(tmp) / str(size) / "metadata.json"
+            path.parent.mkdir()
+            timings = measure(path, size, args.calls, rng)
+            print(f"{size:>9}" + "".join(f"  {t:>8.1f}us" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,137 +6,350 @@ package manager that installs prebuilt executables from
 github.com/journeycodesayush repositories.
 
 Available commands:
-    - install <pkg>: Downloads and installs a package
+    - install <pkg>...: Downloads and installs one or more packages
     - list: Lists all installed packages
     - uninstall <pkg>: Uninstalls a package
-    - upgrade <pkg>: Upgrades a package to the latest version
+    - upgrade <pkg>... | --all: Upgrades packages to the latest version
+    - outdated: Lists installed packages with a newer release
+    - use <pkg>@<version>: Switches to an installed version
+    - rollback <pkg>: Switches back to the previously active version
+    - lock [-o <file>]: Writes the installed releases to a lockfile
+    - sync [<file>]: Installs exactly the releases pinned in a lockfile
     - info <pkg>: Shows metadata for a package
+    - cache list|prune|clear: Manages cached downloads
+    - gc: Removes stored executables no installed version uses
 
 Each command delegates functionality to appropriate modules, ensuring
 installations are upgrade-safe, paths are updated, and metadata is tracked.
 """
 
 import argparse
-import os
 import shutil
 import sys
 from importlib.metadata import version
-from pathlib import Path
 
 import ayushman.colors as colors
-import ayushman.extract_zip as extract_zip
+import ayushman.download_cache as download_cache
 import ayushman.global_paths as global_paths
+import ayushman.install as install
+import ayushman.link as link
+import ayushman.lockfile as lockfile
+import ayushman.object_store as object_store
 import ayushman.path as path
 import ayushman.registry as registry
 import ayushman.registry_supported as registry_supported
+import ayushman.release_cache as release_cache
 import ayushman.request_url as request_url
 import ayushman.result as result
+import ayushman.switch as switch
 import ayushman.uninstall as uninstall
-import ayushman.validator as validator
+import ayushman.utils as utils
 
 
-def handle_install(package_name: str) -> None:
+def _report_install(result_obj: result.InstallResult) -> None:
     """
-    Install or upgrade a package.
+    Print the outcome of installing a single package.
 
     Args:
-        package_name (str): Name of the package to install or upgrade.
-
-    Behavior:
-        - Validates the package exists in the trusted repository.
-        - Downloads the latest release ZIP.
-        - Skips installation if the latest version is already installed.
-        - Extracts `.exe` files to versioned package folder and creates hard links.
-        - Updates global metadata.
-        - Cleans up the downloaded ZIP file.
-
-    Raises:
-        None
+        result_obj (InstallResult): The finished installation result.
     """
 
-    if not validator.validate_package(package_name):
-        print(
-            colors.Color.BOLD
-            + colors.Color.RED
-            + f"{package_name} not found in github.com/journeycodesayush"
-            + colors.Color.RESET
-        )
-        return
-
-    result_obj: result.InstallResult = request_url.download_zip(
-        str(package_name).lower()
-    )
     if not result_obj.success:
         print(
             colors.Color.RED
             + colors.Color.BOLD
-            + f"Download failed: {result_obj.error_message}"
+            + f"Failed to install {result_obj.package_name}: {result_obj.error_message}"
             + colors.Color.RESET
         )
+        return
 
-    if result_obj.remote_sha256 is None:
+    if result_obj.up_to_date:
         print(
             colors.Color.YELLOW
-            + "No remote hash available, skipping verification."
+            + f"{result_obj.package_name} is already up to date."
             + colors.Color.RESET
         )
-    elif result_obj.hash_verified:
-        print(colors.Color.GREEN + "Hashes match." + colors.Color.RESET)
-    else:
-        if Path(result_obj.zip_file_name).exists():
-            os.remove(result_obj.zip_file_name)
         return
 
-    installed_version: str | None = registry.get_installed_version(
-        str(package_name).lower()
-    )
-
-    if installed_version is not None and installed_version == result_obj.version:
+    if result_obj.from_cache:
         print(
-            colors.Color.YELLOW
-            + f"{package_name} is already up to date."
+            colors.Color.GREEN
+            + f"Using cached download for {result_obj.package_name}."
             + colors.Color.RESET
         )
-        if Path(result_obj.zip_file_name).exists():
-            os.remove(result_obj.zip_file_name)
-            return
-
-    if installed_version:
+    elif result_obj.partial_fetch:
         print(
-            colors.Color.YELLOW
-            + f"Upgrading {package_name} from {installed_version} → {result_obj.version}"
+            colors.Color.GREEN
+            + f"Fetched only the executables of {result_obj.package_name}; CRC32 checks passed."
             + colors.Color.RESET
         )
-    else:
+    elif result_obj.remote_sha256 is None:
         print(
             colors.Color.YELLOW
-            + f"Installing {package_name} {result_obj.version}"
+            + f"No remote hash available for {result_obj.package_name}, skipping verification."
             + colors.Color.RESET
         )
+    else:
+        print(colors.Color.GREEN + "Hashes match." + colors.Color.RESET)
 
-    result_obj = extract_zip.extract_zip_file(install_result=result_obj)
-
-    if result_obj.success:
+    if result_obj.previous_version:
         print(
             colors.Color.GREEN
-            + f"Installed {result_obj.package_name} {result_obj.version} to {result_obj.install_path}"
+            + f"Upgraded {result_obj.package_name} from {result_obj.previous_version} → {result_obj.version}"
             + colors.Color.RESET
         )
+    if result_obj.reused_files:
         print(
             colors.Color.GREEN
-            + f"Executable available as: {result_obj.package_name}.exe in ~/.ayushman/bin"
+            + f"Reused {len(result_obj.reused_files)} executable(s) already on disk."
             + colors.Color.RESET
         )
-        registry.add_package(result_obj)
-    else:
+    print(
+        colors.Color.GREEN
+        + f"Installed {result_obj.package_name} {result_obj.version} to {result_obj.install_path}"
+        + colors.Color.RESET
+    )
+    print(
+        colors.Color.GREEN
+        + f"Executable available as: {result_obj.package_name}.exe in ~/.ayushman/bin"
+        + colors.Color.RESET
+    )
+    if result_obj.link_strategy not in (None, link.HARDLINK):
         print(
-            colors.Color.RED
-            + colors.Color.BOLD
-            + f"Extraction failed: {result_obj.error_message}"
+            colors.Color.YELLOW
+            + f"Hard links are not possible in ~/.ayushman/bin; the executable was copied ({result_obj.link_strategy})."
             + colors.Color.RESET
         )
-    if Path(result_obj.zip_file_name).exists():
-        os.remove(result_obj.zip_file_name)
+
+
+def _print_install_summary(results: list[result.InstallResult]) -> None:
+    """
+    Print one summary line per package after a multi-package operation.
+
+    Args:
+        results (list[InstallResult]): Results in the order packages were given.
+    """
+
+    print(colors.Color.YELLOW + "\nSummary:\n" + colors.Color.RESET)
+    max_len = max(len(r.package_name) for r in results)
+    for r in results:
+        if not r.success:
+            status = colors.Color.RED + "failed" + colors.Color.RESET
+        elif r.up_to_date:
+            status = colors.Color.YELLOW + "up to date" + colors.Color.RESET
+        elif r.previous_version:
+            status = colors.Color.GREEN + "upgraded" + colors.Color.RESET
+        else:
+            status = colors.Color.GREEN + "installed" + colors.Color.RESET
+        print(f"  {r.package_name:<{max_len}}  {r.version or '-':<12}  {status}")
+
+
+def _report_api_budget(package_names: list[str]) -> None:
+    """
+    Print how many GitHub API requests a bulk operation needs.
+
+    Args:
+        package_names (list[str]): Packages about to be resolved.
+
+    Behavior:
+        - Releases still fresh in the release cache are not counted.
+        - Warns when the remaining budget is smaller than what is needed;
+          the remaining requests then wait for the limit to reset.
+    """
+
+    needed = request_url.api_requests_needed(package_names)
+    if needed == 0:
+        return
+
+    budget = request_url.fetch_rate_limit()
+    if budget is None:
+        print(f"Needs up to {needed} GitHub API requests.")
+        return
+
+    print(
+        f"Needs up to {needed} GitHub API requests; "
+        f"{budget.remaining} of {budget.limit} left "
+        f"(resets at {budget.reset_time()})."
+    )
+    if needed > budget.remaining:
+        print(
+            colors.Color.YELLOW
+            + "Not enough API budget left: some packages will wait for the "
+            "rate limit to reset." + colors.Color.RESET
+        )
+
+
+def handle_install(
+    package_names: list[str],
+    jobs: int = install.DEFAULT_JOBS,
+    segments: int = 1,
+    exe_only: bool = False,
+) -> list[result.InstallResult]:
+    """
+    Install or upgrade one or more packages.
+
+    Args:
+        package_names (list[str]): Names of the packages to install or upgrade.
+        jobs (int): Maximum number of packages installed at the same time.
+        segments (int): Connections to use per large download.
+        exe_only (bool): Fetch only the `.exe` members of each release ZIP.
+
+    Returns:
+        list[InstallResult]: One result per unique package.
+
+    Behavior:
+        - For several packages, first reports how many GitHub API requests
+          are needed and how much of the rate limit is left.
+        - Runs the install pipeline for every package on a worker pool.
+        - Prints each package's outcome as soon as it finishes.
+        - Prints a final summary when more than one package was requested.
+
+    Raises:
+        None
+    """
+
+    if len(package_names) > 1:
+        _report_api_budget(package_names)
+
+    results = install.install_packages(
+        package_names,
+        jobs=jobs,
+        on_result=_report_install,
+        segments=segments,
+        exe_only=exe_only,
+    )
+    if len(results) > 1:
+        _print_install_summary(results)
+    return results
+
+
+def _print_outdated(results: list[result.InstallResult]) -> None:
+    """
+    Print installed versus latest version of every checked package.
+
+    Args:
+        results (list[InstallResult]): Results from `install.check_updates`.
+    """
+
+    rows = [
+        (
+            r.package_name,
+            r.previous_version or "-",
+            r.version if r.success else "-",
+            r,
+        )
+        for r in results
+    ]
+    name_len = max(len("Package"), *(len(row[0]) for row in rows))
+    installed_len = max(len("Installed"), *(len(row[1]) for row in rows))
+    latest_len = max(len("Latest"), *(len(row[2]) for row in rows))
+
+    print(
+        colors.Color.BOLD
+        + f"  {'Package':<{name_len}}  {'Installed':<{installed_len}}  "
+        + f"{'Latest':<{latest_len}}"
+        + colors.Color.RESET
+    )
+    for name, installed, latest, r in rows:
+        if not r.success:
+            status = (
+                colors.Color.RED + f"failed: {r.error_message}" + colors.Color.RESET
+            )
+        elif r.up_to_date:
+            status = colors.Color.GREEN + "up to date" + colors.Color.RESET
+        else:
+            status = colors.Color.YELLOW + "outdated" + colors.Color.RESET
+        print(
+            f"  {name:<{name_len}}  {installed:<{installed_len}}  "
+            f"{latest:<{latest_len}}  {status}"
+        )
+
+
+def _check_updates(jobs: int) -> list[result.InstallResult]:
+    """
+    Look up the latest release of every installed package.
+
+    Args:
+        jobs (int): Maximum number of lookups in flight at the same time.
+
+    Returns:
+        list[InstallResult]: Results from `install.check_updates`.
+    """
+
+    names = [pkg["name"] for pkg in registry.get_active_packages()]
+    if len(names) > 1:
+        _report_api_budget(names)
+    return install.check_updates(jobs=jobs)
+
+
+def handle_outdated(jobs: int = install.DEFAULT_JOBS) -> list[result.InstallResult]:
+    """
+    Show which installed packages have a newer release.
+
+    Args:
+        jobs (int): Maximum number of lookups in flight at the same time.
+
+    Returns:
+        list[InstallResult]: The resolved latest release of every installed
+        package.
+
+    Behavior:
+        Queries all packages at once; nothing is downloaded.
+    """
+
+    results = _check_updates(jobs)
+    if not results:
+        print(colors.Color.YELLOW + "No packages installed." + colors.Color.RESET)
+        return results
+    _print_outdated(results)
+    stale = sum(1 for r in results if r.success and not r.up_to_date)
+    print(
+        colors.Color.GREEN
+        + f"{stale} of {len(results)} packages can be upgraded."
+        + colors.Color.RESET
+    )
+    return results
+
+
+def handle_upgrade_all(
+    jobs: int = install.DEFAULT_JOBS, segments: int = 1, exe_only: bool = False
+) -> list[result.InstallResult]:
+    """
+    Upgrade every installed package that has a newer release.
+
+    Args:
+        jobs (int): Maximum number of packages processed at the same time.
+        segments (int): Connections to use per large download.
+        exe_only (bool): Fetch only the `.exe` members of each release ZIP.
+
+    Returns:
+        list[InstallResult]: One result per package that was upgraded.
+
+    Behavior:
+        - Checks all packages at once, as `outdated` does.
+        - Downloads only the stale packages, in parallel, reusing the
+          releases that were just resolved.
+    """
+
+    checked = _check_updates(jobs)
+    for r in checked:
+        if not r.success:
+            _report_install(r)
+    stale = [r for r in checked if r.success and not r.up_to_date]
+    if not stale:
+        print(colors.Color.GREEN + "All packages are up to date." + colors.Color.RESET)
+        return []
+
+    results = install.install_releases(
+        stale,
+        jobs=jobs,
+        on_result=_report_install,
+        segments=segments,
+        exe_only=exe_only,
+    )
+    if len(results) > 1:
+        _print_install_summary(results)
+    return results
 
 
 def handle_list() -> None:
@@ -202,6 +415,12 @@ def handle_uninstall(package_name: str) -> None:
             + f"Uninstalled {result_obj_uninstall.package_name}"
             + colors.Color.RESET
         )
+        if result_obj_uninstall.freed_bytes:
+            print(
+                colors.Color.GREEN
+                + f"Freed {utils.format_size(result_obj_uninstall.freed_bytes)} of stored executables."
+                + colors.Color.RESET
+            )
     else:
         print(
             colors.Color.RED
@@ -211,35 +430,183 @@ def handle_uninstall(package_name: str) -> None:
         )
 
 
-def handle_upgrade(package_name: str) -> None:
+def handle_upgrade(
+    package_names: list[str],
+    jobs: int = install.DEFAULT_JOBS,
+    segments: int = 1,
+    exe_only: bool = False,
+) -> list[result.InstallResult]:
     """
-    Upgrade a package to the latest version.
+    Upgrade one or more packages to the latest version.
 
     Args:
-        package_name (str): Name of the package to upgrade.
-
-    Behavior:
-        - Checks if the package is installed.
-        - Calls handle_install to download and install the latest version.
-        - Prints a message if the package does not exist.
+        package_names (list[str]): Names of the packages to upgrade.
+        jobs (int): Maximum number of packages upgraded at the same time.
+        segments (int): Connections to use per large download.
+        exe_only (bool): Fetch only the `.exe` members of each release ZIP.
 
     Returns:
-        None
+        list[InstallResult]: One result per installed package that was upgraded.
+
+    Behavior:
+        - Checks which packages are installed with a single registry read.
+        - Calls handle_install with the installed packages.
+        - Prints a message for every package that does not exist.
 
     Raises:
         None
     """
 
-    package_installed = registry.is_package_installed(package_name)
-    if package_installed:
-        handle_install(package_name)
-    else:
+    installed: list[str] = []
+    for package_name, entry in registry.get_many(package_names).items():
+        if entry:
+            installed.append(package_name)
+        else:
+            print(
+                colors.Color.BOLD
+                + colors.Color.RED
+                + f"{package_name} does not exist."
+                + colors.Color.RESET
+            )
+    if not installed:
+        return []
+    return handle_install(installed, jobs=jobs, segments=segments, exe_only=exe_only)
+
+
+def _report_switch(result_obj: result.InstallResult) -> None:
+    """
+    Print the outcome of switching a package to another installed version.
+
+    Args:
+        result_obj (InstallResult): Result from switch.use_version or
+            switch.rollback.
+    """
+
+    if not result_obj.success:
         print(
-            colors.Color.BOLD
-            + colors.Color.RED
-            + f"{package_name} does not exist."
+            colors.Color.RED
+            + colors.Color.BOLD
+            + f"Could not switch {result_obj.package_name}: {result_obj.error_message}"
             + colors.Color.RESET
         )
+        return
+
+    if result_obj.up_to_date:
+        print(
+            colors.Color.YELLOW
+            + f"{result_obj.package_name} {result_obj.version} is already active."
+            + colors.Color.RESET
+        )
+        return
+
+    print(
+        colors.Color.GREEN
+        + f"Switched {result_obj.package_name} from {result_obj.previous_version or '-'} → {result_obj.version}"
+        + colors.Color.RESET
+    )
+    if result_obj.link_strategy not in (None, link.HARDLINK):
+        print(
+            colors.Color.YELLOW
+            + f"Hard links are not possible in ~/.ayushman/bin; the executable was copied ({result_obj.link_strategy})."
+            + colors.Color.RESET
+        )
+
+
+def handle_use(spec: str) -> None:
+    """
+    Switch a package to one of its installed versions.
+
+    Args:
+        spec (str): "<pkg>@<version>".
+
+    Behavior:
+        Relinks the bin entry and updates the registry; nothing is
+        downloaded or extracted.
+    """
+
+    package_name, version = utils.split_spec(spec)
+    if version is None:
+        print(
+            colors.Color.RED
+            + f"Specify a version, e.g. {package_name}@1.0.0"
+            + colors.Color.RESET
+        )
+        return
+    _report_switch(switch.use_version(package_name, version))
+
+
+def handle_rollback(package_name: str) -> None:
+    """
+    Switch a package back to the version that was active before.
+
+    Args:
+        package_name (str): Name of the package.
+    """
+
+    _report_switch(switch.rollback(package_name))
+
+
+def handle_lock(output: str = lockfile.DEFAULT_LOCKFILE) -> None:
+    """
+    Write the active release of every installed package to a lockfile.
+
+    Args:
+        output (str): Lockfile to write.
+
+    Behavior:
+        Packages that cannot be pinned (e.g. no published sha256) are
+        reported and left out of the lockfile.
+    """
+
+    locked, unresolved = lockfile.lock_installed()
+    for package_name, reason in unresolved.items():
+        print(
+            colors.Color.YELLOW
+            + f"Not locking {package_name}: {reason}"
+            + colors.Color.RESET
+        )
+    lockfile.write_lockfile(output, locked)
+    print(
+        colors.Color.GREEN
+        + f"Locked {len(locked)} packages to {output}"
+        + colors.Color.RESET
+    )
+
+
+def handle_sync(
+    lock_path: str = lockfile.DEFAULT_LOCKFILE,
+    jobs: int = install.DEFAULT_JOBS,
+    segments: int = 1,
+) -> list[result.InstallResult]:
+    """
+    Install the releases pinned in a lockfile.
+
+    Args:
+        lock_path (str): Lockfile to read.
+        jobs (int): Maximum number of packages installed at the same time.
+        segments (int): Connections to use per large download.
+
+    Returns:
+        list[InstallResult]: One result per locked package; empty if the
+        lockfile could not be read.
+
+    Behavior:
+        - Makes no GitHub API request; every download is verified against
+          the locked sha256.
+        - Prints each package's outcome as soon as it finishes, and a
+          summary when more than one package is locked.
+    """
+
+    try:
+        results = lockfile.sync(
+            lock_path, jobs=jobs, on_result=_report_install, segments=segments
+        )
+    except lockfile.LockfileError as e:
+        print(colors.Color.RED + colors.Color.BOLD + str(e) + colors.Color.RESET)
+        return []
+    if len(results) > 1:
+        _print_install_summary(results)
+    return results
 
 
 def handle_info(package_name: str) -> None:
@@ -275,6 +642,79 @@ def handle_info(package_name: str) -> None:
         print(colors.Color.GREEN + f"{key}:" + colors.Color.RESET + f" {value}")
 
 
+def handle_cache_list() -> None:
+    """
+    List cached downloads, most recently used first.
+
+    Prints each entry's short digest, size and file name, followed by the
+    total size and the configured budget.
+    """
+
+    entries = download_cache.list_entries()
+    for entry in entries:
+        print(
+            colors.Color.GREEN
+            + f"  {entry.sha256[:12]}"
+            + colors.Color.RESET
+            + f"  {utils.format_size(entry.size):>10}  {entry.path.name}"
+        )
+    total = sum(e.size for e in entries)
+    print(
+        colors.Color.GREEN
+        + f"{len(entries)} cached downloads, {utils.format_size(total)}"
+        + f" of {utils.format_size(download_cache.get_max_bytes())} budget."
+        + colors.Color.RESET
+    )
+
+
+def handle_cache_prune(max_bytes: int | None = None) -> None:
+    """
+    Evict least recently used downloads until the cache fits its budget.
+
+    Args:
+        max_bytes (int | None): Budget to prune to. Defaults to the
+            configured budget.
+    """
+
+    removed = download_cache.prune(max_bytes=max_bytes)
+    freed = sum(e.size for e in removed)
+    print(
+        colors.Color.GREEN
+        + f"Removed {len(removed)} cached downloads, freed {utils.format_size(freed)}."
+        + colors.Color.RESET
+    )
+
+
+def handle_cache_clear() -> None:
+    """
+    Remove every cached download that no running install is using, and all
+    cached release metadata.
+    """
+
+    removed = download_cache.clear()
+    release_cache.clear()
+    freed = sum(e.size for e in removed)
+    print(
+        colors.Color.GREEN
+        + f"Removed {len(removed)} cached downloads, freed {utils.format_size(freed)}."
+        + colors.Color.RESET
+    )
+
+
+def handle_gc() -> None:
+    """
+    Remove stored executables that no installed version links to.
+    """
+
+    removed = object_store.collect()
+    freed = sum(obj.size for obj in removed)
+    print(
+        colors.Color.GREEN
+        + f"Removed {len(removed)} unused executables, freed {utils.format_size(freed)}."
+        + colors.Color.RESET
+    )
+
+
 def handle_purge(force: bool = False, dry_run: bool = False) -> None:
     root = global_paths.AYUSHMAN_DIR
     if not root.exists():
@@ -304,6 +744,7 @@ def handle_purge(force: bool = False, dry_run: bool = False) -> None:
         print("  - all installed packages")
         print("  - all metadata")
         print("  - all binaries")
+        print("  - all cached downloads")
         print(colors.Color.GREEN + "\nNo changes were made." + colors.Color.RESET)
         return
 
@@ -350,6 +791,29 @@ This action CANNOT be undone.
         )
 
 
+def _positive_int(value: str) -> int:
+    """
+    argparse type for options that require an integer of at least 1.
+
+    Args:
+        value (str): Raw command-line value.
+
+    Returns:
+        int: The parsed value.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive integer.
+    """
+
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """
     Entry point for the ayushman CLI.
@@ -383,8 +847,28 @@ def main():
             version=f"ayushman v{version('ayushman')}",
         )
         subparsers = parser.add_subparsers(dest="command", required=True)
-        install_parser = subparsers.add_parser("install", help="Install a package")
-        install_parser.add_argument("pkg", help="Package to install")
+        install_parser = subparsers.add_parser(
+            "install", help="Install one or more packages"
+        )
+        install_parser.add_argument("pkg", nargs="+", help="Packages to install")
+        install_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=_positive_int,
+            default=install.DEFAULT_JOBS,
+            help=f"Number of packages to install in parallel (default: {install.DEFAULT_JOBS})",
+        )
+        install_parser.add_argument(
+            "--segments",
+            type=_positive_int,
+            default=1,
+            help="Download assets larger than 32 MiB over this many connections (default: 1)",
+        )
+        install_parser.add_argument(
+            "--exe-only",
+            action="store_true",
+            help="Fetch only the .exe files of the release ZIP (checked by CRC32 instead of sha256)",
+        )
 
         subparsers.add_parser("list", help="List all the installed packages")
 
@@ -397,12 +881,111 @@ def main():
         )
         uninstall_parser.add_argument("pkg", help="Package to uninstall")
 
-        upgrade_parser = subparsers.add_parser("upgrade", help="Upgrade a package")
-        upgrade_parser.add_argument("pkg", help="Package to upgrade")
+        upgrade_parser = subparsers.add_parser(
+            "upgrade", help="Upgrade one or more packages"
+        )
+        upgrade_parser.add_argument("pkg", nargs="*", help="Packages to upgrade")
+        upgrade_parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Upgrade every installed package that has a newer release",
+        )
+        upgrade_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=_positive_int,
+            default=install.DEFAULT_JOBS,
+            help=f"Number of packages to upgrade in parallel (default: {install.DEFAULT_JOBS})",
+        )
+        upgrade_parser.add_argument(
+            "--segments",
+            type=_positive_int,
+            default=1,
+            help="Download assets larger than 32 MiB over this many connections (default: 1)",
+        )
+        upgrade_parser.add_argument(
+            "--exe-only",
+            action="store_true",
+            help="Fetch only the .exe files of the release ZIP (checked by CRC32 instead of sha256)",
+        )
+
+        outdated_parser = subparsers.add_parser(
+            "outdated", help="List installed packages that have a newer release"
+        )
+        outdated_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=_positive_int,
+            default=install.DEFAULT_JOBS,
+            help=f"Number of packages to check in parallel (default: {install.DEFAULT_JOBS})",
+        )
+
+        use_parser = subparsers.add_parser(
+            "use", help="Switch to an installed version of a package"
+        )
+        use_parser.add_argument("spec", help="Package and version, e.g. occ@1.2.0")
+
+        rollback_parser = subparsers.add_parser(
+            "rollback", help="Switch back to the previously active version"
+        )
+        rollback_parser.add_argument("pkg", help="Package to roll back")
+
+        lock_parser = subparsers.add_parser(
+            "lock", help="Write the installed releases to a lockfile"
+        )
+        lock_parser.add_argument(
+            "-o",
+            "--output",
+            default=lockfile.DEFAULT_LOCKFILE,
+            help=f"Lockfile to write (default: {lockfile.DEFAULT_LOCKFILE})",
+        )
+
+        sync_parser = subparsers.add_parser(
+            "sync", help="Install the releases pinned in a lockfile"
+        )
+        sync_parser.add_argument(
+            "lockfile",
+            nargs="?",
+            default=lockfile.DEFAULT_LOCKFILE,
+            help=f"Lockfile to install from (default: {lockfile.DEFAULT_LOCKFILE})",
+        )
+        sync_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=_positive_int,
+            default=install.DEFAULT_JOBS,
+            help=f"Number of packages to install in parallel (default: {install.DEFAULT_JOBS})",
+        )
+        sync_parser.add_argument(
+            "--segments",
+            type=_positive_int,
+            default=1,
+            help="Download assets larger than 32 MiB over this many connections (default: 1)",
+        )
 
         info_parser = subparsers.add_parser("info", help="Get info of a package")
         info_parser.add_argument("pkg", help="Package to get info of")
 
+        cache_parser = subparsers.add_parser("cache", help="Manage cached downloads")
+        cache_subparsers = cache_parser.add_subparsers(
+            dest="cache_command", required=True
+        )
+        cache_subparsers.add_parser("list", help="List cached downloads")
+        cache_prune_parser = cache_subparsers.add_parser(
+            "prune", help="Evict least recently used downloads over the budget"
+        )
+        cache_prune_parser.add_argument(
+            "--max-bytes",
+            type=int,
+            default=None,
+            help=f"Size budget in bytes (default: ${download_cache.MAX_BYTES_ENV} or {download_cache.DEFAULT_MAX_BYTES})",
+        )
+        cache_subparsers.add_parser("clear", help="Remove all cached downloads")
+
+        subparsers.add_parser(
+            "gc", help="Remove stored executables no installed version uses"
+        )
+
         purge_parser = subparsers.add_parser(
             "purge",
             help="Remove all ayushman data and configuration",
@@ -422,7 +1005,12 @@ def main():
 
         match args.command:
             case "install":
-                handle_install(args.pkg)
+                handle_install(
+                    args.pkg,
+                    jobs=args.jobs,
+                    segments=args.segments,
+                    exe_only=args.exe_only,
+                )
                 if not registry.get_bin_in_path():
                     path.add_to_path()
                     registry.set_bin_in_path(True)
@@ -433,9 +1021,46 @@ def main():
             case "uninstall":
                 handle_uninstall(args.pkg)
             case "upgrade":
-                handle_upgrade(args.pkg)
+                if args.all == bool(args.pkg):
+                    upgrade_parser.error("give either packages or --all")
+                if args.all:
+                    handle_upgrade_all(
+                        jobs=args.jobs,
+                        segments=args.segments,
+                        exe_only=args.exe_only,
+                    )
+                else:
+                    handle_upgrade(
+                        args.pkg,
+                        jobs=args.jobs,
+                        segments=args.segments,
+                        exe_only=args.exe_only,
+                    )
+            case "outdated":
+                handle_outdated(jobs=args.jobs)
+            case "use":
+                handle_use(args.spec)
+            case "rollback":
+                handle_rollback(args.pkg)
+            case "lock":
+                handle_lock(args.output)
+            case "sync":
+                handle_sync(args.lockfile, jobs=args.jobs, segments=args.segments)
+                if not registry.get_bin_in_path():
+                    path.add_to_path()
+                    registry.set_bin_in_path(True)
             case "info":
                 handle_info(args.pkg)
+            case "cache":
+                match args.cache_command:
+                    case "list":
+                        handle_cache_list()
+                    case "prune":
+                        handle_cache_prune(max_bytes=args.max_bytes)
+                    case "clear":
+                        handle_cache_clear()
+            case "gc":
+                handle_gc()
             case "purge":
                 handle_purge(force=args.force, dry_run=args.dry_run)
             case _:
@@ -22,6 +22,12 @@ Constants:
 
     METADATA_FILE_NAME:
         Base name of the metadata JSON file.
+
+    CACHE_DIR_NAME:
+        Name of the directory holding cached downloads.
+
+    OBJECTS_DIR_NAME:
+        Name of the directory holding the content-addressed executables.
 """
 
 __all__ = [
@@ -30,6 +36,8 @@ __all__ = [
     "PACKAGE_DIR_NAME",
     "BIN_DIR_NAME",
     "METADATA_FILE_NAME",
+    "CACHE_DIR_NAME",
+    "OBJECTS_DIR_NAME",
 ]
 
 GITHUB_OWNER: str = "JourneyCodesAyush"
@@ -38,3 +46,5 @@ INSTALL_DIR_NAME: str = "ayushman"
 PACKAGE_DIR_NAME: str = "packages"
 BIN_DIR_NAME: str = "bin"
 METADATA_FILE_NAME: str = "metadata"
+CACHE_DIR_NAME: str = "cache"
+OBJECTS_DIR_NAME: str = "objects"
@@ -0,0 +1,352 @@
+"""
+Download cache for ayushman.
+
+This module keeps verified release ZIPs on disk so that reinstalling,
+repairing or rolling back a package does not hit the network again. Assets
+are content-addressed by the sha256 digest GitHub publishes for them, which
+means a cache entry can be trusted as soon as the key matches.
+
+Layout:
+    <CACHE_DIR>/assets/<sha256>/<asset name>
+    <CACHE_DIR>/assets.lock               held while pinning or evicting
+    <CACHE_DIR>/pins/<sha256>/<pid>-<id>  one locked file per pin
+
+The cache is bounded by a byte budget. When it grows past the budget, the
+least recently used entries are evicted first. An entry counts as used when
+it is stored or when a lookup hits it. Entries handed out by `lookup` or
+`store` stay pinned, and are never evicted, until `release` is called.
+
+A pin is a file under `pins/` that its owner keeps locked (see
+`ayushman.file_lock`), so an `ayushman cache prune` or `cache clear` run
+from another process sees it too. A pin file that can be locked belongs to
+a process that exited without releasing it, and is removed.
+"""
+
+import contextlib
+import os
+import shutil
+import threading
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+
+import ayushman.file_lock as file_lock
+import ayushman.global_paths as global_paths
+
+__all__ = [
+    "DEFAULT_MAX_BYTES",
+    "CacheEntry",
+    "get_max_bytes",
+    "lookup",
+    "store",
+    "release",
+    "list_entries",
+    "prune",
+    "clear",
+]
+
+# Default size budget for cached assets, in bytes
+DEFAULT_MAX_BYTES: int = 512 * 1024 * 1024
+
+# Environment variable that overrides the size budget, in bytes
+MAX_BYTES_ENV: str = "AYUSHMAN_CACHE_MAX_BYTES"
+
+# Concurrent installs store and evict entries from the same directory
+_cache_lock = threading.Lock()
+
+# sha256 -> one held pin per install of this process using the entry
+_pinned: dict[str, list[file_lock.FileLock]] = {}
+
+
+class CacheEntry:
+    """
+    Represents one cached release asset.
+
+    Attributes:
+        sha256 (str): Content digest the entry is keyed by.
+        path (Path): Location of the cached file.
+        size (int): File size in bytes.
+        last_used (float): Timestamp of the last store or lookup hit.
+    """
+
+    def __init__(self, sha256: str, path: Path, size: int, last_used: float) -> None:
+        self.sha256 = sha256
+        self.path = path
+        self.size = size
+        self.last_used = last_used
+
+
+def _assets_dir() -> Path:
+    """
+    Return the directory holding one sub-directory per cached asset.
+
+    Returns:
+        Path: <CACHE_DIR>/assets
+    """
+
+    return global_paths.CACHE_DIR / "assets"
+
+
+def _pins_dir(sha256: str) -> Path:
+    """
+    Return the directory holding the pins of one entry.
+
+    Args:
+        sha256 (str): Digest of the entry.
+
+    Returns:
+        Path: <CACHE_DIR>/pins/<sha256>
+    """
+
+    return global_paths.CACHE_DIR / "pins" / sha256
+
+
+@contextlib.contextmanager
+def _locked() -> Iterator[None]:
+    """
+    Hold the cache lock of this process and of every other ayushman process.
+
+    Pins are taken and entries evicted only while it is held, so an entry
+    is never deleted between being found and being pinned.
+    """
+
+    with _cache_lock:
+        global_paths.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with file_lock.FileLock(global_paths.CACHE_DIR / "assets.lock"):
+            yield
+
+
+def _pin(sha256: str) -> None:
+    """
+    Pin an entry for this process. Call with `_locked()` held.
+
+    Args:
+        sha256 (str): Digest of the entry.
+    """
+
+    pins_dir = _pins_dir(sha256)
+    pins_dir.mkdir(parents=True, exist_ok=True)
+    pin = file_lock.FileLock(pins_dir / f"{os.getpid()}-{uuid.uuid4().hex}")
+    pin.acquire()
+    _pinned.setdefault(sha256, []).append(pin)
+
+
+def _is_pinned(sha256: str) -> bool:
+    """
+    Tell whether any process holds a pin on an entry. Call with `_locked()`
+    held.
+
+    Args:
+        sha256 (str): Digest of the entry.
+
+    Returns:
+        bool: True if a pin is held. Pins left behind by processes that
+        have exited are removed.
+    """
+
+    if _pinned.get(sha256):
+        return True
+
+    pins_dir = _pins_dir(sha256)
+    if not pins_dir.is_dir():
+        return False
+    pinned = False
+    for pin_path in pins_dir.iterdir():
+        pin = file_lock.FileLock(pin_path)
+        if pin.acquire(blocking=False):
+            pin.release(remove=True)
+        else:
+            pinned = True
+    if not pinned:
+        with contextlib.suppress(OSError):
+            pins_dir.rmdir()
+    return pinned
+
+
+def _entry_file(entry_dir: Path) -> Path | None:
+    """
+    Return the cached file inside an entry directory.
+
+    Args:
+        entry_dir (Path): Directory named after the asset's sha256.
+
+    Returns:
+        Path | None: The cached file, or None if the entry is incomplete.
+    """
+
+    files = [f for f in entry_dir.iterdir() if f.is_file()]
+    return files[0] if files else None
+
+
+def get_max_bytes() -> int:
+    """
+    Return the cache size budget.
+
+    Returns:
+        int: The value of AYUSHMAN_CACHE_MAX_BYTES if set to a non-negative
+        integer, otherwise DEFAULT_MAX_BYTES.
+    """
+
+    value = os.getenv(MAX_BYTES_ENV)
+    if value is not None and value.strip().isdigit():
+        return int(value)
+    return DEFAULT_MAX_BYTES
+
+
+def lookup(sha256: str) -> Path | None:
+    """
+    Find a cached asset by its sha256 digest.
+
+    Args:
+        sha256 (str): Expected digest of the asset.
+
+    Returns:
+        Path | None: Path of the cached file, or None on a cache miss.
+
+    Side effects:
+        Marks the entry as recently used and pins it until `release`.
+    """
+
+    entry_dir = _assets_dir() / sha256
+    if not entry_dir.is_dir():
+        return None
+    with _locked():
+        if not entry_dir.is_dir():
+            return None
+        cached = _entry_file(entry_dir)
+        if cached is None:
+            return None
+        os.utime(cached)
+        _pin(sha256)
+        return cached
+
+
+def store(file_path: str | Path, sha256: str) -> Path:
+    """
+    Move a verified download into the cache.
+
+    Args:
+        file_path (str | Path): The downloaded file. It is moved, not copied.
+        sha256 (str): Verified digest of the file.
+
+    Returns:
+        Path: New location of the file inside the cache.
+
+    Side effects:
+        Pins the new entry until `release`, then evicts least recently used
+        entries until the cache fits within `get_max_bytes()`.
+    """
+
+    file_path = Path(file_path)
+    entry_dir = _assets_dir() / sha256
+    target = entry_dir / file_path.name
+
+    with _locked():
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        shutil.move(file_path, target)
+        os.utime(target)
+        _pin(sha256)
+
+    prune()
+    return target
+
+
+def release(sha256: str) -> None:
+    """
+    Unpin an entry returned by `lookup` or `store`.
+
+    Args:
+        sha256 (str): Digest of the entry that is no longer in use.
+    """
+
+    with _locked():
+        pins = _pinned.get(sha256)
+        if not pins:
+            return
+        pins.pop().release(remove=True)
+        if not pins:
+            del _pinned[sha256]
+            with contextlib.suppress(OSError):
+                _pins_dir(sha256).rmdir()
+
+
+def list_entries() -> list[CacheEntry]:
+    """
+    List every cached asset, most recently used first.
+
+    Returns:
+        list[CacheEntry]: The cached entries.
+    """
+
+    assets_dir = _assets_dir()
+    if not assets_dir.is_dir():
+        return []
+
+    entries: list[CacheEntry] = []
+    for entry_dir in assets_dir.iterdir():
+        if not entry_dir.is_dir():
+            continue
+        try:
+            cached = _entry_file(entry_dir)
+            if cached is None:
+                continue
+            stat = cached.stat()
+        except FileNotFoundError:
+            # Evicted by another process since iterdir()
+            continue
+        entries.append(
+            CacheEntry(
+                sha256=entry_dir.name,
+                path=cached,
+                size=stat.st_size,
+                last_used=stat.st_mtime,
+            )
+        )
+
+    entries.sort(key=lambda e: e.last_used, reverse=True)
+    return entries
+
+
+def prune(max_bytes: int | None = None) -> list[CacheEntry]:
+    """
+    Evict least recently used entries until the cache fits the budget.
+
+    Entries pinned by any process are skipped, so the cache may stay above
+    the budget while installs that use them are still running.
+
+    Args:
+        max_bytes (int | None): Size budget in bytes. Defaults to `get_max_bytes()`.
+
+    Returns:
+        list[CacheEntry]: The entries that were removed.
+    """
+
+    if max_bytes is None:
+        max_bytes = get_max_bytes()
+
+    with _locked():
+        entries = list_entries()
+        total = sum(e.size for e in entries)
+        removed: list[CacheEntry] = []
+
+        for entry in reversed(entries):
+            if total <= max_bytes:
+                break
+            if _is_pinned(entry.sha256):
+                continue
+            shutil.rmtree(entry.path.parent, ignore_errors=True)
+            total -= entry.size
+            removed.append(entry)
+
+    return removed
+
+
+def clear() -> list[CacheEntry]:
+    """
+    Remove every cached asset that is not pinned by a running install.
+
+    Returns:
+        list[CacheEntry]: The entries that were removed.
+    """
+
+    return prune(max_bytes=0)
@@ -11,30 +11,429 @@ reflect installation success, paths, and any errors.
 
 Key behaviors:
     - Extracts only .exe files from a ZIP archive.
+    - Streams each member to disk in EXTRACT_BUFFER_SIZE chunks into a file
+      preallocated to its final size, so peak memory does not grow with the
+      size of the executables.
+    - Optionally extracts members on several threads, each with its own
+      ZipFile handle; zlib releases the GIL, so decompression of archives
+      with several executables spreads over several cores.
+    - Members already extracted while downloading (see
+      `ayushman.stream_unzip`) are moved into place instead, provided their
+      CRC32 and size match the central directory.
+    - Members unchanged, by CRC32 and size, since the previous version's
+      manifest are hard-linked instead of being extracted again. Matches
+      found in the object store's index, which spans every package, are
+      only linked once the member's sha256 has been checked.
+    - Installed executables are moved into `ayushman.object_store`, so
+      identical binaries of different versions share one file on disk.
+    - Creates the bin hard link only once every member has been extracted.
     - Creates versioned package directories and a global bin directory if needed.
-    - Writes per-package metadata to metadata.json.
-    - Creates or updates hard links in the bin directory.
+    - Writes per-package metadata to metadata.json, and the CRC32, size and
+      sha256 of every installed executable to manifest.json. Both are
+      replaced atomically, so a crash never leaves them truncated.
+    - Creates or updates hard links in the bin directory, falling back to
+      a copy-on-write clone or a copy where hard links are impossible (see
+      `ayushman.link`).
     - Updates the InstallResult object with installation status and paths.
 """
 
+import hashlib
 import json
 import os
+import shutil
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import ayushman.global_paths as global_paths
+import ayushman.link as link
+import ayushman.object_store as object_store
 import ayushman.result as result
+import ayushman.utils as utils
 
-__all__ = ["extract_zip_file"]
+__all__ = [
+    "EXTRACT_BUFFER_SIZE",
+    "MANIFEST_NAME",
+    "read_manifest",
+    "EXTRACT_WORKERS_ENV",
+    "get_extract_workers",
+    "is_executable",
+    "extract_zip_file",
+]
 
+# Per-version record of installed executables, compared on the next upgrade
+MANIFEST_NAME: str = "manifest.json"
 
-def extract_zip_file(install_result: result.InstallResult):
+# Bytes decompressed and written per iteration while extracting a member
+EXTRACT_BUFFER_SIZE: int = 1024 * 1024
+
+# Environment variable setting the number of extraction threads
+EXTRACT_WORKERS_ENV: str = "AYUSHMAN_EXTRACT_WORKERS"
+
+# Extraction threads used when the environment variable is not set
+DEFAULT_EXTRACT_WORKERS: int = 1
+
+
+def get_extract_workers() -> int:
+    """
+    Return the number of threads used to extract a package.
+
+    Returns:
+        int: The value of AYUSHMAN_EXTRACT_WORKERS if set to a positive
+        integer, otherwise DEFAULT_EXTRACT_WORKERS (serial extraction).
+    """
+
+    value = os.getenv(EXTRACT_WORKERS_ENV)
+    if value is not None and value.strip().isdigit() and int(value) > 0:
+        return int(value)
+    return DEFAULT_EXTRACT_WORKERS
+
+
+def is_executable(member_name: str) -> bool:
+    """
+    Tell whether an archive member is one of the files ayushman installs.
+
+    Args:
+        member_name (str): Path of the member inside the archive.
+
+    Returns:
+        bool: True for `.exe` files, in any directory and any letter case.
+    """
+
+    return Path(member_name).name.lower().endswith(".exe")
+
+
+def _extract_member(
+    zip_ref: zipfile.ZipFile,
+    file_info: zipfile.ZipInfo,
+    target_path: Path,
+    buffer_size: int,
+) -> None:
+    """
+    Stream one archive member to disk.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open archive.
+        file_info (zipfile.ZipInfo): The member to extract.
+        target_path (Path): Destination file; created or overwritten.
+        buffer_size (int): Bytes decompressed and written per iteration.
+
+    Raises:
+        zipfile.BadZipFile: If the member fails its CRC32 check.
+        OSError: On I/O errors.
+    """
+
+    # Replace rather than overwrite: the old file may be hard-linked from
+    # another version folder or from bin
+    target_path.unlink(missing_ok=True)
+    with zip_ref.open(file_info) as source, open(target_path, "wb") as target:
+        # Reserve the final size up front so the file is laid out in one go
+        target.truncate(file_info.file_size)
+        shutil.copyfileobj(source, target, buffer_size)
+
+
+def _select_members(
+    zip_ref: zipfile.ZipFile, package_folder: Path
+) -> list[tuple[zipfile.ZipInfo, Path]]:
+    """
+    Pick the archive members to install and their destinations.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open archive.
+        package_folder (Path): Versioned package folder.
+
+    Returns:
+        list[tuple[ZipInfo, Path]]: Members in archive order. When several
+        members flatten to the same file name, only the last one is kept,
+        as it would have overwritten the others.
+    """
+
+    selected: dict[Path, zipfile.ZipInfo] = {}
+    for file_info in zip_ref.infolist():
+        if file_info.is_dir() or not is_executable(file_info.filename):
+            continue
+        target_path = package_folder / Path(file_info.filename).name
+        selected.pop(target_path, None)
+        selected[target_path] = file_info
+    return [(file_info, target_path) for target_path, file_info in selected.items()]
+
+
+def read_manifest(package_folder: Path) -> dict:
+    """
+    Read the manifest of an installed version.
+
+    Args:
+        package_folder (Path): Versioned package folder.
+
+    Returns:
+        dict: `{"crc": int, "size": int, "sha256": str | None}` entries keyed
+        by file name (no sha256 before the object store existed); empty
+        if the folder has no readable manifest (e.g. installed before
+        manifests were written).
+    """
+
+    try:
+        with open(package_folder / MANIFEST_NAME) as f:
+            data = json.load(f)
+    except OSError:
+        return {}
+    except ValueError:
+        return {}
+    files = data.get("files") if isinstance(data, dict) else None
+    return files if isinstance(files, dict) else {}
+
+
+def _write_manifest(
+    package_folder: Path,
+    members: list[tuple[zipfile.ZipInfo, Path]],
+    digests: dict[str, str],
+) -> None:
+    """
+    Record the CRC32, size and sha256 of every installed executable.
+
+    Args:
+        package_folder (Path): Versioned package folder.
+        members (list[tuple[ZipInfo, Path]]): Installed members.
+        digests (dict[str, str]): sha256 of the stored executables, keyed by
+            file name; missing for files that could not be stored.
+    """
+
+    files = {
+        target_path.name: {
+            "crc": file_info.CRC,
+            "size": file_info.file_size,
+            "sha256": digests.get(target_path.name),
+        }
+        for file_info, target_path in members
+    }
+    utils.write_json(package_folder / MANIFEST_NAME, {"files": files})
+
+
+def _link_previous(previous_file: Path, target_path: Path, size: int) -> bool:
+    """
+    Hard-link an executable from the previous version folder.
+
+    Args:
+        previous_file (Path): The executable in the previous version.
+        target_path (Path): Where it is needed now.
+        size (int): Expected size, checked before linking.
+
+    Returns:
+        bool: True if the link was created.
+    """
+
+    try:
+        if previous_file.stat().st_size != size:
+            return False
+        target_path.unlink(missing_ok=True)
+        os.link(previous_file, target_path)
+    except OSError:
+        return False
+    return True
+
+
+def _member_sha256(zip_ref: zipfile.ZipFile, file_info: zipfile.ZipInfo) -> str:
+    """
+    Hash one archive member without writing it to disk.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open archive.
+        file_info (zipfile.ZipInfo): The member to hash.
+
+    Returns:
+        str: sha256 hex digest of the member's uncompressed content.
+
+    Raises:
+        zipfile.BadZipFile: If the member fails its CRC32 check.
+    """
+
+    hash_object = hashlib.sha256()
+    with zip_ref.open(file_info) as source:
+        while chunk := source.read(EXTRACT_BUFFER_SIZE):
+            hash_object.update(chunk)
+    return hash_object.hexdigest()
+
+
+def _link_known(
+    zip_ref: zipfile.ZipFile,
+    members: list[tuple[zipfile.ZipInfo, Path]],
+    previous_folder: Path | None,
+) -> tuple[list[tuple[zipfile.ZipInfo, Path]], list[str], dict[str, str]]:
+    """
+    Hard-link members whose content is already on disk.
+
+    Args:
+        zip_ref (zipfile.ZipFile): The open archive.
+        members (list[tuple[ZipInfo, Path]]): Members to install.
+        previous_folder (Path | None): Folder of the version being upgraded
+            from, if any.
+
+    Returns:
+        tuple: The members that still have to be installed, the file names
+        that were linked, and the sha256 of every member linked from the
+        object store, keyed by file name.
+
+    Behavior:
+        - A member matching the previous manifest by CRC32 and size is
+          linked from the object store, or from the previous folder if that
+          version predates the store.
+        - Any other member is looked up in the object store's CRC32/size
+          index, so a version installed before needs no extraction. That
+          index spans every package, and a CRC32 does not identify content,
+          so the member is hashed first and only linked if its sha256
+          matches the stored object.
+        - A failed link leaves the member to be extracted.
+    """
+
+    manifest = read_manifest(previous_folder) if previous_folder else {}
+    remaining = []
+    reused = []
+    digests: dict[str, str] = {}
+    for file_info, target_path in members:
+        entry = manifest.get(target_path.name)
+        unchanged = (
+            isinstance(entry, dict)
+            and entry.get("crc") == file_info.CRC
+            and entry.get("size") == file_info.file_size
+        )
+        sha256 = entry.get("sha256") if unchanged else None
+        if not isinstance(sha256, str):
+            sha256 = object_store.lookup(file_info.CRC, file_info.file_size)
+            if sha256 is not None and _member_sha256(zip_ref, file_info) != sha256:
+                sha256 = None
+
+        if sha256 is not None and object_store.link(sha256, target_path):
+            digests[target_path.name] = sha256
+        elif not (
+            unchanged
+            and _link_previous(
+                previous_folder / target_path.name, target_path, file_info.file_size
+            )
+        ):
+            remaining.append((file_info, target_path))
+            continue
+        reused.append(target_path.name)
+    return remaining, reused, digests
+
+
+def _store_members(
+    members: list[tuple[zipfile.ZipInfo, Path]], digests: dict[str, str]
+) -> None:
+    """
+    Move installed executables into the object store.
+
+    Args:
+        members (list[tuple[ZipInfo, Path]]): Installed members.
+        digests (dict[str, str]): sha256 of members already linked from the
+            store, keyed by file name; updated with the newly stored ones.
+    """
+
+    for file_info, target_path in members:
+        if target_path.name in digests:
+            continue
+        try:
+            digests[target_path.name] = object_store.add(
+                target_path, file_info.CRC, file_info.file_size
+            )
+        except OSError:
+            # Deduplication is best effort; keep the extracted copy
+            pass
+
+
+def _take_staged(
+    members: list[tuple[zipfile.ZipInfo, Path]], staged_files: dict
+) -> list[tuple[zipfile.ZipInfo, Path]]:
+    """
+    Move members extracted during the download into place.
+
+    Args:
+        members (list[tuple[ZipInfo, Path]]): Members to install.
+        staged_files (dict): StagedMember objects keyed by member name.
+
+    Returns:
+        list[tuple[ZipInfo, Path]]: The members that still have to be
+        extracted from the archive, because they were not staged or their
+        CRC32 or size disagrees with the central directory.
+    """
+
+    remaining = []
+    for file_info, target_path in members:
+        staged = staged_files.get(file_info.filename)
+        if (
+            staged is not None
+            and staged.crc == file_info.CRC
+            and staged.size == file_info.file_size
+        ):
+            try:
+                os.replace(staged.path, target_path)
+                continue
+            except OSError:
+                # e.g. staging and packages on different volumes
+                pass
+        remaining.append((file_info, target_path))
+    return remaining
+
+
+def _partition(
+    members: list[tuple[zipfile.ZipInfo, Path]], workers: int
+) -> list[list[tuple[zipfile.ZipInfo, Path]]]:
+    """
+    Split members into groups of roughly equal uncompressed size.
+
+    Args:
+        members (list[tuple[ZipInfo, Path]]): Members to extract.
+        workers (int): Number of groups wanted.
+
+    Returns:
+        list[list[tuple[ZipInfo, Path]]]: Non-empty groups, one per worker.
+    """
+
+    groups: list[list[tuple[zipfile.ZipInfo, Path]]] = [[] for _ in range(workers)]
+    loads = [0] * workers
+    # Largest first, each to the least loaded group
+    for member in sorted(members, key=lambda m: m[0].file_size, reverse=True):
+        index = loads.index(min(loads))
+        groups[index].append(member)
+        loads[index] += member[0].file_size
+    return [group for group in groups if group]
+
+
+def _extract_group(
+    zip_file_name: str,
+    members: list[tuple[zipfile.ZipInfo, Path]],
+    buffer_size: int,
+) -> None:
+    """
+    Extract a group of members through a ZipFile handle of its own.
+
+    Args:
+        zip_file_name (str): Path of the archive.
+        members (list[tuple[ZipInfo, Path]]): Members and their destinations.
+        buffer_size (int): Bytes decompressed and written per iteration.
+    """
+
+    with zipfile.ZipFile(zip_file_name, "r") as zip_ref:
+        for file_info, target_path in members:
+            _extract_member(zip_ref, file_info, target_path, buffer_size)
+
+
+def extract_zip_file(
+    install_result: result.InstallResult,
+    buffer_size: int | None = None,
+    workers: int | None = None,
+):
     """
     Extract .exe files from a package ZIP and set up upgrade-safe binaries.
 
     Args:
         install_result (InstallResult): The result object from downloading
-            a package. Must include zip_file_name and metadata.
+            a package. Must include zip_file_name and metadata; staged_files
+            and previous_version are used when present.
+        buffer_size (int | None): Bytes decompressed and written per
+            iteration; bounds the memory used per member whatever its size.
+            Defaults to EXTRACT_BUFFER_SIZE.
+        workers (int | None): Threads extracting members at the same time.
+            Defaults to `get_extract_workers()`; 1 extracts serially.
 
     Returns:
         InstallResult: The same object, updated with:
@@ -42,18 +441,30 @@ def extract_zip_file(install_result: result.InstallResult):
             - metadata_path: Path to the saved per-package metadata JSON
             - success: True if extraction succeeded, False otherwise
             - error_message: Error message if extraction failed, None otherwise
+            - reused_files: Executables hard-linked from the previous version
+            - link_strategy: How the bin entry was created (see `ayushman.link`)
 
     Side effects:
         - Creates package and bin directories if they don't exist.
-        - Extracts only .exe files from the ZIP.
-        - Writes a per-package metadata.json.
-        - Creates hard links in the bin folder, replacing old links if necessary.
+        - Extracts only .exe files from the ZIP, or hard-links them from
+          the object store (or the previous version's folder) when they are
+          already on disk (see `_link_known`).
+        - Links every installed executable into the object store.
+        - Writes a per-package metadata.json and manifest.json.
+        - Creates a hard link (or, failing that, a clone or copy) in the bin
+          folder to the last `.exe` in archive order, replacing an old link
+          if necessary, once all members have been extracted.
 
     Failure modes:
         Any exception during extraction, file writing, or link creation
         will set success to False and populate error_message.
     """
 
+    if buffer_size is None:
+        buffer_size = EXTRACT_BUFFER_SIZE
+    if workers is None:
+        workers = get_extract_workers()
+
     package_folder = (
         global_paths.PACKAGE_DIR / install_result.package_name / install_result.version
     )
@@ -66,31 +477,50 @@ def extract_zip_file(install_result: result.InstallResult):
     metadata_json = package_folder / "metadata.json"
     try:
         with zipfile.ZipFile(install_result.zip_file_name, "r") as zip_ref:
-            for file_info in zip_ref.infolist():
-                if file_info.is_dir():
-                    continue
-                filename = Path(file_info.filename).name
-
-                if not filename.lower().endswith(".exe"):
-                    continue
-
-                target_path = package_folder / filename
-                hardlink_path = bin_folder / f"{install_result.package_name}.exe"
-                with (
-                    zip_ref.open(file_info) as source,
-                    open(target_path, "wb") as target,
-                ):
-                    target.write(source.read())
-
-                # Delete old hard link if it exists, would be handy while implementing 'upgrade'
-                if hardlink_path.exists():
-                    hardlink_path.unlink()
-
-                # Create new hard link
-                os.link(src=target_path, dst=hardlink_path)
-
-        with open(metadata_json, "w") as f:
-            json.dump(install_result.metadata, f)
+            members = _select_members(zip_ref, package_folder)
+            previous = install_result.previous_version
+            previous_folder = None
+            if previous and previous != install_result.version:
+                previous_folder = (
+                    global_paths.PACKAGE_DIR / install_result.package_name / previous
+                )
+            pending, install_result.reused_files, digests = _link_known(
+                zip_ref, members, previous_folder
+            )
+            pending = _take_staged(pending, install_result.staged_files)
+            if workers <= 1 or len(pending) <= 1:
+                for file_info, target_path in pending:
+                    _extract_member(zip_ref, file_info, target_path, buffer_size)
+
+        if workers > 1 and len(pending) > 1:
+            groups = _partition(pending, workers)
+            with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                futures = [
+                    executor.submit(
+                        _extract_group,
+                        install_result.zip_file_name,
+                        group,
+                        buffer_size,
+                    )
+                    for group in groups
+                ]
+                for future in futures:
+                    future.result()
+
+        # Before linking bin, so that it links to the stored copy as well
+        _store_members(members, digests)
+
+        if members:
+            # Link only now that every member was extracted successfully
+            target_path = members[-1][1]
+            hardlink_path = bin_folder / f"{install_result.package_name}.exe"
+
+            # Replaces the old link; falls back to a clone or copy when
+            # bin and packages cannot share a hard link
+            install_result.link_strategy = link.link_file(target_path, hardlink_path)
+
+        _write_manifest(package_folder, members, digests)
+        utils.write_json(metadata_json, install_result.metadata, indent=None)
 
     except Exception as e:
         install_result.success = False
@@ -0,0 +1,178 @@
+"""
+Cross-process file locks for ayushman.
+
+Several ayushman processes can run at once, e.g. an install in one terminal
+and `ayushman cache clear` in another, so files they share are guarded by
+an exclusive OS lock on a small lock file next to them: `msvcrt.locking` on
+Windows and `fcntl.flock` elsewhere. The OS drops the lock when the process
+exits, so a crash never leaves a file locked.
+
+The lock belongs to the open file, not to the process, so two threads of
+one process that each create a FileLock for the same path also exclude
+each other.
+"""
+
+import contextlib
+import os
+import sys
+import time
+from pathlib import Path
+
+__all__ = ["FileLock"]
+
+# Seconds between attempts while waiting for a lock on Windows
+_RETRY_INTERVAL: float = 0.05
+
+
+def _try_lock(fd: int) -> bool:
+    """
+    Take an exclusive lock on an open file without waiting.
+
+    Args:
+        fd (int): Descriptor of the lock file.
+
+    Returns:
+        bool: True if the lock was taken, False if another holder has it.
+    """
+
+    if sys.platform == "win32":
+        import msvcrt
+
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    import fcntl
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _lock(fd: int) -> None:
+    """
+    Take an exclusive lock on an open file, waiting for other holders.
+
+    Args:
+        fd (int): Descriptor of the lock file.
+    """
+
+    if sys.platform == "win32":
+        while not _try_lock(fd):
+            time.sleep(_RETRY_INTERVAL)
+        return
+
+    import fcntl
+
+    fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _unlock(fd: int) -> None:
+    """
+    Release the lock taken on an open file.
+
+    Args:
+        fd (int): Descriptor of the lock file.
+    """
+
+    if sys.platform == "win32":
+        import msvcrt
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        return
+
+    import fcntl
+
+    fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock:
+    """
+    Exclusive lock held on a lock file.
+
+    Attributes:
+        path (Path): The lock file. Created when the lock is taken.
+
+    Example:
+        with file_lock.FileLock(path.with_name(path.name + ".lock")):
+            ...  # no other process or thread holds the same lock here
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._fd: int | None = None
+
+    @property
+    def locked(self) -> bool:
+        """Whether this object currently holds the lock."""
+
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Take the lock.
+
+        Args:
+            blocking (bool): Wait for other holders to release it. When
+                False, return at once if it is held.
+
+        Returns:
+            bool: True if the lock is now held, False if `blocking` is False
+            and another holder has it.
+        """
+
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if blocking:
+                    _lock(fd)
+                elif not _try_lock(fd):
+                    os.close(fd)
+                    return False
+            except BaseException:
+                os.close(fd)
+                raise
+
+            # The previous holder may have removed the lock file after it was
+            # opened here; only a lock on the file now at `path` counts
+            try:
+                current = os.path.samestat(os.fstat(fd), os.stat(self.path))
+            except FileNotFoundError:
+                current = False
+            if current:
+                self._fd = fd
+                return True
+            _unlock(fd)
+            os.close(fd)
+
+    def release(self, remove: bool = False) -> None:
+        """
+        Release the lock.
+
+        Args:
+            remove (bool): Also delete the lock file, e.g. once the files it
+                guards are gone. Skipped where the OS refuses to delete a
+                file another process has open.
+        """
+
+        if self._fd is None:
+            return
+        if remove:
+            with contextlib.suppress(OSError):
+                os.unlink(self.path)
+        _unlock(self._fd)
+        os.close(self._fd)
+        self._fd = None
+
+    # Quoted: typing.Self needs Python 3.11 and the class is not defined yet
+    def __enter__(self) -> "FileLock":  # noqa: UP037
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -14,7 +14,14 @@ from pathlib import Path
 
 import ayushman.constants as constants
 
-__all__ = ["AYUSHMAN_DIR", "PACKAGE_DIR", "BIN_DIR", "GLOBAL_METADATA"]
+__all__ = [
+    "AYUSHMAN_DIR",
+    "PACKAGE_DIR",
+    "BIN_DIR",
+    "CACHE_DIR",
+    "OBJECTS_DIR",
+    "GLOBAL_METADATA",
+]
 
 
 def _get_local_app_data() -> Path:
@@ -47,5 +54,11 @@ PACKAGE_DIR = AYUSHMAN_DIR / constants.PACKAGE_DIR_NAME
 # Directory where hardlinked executables are placed
 BIN_DIR = AYUSHMAN_DIR / constants.BIN_DIR_NAME
 
+# Directory where downloaded release assets are cached
+CACHE_DIR = AYUSHMAN_DIR / constants.CACHE_DIR_NAME
+
+# Directory where executables are stored once by their sha256
+OBJECTS_DIR = AYUSHMAN_DIR / constants.OBJECTS_DIR_NAME
+
 # Path to the global metadata JSON file
 GLOBAL_METADATA = AYUSHMAN_DIR / f"{constants.METADATA_FILE_NAME}.json"
@@ -0,0 +1,194 @@
+"""
+HTTP client for ayushman.
+
+This module owns the single `requests.Session` that all GitHub traffic goes
+through. Sharing one session lets connections (and their TLS handshakes) be
+reused across the API call and the asset download of every package, which
+matters when several packages are installed in parallel.
+
+Every request made through this module:
+    - Reuses pooled keep-alive connections.
+    - Uses separate connect and read timeouts, so a stalled connection can
+      never hang ayushman forever.
+    - Retries connection errors and transient HTTP statuses (429, 5xx) with
+      exponential backoff, honoring any `Retry-After` header sent back.
+
+GitHub API calls go through `api_get`, which additionally schedules them
+against the API rate limit tracked by `ayushman.rate_limit`.
+"""
+
+import threading
+from importlib.metadata import PackageNotFoundError, version
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import ayushman.rate_limit as rate_limit
+
+__all__ = [
+    "CONNECT_TIMEOUT",
+    "READ_TIMEOUT",
+    "get_session",
+    "close_session",
+    "get",
+    "api_get",
+]
+
+# Seconds to wait for a TCP/TLS connection to be established
+CONNECT_TIMEOUT: float = 10.0
+
+# Seconds to wait between bytes once a connection is established
+READ_TIMEOUT: float = 30.0
+
+# Number of retries for connection errors and retryable statuses
+MAX_RETRIES: int = 5
+
+# Backoff between retries is BACKOFF_FACTOR * 2 ** (retry - 1) seconds
+BACKOFF_FACTOR: float = 0.5
+
+# Upper bound for a single backoff sleep, in seconds
+BACKOFF_MAX: float = 30.0
+
+# HTTP statuses that are worth retrying
+RETRY_STATUSES: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+# Keep-alive connections kept per host; should cover the largest --jobs value
+POOL_MAXSIZE: int = 16
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _user_agent() -> str:
+    """
+    Build the User-Agent header sent with every request.
+
+    Returns:
+        str: "ayushman/<version>", or plain "ayushman" when the package
+        metadata is unavailable (e.g. running from a source checkout).
+    """
+
+    try:
+        return f"ayushman/{version('ayushman')}"
+    except PackageNotFoundError:
+        return "ayushman"
+
+
+def _build_session() -> requests.Session:
+    """
+    Create a session with pooled connections and a retry policy mounted.
+
+    Returns:
+        requests.Session: A new, configured session.
+    """
+
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_max=BACKOFF_MAX,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        # Hand the last response back instead of raising, so callers get a
+        # regular HTTPError from raise_for_status()
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_MAXSIZE,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers["User-Agent"] = _user_agent()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide session, creating it on first use.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def close_session() -> None:
+    """
+    Close the shared session and drop it.
+
+    The next call to `get_session` builds a fresh one, picking up any
+    changes to the module-level settings.
+    """
+
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    Perform a GET request through the shared session.
+
+    Args:
+        url (str): URL to fetch.
+        **kwargs: Passed through to `requests.Session.get`. A `timeout` of
+            (CONNECT_TIMEOUT, READ_TIMEOUT) is used unless one is given.
+
+    Returns:
+        requests.Response: The response. Callers are responsible for
+        calling raise_for_status().
+
+    Raises:
+        requests.RequestException: On connection failures, timeouts or once
+        retries are exhausted for connection-level errors.
+    """
+
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    return get_session().get(url, **kwargs)
+
+
+def api_get(url: str, **kwargs) -> requests.Response:
+    """
+    Perform a GitHub API GET request within the API rate limit.
+
+    Args:
+        url (str): API URL to fetch.
+        **kwargs: Passed through to `get`.
+
+    Returns:
+        requests.Response: The response. Callers are responsible for
+        calling raise_for_status().
+
+    Raises:
+        rate_limit.RateLimitExceeded: If the budget is used up and does not
+            reset within `rate_limit.MAX_WAIT` seconds.
+        requests.RequestException: As for `get`.
+
+    Behavior:
+        - Waits for `rate_limit.limiter` before sending the request and
+          feeds the response's rate-limit headers back into it.
+        - A request rejected because the budget ran out is sent once more
+          after the budget resets.
+    """
+
+    response = None
+    for attempt in range(2):
+        rate_limit.limiter.acquire()
+        response = get(url, **kwargs)
+        rate_limit.limiter.update(response.headers)
+        if attempt or not rate_limit.is_exhausted(response):
+            break
+        response.close()
+    return response
@@ -0,0 +1,499 @@
+"""
+Installation pipeline for ayushman.
+
+This module drives the download -> extract -> register pipeline for one or
+more packages. Several packages can be installed at once on a bounded worker
+pool so that their downloads overlap, while every update to the global
+registry is serialized behind a single lock.
+
+Note:
+    - This module does no printing; every outcome is reported through an
+      InstallResult so the CLI can decide how to present it.
+    - Verified downloads are kept in `ayushman.download_cache`; other
+      downloads are deleted here after extraction has finished or failed.
+    - Full downloads are extracted while they stream in (see
+      `ayushman.stream_unzip`); the staging directory is removed once the
+      package is installed or has failed.
+"""
+
+import contextlib
+import functools
+import os
+import shutil
+import tempfile
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import ayushman.constants as constants
+import ayushman.download_cache as download_cache
+import ayushman.extract_zip as extract_zip
+import ayushman.global_paths as global_paths
+import ayushman.registry as registry
+import ayushman.remote_zip as remote_zip
+import ayushman.request_url as request_url
+import ayushman.result as result
+import ayushman.stream_unzip as stream_unzip
+import ayushman.utils as utils
+import ayushman.validator as validator
+
+__all__ = [
+    "DEFAULT_JOBS",
+    "install_package",
+    "install_release",
+    "install_packages",
+    "install_releases",
+    "check_updates",
+]
+
+# Number of packages processed concurrently when no --jobs value is given
+DEFAULT_JOBS: int = 4
+
+# The registry is a single JSON file, so reads and writes must not interleave
+_registry_lock = threading.Lock()
+
+
+def _failed_result(package_name: str, error_message: str) -> result.InstallResult:
+    """
+    Build an InstallResult describing a package that could not be installed.
+
+    Args:
+        package_name (str): Name of the package.
+        error_message (str): Reason for the failure.
+
+    Returns:
+        InstallResult: A result with success set to False.
+    """
+
+    return result.InstallResult(
+        package_name=package_name,
+        version="",
+        zip_file_name="",
+        install_path="",
+        success=False,
+        error_message=error_message,
+        metadata={},
+        metadata_path="",
+    )
+
+
+def _remove_download(zip_file_name: str) -> None:
+    """
+    Delete a downloaded ZIP file if it exists.
+
+    Args:
+        zip_file_name (str): Path of the downloaded ZIP file.
+
+    Behavior:
+        Only files inside `<CACHE_DIR>/downloads` are removed. After a failed
+        download zip_file_name is still the bare asset name, which must not
+        be resolved against the current directory. The directory of the
+        download is removed too once it is empty.
+    """
+
+    if not zip_file_name:
+        return
+    path = Path(zip_file_name).resolve()
+    downloads_dir = request_url._downloads_dir().resolve()
+    if not path.is_relative_to(downloads_dir):
+        return
+    if path.is_file():
+        os.remove(path)
+    if path.parent != downloads_dir:
+        # Still holds a .part file or a lock while another download runs
+        with contextlib.suppress(OSError):
+            path.parent.rmdir()
+
+
+def _fetch_asset(
+    install_result: result.InstallResult,
+    segments: int = 1,
+    exe_only: bool = False,
+    staging_dir: Path | None = None,
+) -> tuple[result.InstallResult, str | None]:
+    """
+    Make the release ZIP available locally, from the cache when possible.
+
+    Args:
+        install_result (InstallResult): A resolved release.
+        segments (int): Connections to use for large downloads.
+        exe_only (bool): Fetch only the `.exe` members of the ZIP with range
+            requests, unless the whole ZIP is already cached.
+        staging_dir (Path | None): Where `.exe` members are extracted while
+            a full download is in progress; None disables this.
+
+    Returns:
+        tuple[InstallResult, str | None]: The updated result, and the cache
+        key of the ZIP when it lives in the download cache (the entry is
+        pinned and must be released by the caller). The key is None when
+        the ZIP is a plain download that the caller should delete.
+
+    Behavior:
+        - A cache hit on the published sha256 skips the download entirely.
+        - A fresh download is verified against the published sha256 and,
+          if it matches, moved into the cache.
+        - Assets without a published sha256 are never cached.
+        - With exe_only, the reduced ZIP is checked by CRC32 and never
+          cached. Archives that cannot be read member by member fall back
+          to a full download.
+    """
+
+    remote_sha256 = install_result.remote_sha256
+    if remote_sha256 is not None:
+        cached = download_cache.lookup(remote_sha256)
+        if cached is not None:
+            install_result.zip_file_name = str(cached)
+            install_result.local_sha256 = remote_sha256
+            install_result.hash_verified = True
+            install_result.from_cache = True
+            return install_result, remote_sha256
+
+    if exe_only:
+        try:
+            return request_url.download_executables(install_result), None
+        except remote_zip.RemoteZipError:
+            # Not readable member by member; fall back to a full download
+            pass
+
+    extractor = None
+    if staging_dir is not None:
+        extractor = stream_unzip.StreamExtractor(
+            staging_dir, select=extract_zip.is_executable
+        )
+    install_result = request_url.download_asset(
+        install_result, segments=segments, extractor=extractor
+    )
+    if extractor is not None and install_result.success:
+        install_result.staged_files = extractor.staged
+    if not install_result.success or remote_sha256 is None:
+        return install_result, None
+
+    if not install_result.hash_verified:
+        install_result.success = False
+        install_result.error_message = (
+            f"sha256 mismatch: expected {remote_sha256}, "
+            f"got {install_result.local_sha256}"
+        )
+        return install_result, None
+
+    downloaded = install_result.zip_file_name
+    try:
+        cached = download_cache.store(downloaded, remote_sha256)
+    except OSError:
+        # Caching is best effort; keep installing from the downloaded copy
+        return install_result, None
+    install_result.zip_file_name = str(cached)
+    _remove_download(downloaded)
+    return install_result, remote_sha256
+
+
+def install_package(
+    package_name: str, segments: int = 1, exe_only: bool = False
+) -> result.InstallResult:
+    """
+    Install or upgrade a single package.
+
+    Args:
+        package_name (str): Name of the package to install or upgrade, or a
+            `pkg@tag` spec to install a specific release (`pkg@latest` is
+            the same as `pkg`).
+        segments (int): Connections to use when downloading a large asset.
+        exe_only (bool): Fetch only the `.exe` members of the release ZIP.
+
+    Returns:
+        InstallResult: The outcome of the installation. `up_to_date` is set
+        when the latest version was already installed, and `previous_version`
+        holds the version that was replaced by an upgrade.
+
+    Behavior:
+        - Validates the package exists in the trusted repository.
+        - Resolves the requested (by default the latest) release and stops
+          early if that version is already installed, before any asset
+          bytes are fetched. Pinned tags usually resolve from the local
+          release index without any API call.
+        - Uses the cached ZIP for that sha256, or downloads and verifies it.
+        - Extracts `.exe` files and records the package in the registry.
+        - Cleans up the downloaded ZIP file unless it was kept in the cache.
+    """
+
+    package_name, tag = utils.split_spec(package_name)
+    if not validator.validate_package(package_name):
+        return _failed_result(
+            package_name,
+            f"{package_name} not found in github.com/{constants.GITHUB_OWNER}",
+        )
+
+    install_result = request_url.resolve_release(package_name, tag=tag)
+    if not install_result.success:
+        return install_result
+    return install_release(install_result, segments=segments, exe_only=exe_only)
+
+
+def install_release(
+    install_result: result.InstallResult, segments: int = 1, exe_only: bool = False
+) -> result.InstallResult:
+    """
+    Install an already resolved release.
+
+    Args:
+        install_result (InstallResult): A successful result from
+            `request_url.resolve_release`, or one built from a lockfile.
+            Must include version, zip_file_name and asset_url; with
+            remote_sha256 set, the ZIP is verified against it.
+        segments (int): Connections to use when downloading a large asset.
+        exe_only (bool): Fetch only the `.exe` members of the release ZIP.
+
+    Returns:
+        InstallResult: The outcome of the installation, as for
+        `install_package`.
+
+    Behavior:
+        - Stops early if that version is already installed, before any
+          asset bytes are fetched.
+        - Uses the cached ZIP for that sha256, or downloads and verifies it.
+        - Extracts `.exe` files and records the package in the registry.
+        - Cleans up the downloaded ZIP file unless it was kept in the cache.
+    """
+
+    package_name = install_result.package_name
+    with _registry_lock:
+        installed_version = registry.get_installed_version(package_name)
+
+    # Decide on the release tag alone so up-to-date packages cost one API call
+    if installed_version is not None and installed_version == install_result.version:
+        install_result.up_to_date = True
+        return install_result
+
+    install_result.previous_version = installed_version
+    cache_key = None
+    staging_dir = None
+    try:
+        staging_root = global_paths.CACHE_DIR / "staging"
+        staging_root.mkdir(parents=True, exist_ok=True)
+        staging_dir = Path(
+            tempfile.mkdtemp(prefix=f"{package_name}-", dir=staging_root)
+        )
+        install_result, cache_key = _fetch_asset(
+            install_result,
+            segments=segments,
+            exe_only=exe_only,
+            staging_dir=staging_dir,
+        )
+        if not install_result.success:
+            return install_result
+
+        install_result = extract_zip.extract_zip_file(install_result=install_result)
+
+        if install_result.success:
+            with _registry_lock:
+                registry.add_package(install_result)
+        return install_result
+    finally:
+        if cache_key is not None:
+            download_cache.release(cache_key)
+        else:
+            _remove_download(install_result.zip_file_name)
+        if staging_dir is not None:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def install_packages(
+    package_names: Iterable[str],
+    jobs: int = DEFAULT_JOBS,
+    on_result: Callable[[result.InstallResult], None] | None = None,
+    segments: int = 1,
+    exe_only: bool = False,
+) -> list[result.InstallResult]:
+    """
+    Install or upgrade several packages on a bounded worker pool.
+
+    Args:
+        package_names (Iterable[str]): Packages, or `pkg@tag` specs, to
+            install. Names are compared without case, and only the first
+            spec given for each package is installed.
+        jobs (int): Maximum number of packages processed at the same time.
+        on_result (Callable | None): Called from the calling thread with each
+            InstallResult as soon as its package finishes.
+        segments (int): Connections to use per large download.
+        exe_only (bool): Fetch only the `.exe` members of each release ZIP.
+
+    Returns:
+        list[InstallResult]: One result per unique package, in the order the
+        packages were given.
+
+    Side effects:
+        Records the installed packages in the registry with one write,
+        after the last package finishes (see `registry.transaction`).
+
+    Failure modes:
+        An unexpected exception while installing one package is turned into
+        a failed InstallResult for that package; the others keep going.
+    """
+
+    # Keyed by package name, so "occ OCC" or "occ occ@v1" install once
+    specs: dict[str, str] = {}
+    for spec in package_names:
+        specs.setdefault(utils.split_spec(spec)[0], spec)
+    with registry.transaction():
+        return _run_jobs(
+            {
+                name: functools.partial(
+                    install_package, spec, segments=segments, exe_only=exe_only
+                )
+                for name, spec in specs.items()
+            },
+            jobs=jobs,
+            on_result=on_result,
+        )
+
+
+def install_releases(
+    releases: Iterable[result.InstallResult],
+    jobs: int = DEFAULT_JOBS,
+    on_result: Callable[[result.InstallResult], None] | None = None,
+    segments: int = 1,
+    exe_only: bool = False,
+) -> list[result.InstallResult]:
+    """
+    Install several already resolved releases on a bounded worker pool.
+
+    Args:
+        releases (Iterable[InstallResult]): Resolved releases, as accepted
+            by `install_release`. Only the first release of each package is
+            installed.
+        jobs (int): Maximum number of packages processed at the same time.
+        on_result (Callable | None): Called from the calling thread with each
+            InstallResult as soon as its package finishes.
+        segments (int): Connections to use per large download.
+        exe_only (bool): Fetch only the `.exe` members of each release ZIP.
+
+    Returns:
+        list[InstallResult]: One result per unique package, in the order the
+        releases were given.
+
+    Side effects:
+        Records the installed packages in the registry with one write,
+        after the last package finishes (see `registry.transaction`).
+
+    Note:
+        No GitHub API request is made; packages that are not supported are
+        rejected without touching the network.
+    """
+
+    tasks: dict[str, Callable[[], result.InstallResult]] = {}
+    for release in releases:
+        name = release.package_name
+        if name in tasks:
+            continue
+        if validator.validate_package(name):
+            tasks[name] = functools.partial(
+                install_release, release, segments=segments, exe_only=exe_only
+            )
+        else:
+            tasks[name] = functools.partial(
+                _failed_result,
+                name,
+                f"{name} not found in github.com/{constants.GITHUB_OWNER}",
+            )
+    with registry.transaction():
+        return _run_jobs(tasks, jobs=jobs, on_result=on_result)
+
+
+def _check_latest(package_name: str, installed_version: str) -> result.InstallResult:
+    """
+    Resolve the latest release of an installed package.
+
+    Args:
+        package_name (str): Name of the package.
+        installed_version (str): Its active version.
+
+    Returns:
+        InstallResult: The resolved latest release, with previous_version
+        set to the installed version and up_to_date set if they match;
+        previous_version is set even if the lookup failed.
+    """
+
+    latest = request_url.resolve_release(package_name)
+    latest.package_name = package_name
+    latest.previous_version = installed_version
+    latest.up_to_date = latest.success and latest.version == installed_version
+    return latest
+
+
+def check_updates(
+    jobs: int = DEFAULT_JOBS,
+    on_result: Callable[[result.InstallResult], None] | None = None,
+) -> list[result.InstallResult]:
+    """
+    Look up the latest release of every installed package concurrently.
+
+    Args:
+        jobs (int): Maximum number of lookups in flight at the same time.
+        on_result (Callable | None): Called from the calling thread with each
+            InstallResult as soon as its lookup finishes.
+
+    Returns:
+        list[InstallResult]: One resolved release per installed package, in
+        registry order. `previous_version` holds the installed version and
+        `up_to_date` is set when it is the latest. Failed lookups have
+        success set to False.
+
+    Behavior:
+        - Nothing is downloaded. A stale result can be passed straight to
+          `install_releases` without resolving it again.
+        - Lookups go through `ayushman.release_cache`, so unchanged releases
+          are revalidated with conditional requests.
+    """
+
+    with _registry_lock:
+        active = registry.get_active_packages()
+    return _run_jobs(
+        {
+            pkg["name"]: functools.partial(_check_latest, pkg["name"], pkg["version"])
+            for pkg in active
+        },
+        jobs=jobs,
+        on_result=on_result,
+    )
+
+
+def _run_jobs(
+    tasks: dict[str, Callable[[], result.InstallResult]],
+    jobs: int,
+    on_result: Callable[[result.InstallResult], None] | None,
+) -> list[result.InstallResult]:
+    """
+    Run one task per package on a bounded worker pool.
+
+    Args:
+        tasks (dict): Callables producing an InstallResult, keyed by package.
+        jobs (int): Maximum number of tasks running at the same time.
+        on_result (Callable | None): Called from the calling thread with each
+            InstallResult as soon as its task finishes.
+
+    Returns:
+        list[InstallResult]: One result per task, in the order of `tasks`.
+
+    Failure modes:
+        An unexpected exception in one task is turned into a failed
+        InstallResult for that package; the others keep going.
+    """
+
+    if not tasks:
+        return []
+
+    results: dict[str, result.InstallResult] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(tasks)))) as executor:
+        futures = {executor.submit(task): name for name, task in tasks.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                install_result = future.result()
+            except Exception as e:
+                install_result = _failed_result(name, str(e))
+            results[name] = install_result
+            if on_result is not None:
+                on_result(install_result)
+
+    return [results[name] for name in tasks]
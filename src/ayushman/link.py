@@ -0,0 +1,161 @@
+"""
+File linking strategies for ayushman.
+
+Installed executables are exposed in the bin directory as hard links to the
+versioned copy. Hard links only work within one filesystem that supports
+them, so this module falls back to the cheapest alternative the platform
+and filesystem allow.
+
+Strategies, in the order they are tried:
+    - HARDLINK: `os.link`, no data is written.
+    - REFLINK: a copy-on-write clone via the `FICLONE` ioctl (Linux, e.g.
+      btrfs and XFS); shares blocks until one side is modified.
+    - ZERO_COPY: `os.copy_file_range`, or `os.sendfile`, which copy inside
+      the kernel without passing the data through user space.
+    - COPY: a buffered copy, as the last resort.
+
+Note:
+    Every strategy writes to a temporary name next to the destination and
+    then replaces it, so an existing file is never left half written.
+"""
+
+import errno
+import os
+import shutil
+import sys
+from pathlib import Path
+
+__all__ = [
+    "HARDLINK",
+    "REFLINK",
+    "ZERO_COPY",
+    "COPY",
+    "COPY_BUFFER_SIZE",
+    "link_file",
+]
+
+HARDLINK: str = "hardlink"
+REFLINK: str = "reflink"
+ZERO_COPY: str = "zero-copy"
+COPY: str = "copy"
+
+# ioctl request number of FICLONE, _IOW(0x94, 9, int), on Linux
+_FICLONE: int = 0x40049409
+
+# Bytes per iteration of the buffered copy and per zero-copy call
+COPY_BUFFER_SIZE: int = 1024 * 1024
+
+
+def _unsupported(strategy: str) -> OSError:
+    """
+    Build the error raised when a strategy is not available here.
+
+    Args:
+        strategy (str): Name of the strategy.
+
+    Returns:
+        OSError: An EOPNOTSUPP error naming the strategy.
+    """
+
+    return OSError(errno.EOPNOTSUPP, f"{strategy} is not supported here")
+
+
+def _hardlink(src: Path, dst: Path) -> None:
+    """Create `dst` as a hard link to `src`."""
+
+    os.link(src, dst)
+
+
+def _clone(src: Path, dst: Path) -> None:
+    """Create `dst` as a copy-on-write clone of `src`."""
+
+    if not sys.platform.startswith("linux"):
+        raise _unsupported(REFLINK)
+    import fcntl
+
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+
+
+def _zero_copy(src: Path, dst: Path) -> None:
+    """Copy `src` to `dst` inside the kernel."""
+
+    copy_file_range = getattr(os, "copy_file_range", None)
+    sendfile = getattr(os, "sendfile", None) if sys.platform != "win32" else None
+    if copy_file_range is None and sendfile is None:
+        raise _unsupported(ZERO_COPY)
+
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        size = os.fstat(source.fileno()).st_size
+        offset = 0
+        while offset < size:
+            count = min(COPY_BUFFER_SIZE, size - offset)
+            if copy_file_range is not None:
+                try:
+                    copied = copy_file_range(
+                        source.fileno(), target.fileno(), count, offset, offset
+                    )
+                except OSError:
+                    # e.g. EXDEV on kernels that only copy within a filesystem
+                    if sendfile is None or offset:
+                        raise
+                    copy_file_range = None
+                    continue
+            else:
+                copied = sendfile(target.fileno(), source.fileno(), offset, count)
+            if copied == 0:
+                raise OSError(errno.EIO, f"{src} ended after {offset} bytes")
+            offset += copied
+
+
+def _copy(src: Path, dst: Path) -> None:
+    """Copy `src` to `dst` through a user-space buffer."""
+
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
+
+
+def link_file(src: str | Path, dst: str | Path) -> str:
+    """
+    Make `dst` a link to, or failing that a copy of, `src`.
+
+    Args:
+        src (str | Path): Existing file.
+        dst (str | Path): Path to create; an existing file is replaced.
+
+    Returns:
+        str: The strategy that was used: HARDLINK, REFLINK, ZERO_COPY or
+        COPY.
+
+    Raises:
+        OSError: If even the buffered copy fails; `dst` is then unchanged.
+    """
+
+    src = Path(src)
+    dst = Path(dst)
+    temp_path = dst.with_name(dst.name + ".link")
+    strategies = [
+        (HARDLINK, _hardlink),
+        (REFLINK, _clone),
+        (ZERO_COPY, _zero_copy),
+        (COPY, _copy),
+    ]
+
+    error: OSError | None = None
+    for name, strategy in strategies:
+        temp_path.unlink(missing_ok=True)
+        try:
+            strategy(src, temp_path)
+        except OSError as e:
+            error = e
+            continue
+        try:
+            os.replace(temp_path, dst)
+        finally:
+            # Renaming onto a hard link of the same file is a no-op that
+            # leaves the temporary name behind
+            temp_path.unlink(missing_ok=True)
+        return name
+
+    temp_path.unlink(missing_ok=True)
+    raise error
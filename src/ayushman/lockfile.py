@@ -0,0 +1,322 @@
+"""
+Lockfiles for ayushman.
+
+A lockfile records which release of every installed package is active,
+together with the URL and sha256 of its ZIP asset. Syncing from it on
+another machine installs the same binaries without asking the GitHub API
+which release is the latest, so provisioning is bounded by download
+bandwidth alone.
+
+Layout:
+    {
+        "lockfile_version": 1,
+        "packages": [
+            {
+                "name": "occ",
+                "tag": "v1.2.0",
+                "asset_url": "https://github.com/.../occ.zip",
+                "asset_size": 123456,
+                "sha256": "<64 hex digits>"
+            }
+        ]
+    }
+
+Key behaviors:
+    - `lock_installed` reads the registry. Releases installed before the
+      registry recorded asset URLs are resolved by tag, usually from
+      `ayushman.release_index` without any API call.
+    - `sync` installs the locked releases in parallel and verifies every
+      ZIP against its locked sha256; a mismatch fails that package.
+    - Installed packages missing from the lockfile are left alone.
+"""
+
+import json
+import re
+from collections.abc import Callable
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import ayushman.install as install
+import ayushman.registry as registry
+import ayushman.request_url as request_url
+import ayushman.result as result
+import ayushman.utils as utils
+
+__all__ = [
+    "DEFAULT_LOCKFILE",
+    "LOCKFILE_VERSION",
+    "LockfileError",
+    "LockedPackage",
+    "lock_installed",
+    "write_lockfile",
+    "read_lockfile",
+    "sync",
+]
+
+# File written by `ayushman lock` and read by `ayushman sync` by default
+DEFAULT_LOCKFILE: str = "ayushman-lock.json"
+
+# Format version written into every lockfile
+LOCKFILE_VERSION: int = 1
+
+_SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class LockfileError(Exception):
+    """Raised when a lockfile cannot be read or is malformed."""
+
+
+class LockedPackage:
+    """
+    One package release pinned in a lockfile.
+
+    Attributes:
+        name (str): Package name.
+        tag (str): Release tag.
+        asset_url (str): Download URL of the release ZIP.
+        sha256 (str): sha256 of the release ZIP.
+        asset_size (int | None): Size of the release ZIP in bytes, if known.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tag: str,
+        asset_url: str,
+        sha256: str,
+        asset_size: int | None = None,
+    ) -> None:
+        self.name = name
+        self.tag = tag
+        self.asset_url = asset_url
+        self.sha256 = sha256
+        self.asset_size = asset_size
+
+
+def _lock_entry(entry: dict) -> LockedPackage | str:
+    """
+    Pin the release recorded in a registry entry.
+
+    Args:
+        entry (dict): Registry entry of an active package version.
+
+    Returns:
+        LockedPackage | str: The pinned release, or the reason it cannot
+        be pinned.
+    """
+
+    name = entry["name"]
+    tag = entry["version"]
+    if entry.get("asset_url") and entry.get("sha256"):
+        return LockedPackage(
+            name, tag, entry["asset_url"], entry["sha256"], entry.get("asset_size")
+        )
+
+    resolved = request_url.resolve_release(name, tag=tag)
+    if not resolved.success:
+        return resolved.error_message or f"cannot resolve {name} {tag}"
+    if not resolved.remote_sha256:
+        return f"GitHub publishes no sha256 for {name} {tag}"
+    return LockedPackage(
+        name, tag, resolved.asset_url, resolved.remote_sha256, resolved.asset_size
+    )
+
+
+def lock_installed() -> tuple[list[LockedPackage], dict[str, str]]:
+    """
+    Pin the active version of every installed package.
+
+    Returns:
+        tuple[list[LockedPackage], dict[str, str]]: The pinned releases,
+        sorted by name, and the reason for every package that could not
+        be pinned, keyed by name.
+
+    Side effects:
+        Packages whose registry entry lacks the asset URL or sha256 are
+        resolved through `request_url.resolve_release`, which may perform
+        API requests.
+    """
+
+    locked: list[LockedPackage] = []
+    unresolved: dict[str, str] = {}
+    for entry in registry.get_active_packages():
+        pinned = _lock_entry(entry)
+        if isinstance(pinned, LockedPackage):
+            locked.append(pinned)
+        else:
+            unresolved[entry["name"]] = pinned
+    locked.sort(key=lambda p: p.name)
+    return locked, unresolved
+
+
+def write_lockfile(path: str | Path, packages: list[LockedPackage]) -> None:
+    """
+    Write pinned releases to a lockfile.
+
+    Args:
+        path (str | Path): Lockfile to create or replace.
+        packages (list[LockedPackage]): Releases to pin.
+
+    Side effects:
+        Writes to a temporary file next to `path` and renames it over
+        `path`, so an existing lockfile is never left half written.
+    """
+
+    path = Path(path)
+    data = {
+        "lockfile_version": LOCKFILE_VERSION,
+        "packages": [
+            {
+                "name": p.name,
+                "tag": p.tag,
+                "asset_url": p.asset_url,
+                "asset_size": p.asset_size,
+                "sha256": p.sha256,
+            }
+            for p in packages
+        ],
+    }
+    utils.write_json(path, data)
+
+
+def _parse_entry(entry: object) -> LockedPackage:
+    """
+    Validate one package entry of a lockfile.
+
+    Args:
+        entry (object): The decoded JSON entry.
+
+    Returns:
+        LockedPackage: The pinned release.
+
+    Raises:
+        LockfileError: If a field is missing or malformed.
+    """
+
+    if not isinstance(entry, dict):
+        raise LockfileError(f"package entry is not an object: {entry!r}")
+    for field in ("name", "tag", "asset_url", "sha256"):
+        if not isinstance(entry.get(field), str) or not entry[field]:
+            raise LockfileError(f"package entry without {field}: {entry!r}")
+
+    name = entry["name"].lower()
+    tag = entry["tag"]
+    # The tag names the install folder, so it must stay inside PACKAGE_DIR
+    if tag in (".", "..") or Path(tag).name != tag:
+        raise LockfileError(f"{name}: invalid tag {tag!r}")
+    sha256 = entry["sha256"].lower()
+    if not _SHA256_PATTERN.fullmatch(sha256):
+        raise LockfileError(f"{name}: invalid sha256 {entry['sha256']!r}")
+    if urlparse(entry["asset_url"]).scheme not in ("http", "https"):
+        raise LockfileError(f"{name}: invalid asset URL {entry['asset_url']!r}")
+    asset_size = entry.get("asset_size")
+    if asset_size is not None and (
+        not isinstance(asset_size, int) or isinstance(asset_size, bool)
+    ):
+        raise LockfileError(f"{name}: invalid asset size {asset_size!r}")
+    return LockedPackage(name, tag, entry["asset_url"], sha256, asset_size)
+
+
+def read_lockfile(path: str | Path) -> list[LockedPackage]:
+    """
+    Read the releases pinned in a lockfile.
+
+    Args:
+        path (str | Path): Lockfile to read.
+
+    Returns:
+        list[LockedPackage]: The pinned releases, in file order.
+
+    Raises:
+        LockfileError: If the file cannot be read, is not valid JSON, has an
+            unsupported version, a malformed entry, or pins a package twice.
+    """
+
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except OSError as e:
+        raise LockfileError(f"cannot read {path}: {e}") from e
+    except ValueError as e:
+        raise LockfileError(f"{path} is not valid JSON: {e}") from e
+
+    if not isinstance(data, dict) or not isinstance(data.get("packages"), list):
+        raise LockfileError(f"{path} is not an ayushman lockfile")
+    if data.get("lockfile_version") != LOCKFILE_VERSION:
+        raise LockfileError(
+            f"unsupported lockfile version {data.get('lockfile_version')!r}"
+        )
+
+    packages: list[LockedPackage] = []
+    seen: set[str] = set()
+    for entry in data["packages"]:
+        locked = _parse_entry(entry)
+        if locked.name in seen:
+            raise LockfileError(f"{locked.name} is locked more than once")
+        seen.add(locked.name)
+        packages.append(locked)
+    return packages
+
+
+def _release_result(locked: LockedPackage) -> result.InstallResult:
+    """
+    Describe a pinned release the way `request_url.resolve_release` would.
+
+    Args:
+        locked (LockedPackage): The pinned release.
+
+    Returns:
+        InstallResult: A resolved release whose remote_sha256 is the locked
+        sha256, ready for `install.install_release`.
+    """
+
+    asset_name = Path(unquote(urlparse(locked.asset_url).path)).name
+    return result.InstallResult(
+        package_name=locked.name,
+        version=locked.tag,
+        zip_file_name=asset_name or f"{locked.name}.zip",
+        install_path="",
+        success=True,
+        error_message=None,
+        metadata={"license": "MIT"},
+        metadata_path="",
+        remote_sha256=locked.sha256,
+        asset_url=locked.asset_url,
+        asset_size=locked.asset_size,
+    )
+
+
+def sync(
+    path: str | Path,
+    jobs: int = install.DEFAULT_JOBS,
+    on_result: Callable[[result.InstallResult], None] | None = None,
+    segments: int = 1,
+) -> list[result.InstallResult]:
+    """
+    Install every release pinned in a lockfile.
+
+    Args:
+        path (str | Path): Lockfile to read.
+        jobs (int): Maximum number of packages installed at the same time.
+        on_result (Callable | None): Called with each InstallResult as soon
+            as its package finishes.
+        segments (int): Connections to use per large download.
+
+    Returns:
+        list[InstallResult]: One result per locked package, in file order.
+        Packages whose locked tag is already active are `up_to_date`.
+
+    Raises:
+        LockfileError: If the lockfile cannot be read; nothing is installed.
+
+    Behavior:
+        - Makes no GitHub API request: the asset URL and sha256 come from
+          the lockfile.
+        - ZIPs already in the download cache under the locked sha256 are
+          not downloaded again; every other ZIP is verified against it.
+    """
+
+    releases = [_release_result(locked) for locked in read_lockfile(path)]
+    return install.install_releases(
+        releases, jobs=jobs, on_result=on_result, segments=segments
+    )
@@ -0,0 +1,315 @@
+"""
+Content-addressed store for installed executables.
+
+Every executable ayushman installs is kept once in the object store, named
+after its sha256. Version folders and the bin directory hold hard links to
+these objects, so versions that ship identical binaries share one copy on
+disk, and reinstalling a version whose executables are already stored
+needs no extraction at all.
+
+Layout:
+    <AYUSHMAN_DIR>/objects/<sha256[:2]>/<sha256>
+    <AYUSHMAN_DIR>/objects/index.json    # "<crc32>-<size>" -> sha256
+
+Key behaviors:
+    - An object's hard link count is its reference count: the store holds
+      one link, every version folder or bin entry using it adds one.
+    - Objects whose only link is the store's own are unused and are removed
+      by `collect`; nothing else ever deletes an object.
+    - The index maps the CRC32 and size found in a ZIP's central directory
+      to the sha256 of the stored file, so a member can be matched to an
+      object before it is extracted.
+
+Note:
+    Linking into the store is best effort: on filesystems without hard
+    links, or when the store is on another volume, callers keep their own
+    copy and nothing is deduplicated.
+"""
+
+import json
+import os
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+import ayushman.global_paths as global_paths
+import ayushman.utils as utils
+
+__all__ = [
+    "StoredObject",
+    "object_path",
+    "add",
+    "lookup",
+    "link",
+    "list_objects",
+    "collect",
+]
+
+# File mapping ZIP CRC32 and size to stored digests
+INDEX_NAME: str = "index.json"
+
+# Concurrent installs add objects and update the index at the same time
+_store_lock = threading.Lock()
+
+
+class StoredObject:
+    """
+    Represents one executable in the object store.
+
+    Attributes:
+        sha256 (str): Content digest the object is named after.
+        path (Path): Location of the object.
+        size (int): File size in bytes.
+        references (int): Hard links to the object outside the store.
+    """
+
+    def __init__(self, sha256: str, path: Path, size: int, references: int) -> None:
+        self.sha256 = sha256
+        self.path = path
+        self.size = size
+        self.references = references
+
+
+def _index_key(crc: int, size: int) -> str:
+    """
+    Return the index key for a ZIP member.
+
+    Args:
+        crc (int): CRC32 of the member.
+        size (int): Uncompressed size of the member.
+
+    Returns:
+        str: The key, e.g. "1a2b3c4d-5120".
+    """
+
+    return f"{crc:08x}-{size}"
+
+
+def _read_index() -> dict:
+    """
+    Read the CRC32/size index.
+
+    Returns:
+        dict: sha256 digests keyed by `_index_key`; empty if the index is
+        missing or unreadable.
+    """
+
+    try:
+        with open(global_paths.OBJECTS_DIR / INDEX_NAME) as f:
+            data = json.load(f)
+    except OSError:
+        return {}
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_index(index: dict) -> None:
+    """
+    Replace the CRC32/size index.
+
+    Args:
+        index (dict): sha256 digests keyed by `_index_key`.
+    """
+
+    utils.write_json(global_paths.OBJECTS_DIR / INDEX_NAME, index)
+
+
+def _link_over(source: Path, dest: Path) -> None:
+    """
+    Make `dest` a hard link to `source`, replacing any existing file.
+
+    Args:
+        source (Path): Existing file.
+        dest (Path): Path to (re)create.
+
+    Raises:
+        OSError: If the link cannot be created; `dest` is then unchanged.
+    """
+
+    temp_path = dest.with_name(dest.name + ".link")
+    temp_path.unlink(missing_ok=True)
+    os.link(source, temp_path)
+    try:
+        os.replace(temp_path, dest)
+    finally:
+        # Renaming onto a hard link of the same file is a no-op that leaves
+        # the temporary name behind
+        temp_path.unlink(missing_ok=True)
+
+
+def object_path(sha256: str) -> Path:
+    """
+    Return where the object with the given digest is stored.
+
+    Args:
+        sha256 (str): Digest of the object.
+
+    Returns:
+        Path: <OBJECTS_DIR>/<sha256[:2]>/<sha256>, whether it exists or not.
+    """
+
+    return global_paths.OBJECTS_DIR / sha256[:2] / sha256
+
+
+def add(file_path: str | Path, crc: int, size: int) -> str:
+    """
+    Store an extracted executable and link it to the stored copy.
+
+    Args:
+        file_path (str | Path): The extracted file.
+        crc (int): CRC32 of the file, as listed in the ZIP.
+        size (int): Size of the file in bytes.
+
+    Returns:
+        str: sha256 digest of the file.
+
+    Raises:
+        OSError: If the file cannot be linked into the store; it is left
+            untouched.
+
+    Behavior:
+        - A new digest is stored by linking the file itself into the store;
+          no bytes are copied.
+        - A digest that is already stored replaces the file with a link to
+          the existing object, freeing the duplicate.
+    """
+
+    file_path = Path(file_path)
+    sha256 = utils.get_sha256(str(file_path))
+    stored = object_path(sha256)
+
+    with _store_lock:
+        stored.parent.mkdir(parents=True, exist_ok=True)
+        if stored.exists():
+            if not os.path.samefile(stored, file_path):
+                _link_over(stored, file_path)
+        else:
+            os.link(file_path, stored)
+        index = _read_index()
+        if index.get(_index_key(crc, size)) != sha256:
+            index[_index_key(crc, size)] = sha256
+            _write_index(index)
+    return sha256
+
+
+def lookup(crc: int, size: int) -> str | None:
+    """
+    Find a stored object matching a ZIP member.
+
+    Args:
+        crc (int): CRC32 of the member.
+        size (int): Uncompressed size of the member.
+
+    Returns:
+        str | None: sha256 of the stored object, or None if no object with
+        this CRC32 and size is stored.
+
+    Note:
+        A CRC32 and size match is only a candidate: callers must compare
+        the member's sha256 with the returned digest before linking it.
+    """
+
+    with _store_lock:
+        sha256 = _read_index().get(_index_key(crc, size))
+    if not isinstance(sha256, str):
+        return None
+    try:
+        if object_path(sha256).stat().st_size != size:
+            return None
+    except OSError:
+        return None
+    return sha256
+
+
+def link(sha256: str, dest: str | Path) -> bool:
+    """
+    Hard-link a stored object to `dest`, replacing any existing file.
+
+    Args:
+        sha256 (str): Digest of the object.
+        dest (str | Path): Path to create.
+
+    Returns:
+        bool: True if the link was created, False if the object is not
+        stored or cannot be linked from there.
+    """
+
+    # Hold the lock so `collect` cannot remove the object in between
+    with _store_lock:
+        try:
+            _link_over(object_path(sha256), Path(dest))
+        except OSError:
+            return False
+    return True
+
+
+def list_objects() -> list[StoredObject]:
+    """
+    List every stored object.
+
+    Returns:
+        list[StoredObject]: The objects, in no particular order.
+    """
+
+    objects_dir = global_paths.OBJECTS_DIR
+    if not objects_dir.is_dir():
+        return []
+
+    objects: list[StoredObject] = []
+    for prefix_dir in objects_dir.iterdir():
+        if not prefix_dir.is_dir():
+            continue
+        for stored in prefix_dir.iterdir():
+            stat = stored.stat()
+            objects.append(
+                StoredObject(
+                    sha256=stored.name,
+                    path=stored,
+                    size=stat.st_size,
+                    references=stat.st_nlink - 1,
+                )
+            )
+    return objects
+
+
+def collect(sha256s: Iterable[str] | None = None) -> list[StoredObject]:
+    """
+    Remove stored objects that no version folder or bin entry links to.
+
+    Args:
+        sha256s (Iterable[str] | None): Only consider these objects, e.g.
+            the executables of a package that was just uninstalled. None
+            considers the whole store.
+
+    Returns:
+        list[StoredObject]: The objects that were removed.
+    """
+
+    with _store_lock:
+        if sha256s is None:
+            candidates = list_objects()
+        else:
+            candidates = []
+            for sha256 in set(sha256s):
+                stored = object_path(sha256)
+                try:
+                    stat = stored.stat()
+                except OSError:
+                    continue
+                candidates.append(
+                    StoredObject(sha256, stored, stat.st_size, stat.st_nlink - 1)
+                )
+
+        removed = [obj for obj in candidates if obj.references <= 0]
+        for obj in removed:
+            obj.path.unlink(missing_ok=True)
+
+        if removed:
+            gone = {obj.sha256 for obj in removed}
+            index = _read_index()
+            kept = {key: sha for key, sha in index.items() if sha not in gone}
+            if len(kept) != len(index):
+                _write_index(kept)
+
+    return removed
@@ -0,0 +1,241 @@
+"""
+GitHub API rate limiting for ayushman.
+
+GitHub reports the remaining request budget on every API response through
+the `X-RateLimit-Limit`, `X-RateLimit-Remaining` and `X-RateLimit-Reset`
+headers. This module keeps track of that budget for the whole process, so
+that parallel installs and long-running bulk upgrades slow down gracefully
+instead of failing halfway through.
+
+Key behaviors:
+    - While plenty of budget is left, API calls go out immediately.
+    - Once fewer than LOW_WATERMARK of the limit remain, calls are spread
+      evenly over the time left until the budget resets.
+    - When the budget is used up, calls wait for the reset, as long as that
+      is no more than MAX_WAIT seconds away. Otherwise RateLimitExceeded is
+      raised with the time the budget resets.
+
+Note:
+    Only GitHub API calls count against the limit; release asset downloads
+    are not throttled.
+"""
+
+import threading
+import time
+
+import requests
+
+__all__ = [
+    "LOW_WATERMARK",
+    "MAX_WAIT",
+    "RateLimitExceeded",
+    "Budget",
+    "RateLimiter",
+    "is_exhausted",
+    "limiter",
+]
+
+# Fraction of the limit below which calls are spread out
+LOW_WATERMARK: float = 0.1
+
+# Longest time, in seconds, a call may be held back waiting for a reset
+MAX_WAIT: float = 15 * 60
+
+# Seconds added after the advertised reset time to absorb clock skew
+RESET_GRACE: float = 1.0
+
+# Length of GitHub's rate-limit window, used when a window rolls over
+# before the next response tells us the new reset time
+WINDOW: float = 60 * 60
+
+
+class RateLimitExceeded(requests.RequestException):
+    """Raised when the API budget is used up and resets too far in the future."""
+
+
+class Budget:
+    """
+    Snapshot of the GitHub API request budget.
+
+    Attributes:
+        limit (int): Requests allowed per window.
+        remaining (int): Requests left in the current window.
+        reset (float): Timestamp at which the window resets.
+    """
+
+    def __init__(self, limit: int, remaining: int, reset: float) -> None:
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+
+    def reset_time(self) -> str:
+        """
+        Format the reset timestamp for display.
+
+        Returns:
+            str: Local time as "HH:MM:SS".
+        """
+
+        return time.strftime("%H:%M:%S", time.localtime(self.reset))
+
+
+def _header_int(headers, name: str) -> int | None:
+    """
+    Read an integer response header.
+
+    Args:
+        headers: Response headers.
+        name (str): Header name.
+
+    Returns:
+        int | None: The value, or None if missing or malformed.
+    """
+
+    value = headers.get(name)
+    if value is None or not value.strip().isdigit():
+        return None
+    return int(value)
+
+
+def is_exhausted(response: requests.Response) -> bool:
+    """
+    Tell whether a response was rejected because the budget ran out.
+
+    Args:
+        response (requests.Response): An API response.
+
+    Returns:
+        bool: True for a 403 or 429 reporting zero remaining requests.
+    """
+
+    return (
+        response.status_code in (403, 429)
+        and _header_int(response.headers, "X-RateLimit-Remaining") == 0
+    )
+
+
+class RateLimiter:
+    """
+    Tracks the API budget and schedules calls against it.
+
+    The limiter is thread safe. Each `acquire` reserves one request from the
+    budget it knows about; `update` then corrects the budget with what GitHub
+    actually reported.
+
+    Args:
+        clock: Function returning the current timestamp.
+        sleep: Function used to wait.
+    """
+
+    def __init__(self, clock=time.time, sleep=time.sleep) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._budget: Budget | None = None
+        self._next_slot = 0.0
+
+    def budget(self) -> Budget | None:
+        """
+        Return the budget as last reported by GitHub.
+
+        Returns:
+            Budget | None: A copy of the budget, or None before any API
+            response has been seen.
+        """
+
+        with self._lock:
+            if self._budget is None:
+                return None
+            return Budget(
+                self._budget.limit, self._budget.remaining, self._budget.reset
+            )
+
+    def observe(self, limit: int, remaining: int, reset: float) -> None:
+        """
+        Record a budget reported by GitHub.
+
+        Responses to parallel requests can arrive out of order, so within
+        the same window the lowest remaining count wins.
+
+        Args:
+            limit (int): Requests allowed per window.
+            remaining (int): Requests left in the window.
+            reset (float): Timestamp at which the window resets.
+        """
+
+        with self._lock:
+            current = self._budget
+            if current is not None and current.reset == reset:
+                current.limit = limit
+                current.remaining = min(current.remaining, remaining)
+            else:
+                self._budget = Budget(limit, remaining, reset)
+
+    def update(self, headers) -> None:
+        """
+        Record the budget reported in API response headers.
+
+        Args:
+            headers: Response headers. Responses without rate-limit headers
+                are ignored.
+        """
+
+        limit = _header_int(headers, "X-RateLimit-Limit")
+        remaining = _header_int(headers, "X-RateLimit-Remaining")
+        reset = _header_int(headers, "X-RateLimit-Reset")
+        if limit is None or remaining is None or reset is None:
+            return
+        self.observe(limit, remaining, float(reset))
+
+    def acquire(self) -> float:
+        """
+        Reserve one API request, waiting as long as the budget requires.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            RateLimitExceeded: If the budget is used up and resets more than
+                MAX_WAIT seconds from now.
+
+        Behavior:
+            - Unknown budget, or more than LOW_WATERMARK of it left: no wait.
+            - Low budget: calls are spaced (reset - now) / remaining apart.
+            - No budget: wait until the reset plus RESET_GRACE.
+        """
+
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            budget = self._budget
+
+            if budget is not None:
+                if slot >= budget.reset + RESET_GRACE:
+                    # The window rolled over; GitHub refills the whole limit
+                    budget.remaining = budget.limit
+                    budget.reset = slot + WINDOW
+
+                if budget.remaining <= 0:
+                    slot = budget.reset + RESET_GRACE
+                    if slot - now > MAX_WAIT:
+                        raise RateLimitExceeded(
+                            "GitHub API rate limit exceeded; "
+                            f"it resets at {budget.reset_time()}"
+                        )
+                    budget.remaining = budget.limit
+                    budget.reset = slot + WINDOW
+                elif budget.remaining < budget.limit * LOW_WATERMARK:
+                    self._next_slot = slot + (budget.reset - slot) / budget.remaining
+
+                budget.remaining -= 1
+
+            self._next_slot = max(self._next_slot, slot)
+
+        delay = slot - now
+        if delay > 0:
+            self._sleep(delay)
+        return max(delay, 0.0)
+
+
+# Process-wide limiter shared by every API call
+limiter = RateLimiter()
@@ -9,19 +9,125 @@ been added to the user PATH.
 All modifications to installed packages should go through this module to
 ensure consistency, maintain upgrade-safe installations, and keep metadata
 in sync with the filesystem.
+
+Layout (schema version 2):
+    {
+        "schema_version": 2,
+        "packages": {
+            "<pkg>": {
+                "versions": {
+                    "<older version>": {...},
+                    "<active version>": {
+                        "install_path": ..., "zip_file_name": ...,
+                        "metadata_path": ..., "asset_url": ...,
+                        "asset_size": ..., "sha256": ...
+                    }
+                }
+            }
+        },
+        "bin_in_path": true
+    }
+
+    Packages are ordered from least to most recently changed, and each
+    package's versions from least to most recently installed or activated,
+    so the last version is the active one. Lookups by name and updates of
+    one package never scan the other packages, but this backend still
+    rewrites the whole file on every update, so writes grow with the number
+    of packages; the journal and SQLite backends do not.
+
+Key behaviors:
+    - A version 1 file, which kept every version in one flat
+      "installed_packages" list, is migrated the first time it is read; the
+      original is kept next to it as `<file>.v1`.
+    - The metadata file is parsed once per process and kept in a `Registry`
+      object. Every later read only stats the file and parses it again if
+      its mtime or size changed, e.g. because another ayushman process
+      wrote it.
+    - Writes update the cached copy, so reading back what was just written
+      costs no parse.
+    - The metadata file is replaced atomically: written to a temporary file,
+      fsynced and renamed over it, so a crash never leaves it truncated.
+    - `transaction` groups several updates into one write, e.g. for all the
+      packages of an `upgrade --all`.
+    - `snapshot` and `get_many` answer many queries from a single parse,
+      for commands that look at several packages at once.
+    - With `AYUSHMAN_REGISTRY_BACKEND=journal`, updates are appended to
+      `<file>.journal` as one JSON line each and fsynced, instead of
+      rewriting the whole file. Reads replay the journal over the file, and
+      once the journal holds AYUSHMAN_REGISTRY_COMPACT_ENTRIES lines it is
+      folded back into the file (see `JournaledRegistry`).
+    - With `AYUSHMAN_REGISTRY_BACKEND=sqlite`, the same functions use
+      `ayushman.registry_sqlite` instead, stored next to the JSON file as
+      `metadata.db`. The JSON registry is imported into it on first use.
+
+Journal (`<file>.journal`):
+    {"seq": 7, "op": "add", "name": ..., "version": ..., "record": {...}}
+    {"seq": 8, "op": "activate", "name": ..., "version": ...}
+    {"seq": 9, "op": "remove", "name": ...}
+    {"seq": 10, "op": "set", "key": "bin_in_path", "value": true}
+
+    The metadata file records the "journal_seq" of the last entry folded
+    into it, so entries left behind by an interrupted compaction are not
+    applied twice. A last line without a newline is an update still being
+    written, or cut short by a crash, and is not applied. Seqs are assigned,
+    lines appended and the journal compacted only while holding
+    `<file>.journal.lock` (see `ayushman.file_lock`), so two processes never
+    write the same seq.
 """
 
+import copy
 import json
+import os
+import shutil
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
 
+import ayushman.file_lock as file_lock
 import ayushman.global_paths as global_paths
+import ayushman.registry_sqlite as registry_sqlite
 import ayushman.result as result
+import ayushman.utils as utils
 
 REGISTRY_PATH = global_paths.GLOBAL_METADATA
 
+# On-disk schema written by this version of ayushman
+SCHEMA_VERSION: int = 2
+
+# Environment variable selecting where the registry is stored
+BACKEND_ENV: str = "AYUSHMAN_REGISTRY_BACKEND"
+JSON_BACKEND: str = "json"
+JOURNAL_BACKEND: str = "journal"
+SQLITE_BACKEND: str = "sqlite"
+
+# Journal lines after which the journal is folded into the metadata file
+DEFAULT_COMPACT_ENTRIES: int = 1_000
+COMPACT_ENTRIES_ENV: str = "AYUSHMAN_REGISTRY_COMPACT_ENTRIES"
+
 __all__ = [
+    "SCHEMA_VERSION",
+    "BACKEND_ENV",
+    "JSON_BACKEND",
+    "JOURNAL_BACKEND",
+    "SQLITE_BACKEND",
+    "DEFAULT_COMPACT_ENTRIES",
+    "COMPACT_ENTRIES_ENV",
+    "get_backend",
+    "get_compact_entries",
+    "Registry",
+    "JournaledRegistry",
+    "RegistrySnapshot",
+    "get_registry",
+    "snapshot",
+    "get_many",
+    "transaction",
     "add_package",
     "list_package",
     "get_installed_version",
+    "get_installed_versions",
+    "get_active_packages",
+    "activate_version",
     "is_package_installed",
     "get_package_metadata",
     "remove_package",
@@ -30,17 +136,781 @@ __all__ = [
 ]
 
 
-def _ensure_metadata_file() -> None:
+def _entry(name: str, version: str, record: dict) -> dict:
+    """
+    Build the flat entry callers see for one package version.
+
+    Args:
+        name (str): Package name.
+        version (str): Version.
+        record (dict): The version's record in the metadata.
+
+    Returns:
+        dict: A new dict with "name" and "version" followed by the record.
+    """
+
+    return {"name": name, "version": version, **record}
+
+
+class RegistrySnapshot:
+    """
+    Read-only view of the registry as it was at one point in time.
+
+    Every query is answered from the same parsed metadata, so a snapshot
+    stays consistent even if the file changes while it is in use. Entries
+    are returned as copies.
+
+    Attributes:
+        data (dict): The parsed metadata; must not be modified.
+    """
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+
+    def entries(self) -> list[dict]:
+        """
+        Return every recorded package version.
+
+        Returns:
+            list[dict]: Entries, most recently changed package first and,
+            within a package, the active version first.
+        """
+
+        packages = self.data["packages"]
+        return [
+            _entry(name, version, record)
+            for name in reversed(packages)
+            for version, record in reversed(packages[name]["versions"].items())
+        ]
+
+    def get(self, package_name: str) -> dict:
+        """
+        Return the entry of the active version of a package.
+
+        Args:
+            package_name (str): Name of the package.
+
+        Returns:
+            dict: The entry, or an empty dict if the package is not installed.
+        """
+
+        package = self.data["packages"].get(package_name)
+        if not package or not package["versions"]:
+            return {}
+        version = next(reversed(package["versions"]))
+        return _entry(package_name, version, package["versions"][version])
+
+    def get_many(self, package_names: Iterable[str]) -> dict[str, dict]:
+        """
+        Return the entries of the active versions of several packages.
+
+        Args:
+            package_names (Iterable[str]): Names of the packages.
+
+        Returns:
+            dict[str, dict]: Entries keyed by the given names, in the order
+            given; an empty dict for packages that are not installed.
+        """
+
+        return {name: self.get(name) for name in package_names}
+
+    def active_packages(self) -> list[dict]:
+        """
+        Return the entry of the active version of every package.
+
+        Returns:
+            list[dict]: One entry per installed package, most recently
+            changed first.
+        """
+
+        packages = self.data["packages"]
+        return [entry for name in reversed(packages) if (entry := self.get(name))]
+
+    def versions(self, package_name: str) -> list[str]:
+        """
+        Return every recorded version of a package, the active one first.
+
+        Args:
+            package_name (str): Name of the package.
+
+        Returns:
+            list[str]: Versions; empty if the package is not installed.
+        """
+
+        package = self.data["packages"].get(package_name)
+        return list(reversed(package["versions"])) if package else []
+
+    def bin_in_path(self) -> bool:
+        """Return whether the bin directory has been added to the user PATH."""
+
+        return self.data.get("bin_in_path", False)
+
+
+def _migrate_v1(data: dict) -> dict:
+    """
+    Convert version 1 metadata to the current schema.
+
+    Args:
+        data (dict): Metadata with a flat "installed_packages" list, most
+            recently installed first.
+
+    Returns:
+        dict: The same packages, versions and flags in schema version 2.
+    """
+
+    packages: dict[str, dict] = {}
+    # Replay oldest first so the most recent package and version end up last
+    for pkg in reversed(data.get("installed_packages", [])):
+        record = {k: v for k, v in pkg.items() if k not in ("name", "version")}
+        package = packages.pop(pkg["name"], None) or {"versions": {}}
+        package["versions"].pop(pkg["version"], None)
+        package["versions"][pkg["version"]] = record
+        packages[pkg["name"]] = package
+
+    migrated = {k: v for k, v in data.items() if k != "installed_packages"}
+    migrated["schema_version"] = SCHEMA_VERSION
+    migrated["packages"] = packages
+    return migrated
+
+
+def _copy(data: dict) -> dict:
+    """
+    Copy metadata so that it may be changed without affecting `data`.
+
+    Args:
+        data (dict): Metadata, e.g. the cached copy.
+
+    Returns:
+        dict: A copy of the top level and of the "packages" mapping.
+        Package records are still shared; replace them instead of modifying
+        them (see `_edit_package`), so that updating one package costs the
+        same however many are installed.
+    """
+
+    copied = dict(data)
+    copied["packages"] = dict(copied["packages"])
+    return copied
+
+
+def _apply(data: dict, entry: dict) -> None:
+    """
+    Apply one update to metadata.
+
+    Args:
+        data (dict): Metadata, changed in place. Only the record of the
+            package concerned is replaced (see `_edit_package`), so copies
+            made by `_copy` are not affected.
+        entry (dict): The update, as written to the journal. "seq" is
+            optional; when present it is recorded as "journal_seq".
+
+    Behavior:
+        Applying an update again leaves the same package versions and the
+        same active version, so replaying a journal is safe.
+    """
+
+    op = entry["op"]
+    if op == "add":
+        versions = _edit_package(data, entry["name"])["versions"]
+        versions.pop(entry["version"], None)
+        versions[entry["version"]] = entry["record"]
+    elif op == "activate":
+        versions = _edit_package(data, entry["name"])["versions"]
+        if entry["version"] in versions:
+            versions[entry["version"]] = versions.pop(entry["version"])
+    elif op == "remove":
+        data["packages"].pop(entry["name"], None)
+    elif op == "set":
+        data[entry["key"]] = entry["value"]
+    if "seq" in entry:
+        data["journal_seq"] = entry["seq"]
+
+
+class Registry:
+    """
+    Cached access to one metadata file.
+
+    Updates rewrite the whole file. Reads also apply any journal left by
+    `JournaledRegistry`, and the next update folds it into the file, so
+    switching back from the journal backend loses nothing.
+
+    Attributes:
+        path (Path): Location of the metadata file.
+        journal_path (Path): Location of the journal, `<path>.journal`.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self._data: dict | None = None
+        self._stamp: tuple[int, int] | None = None
+        # Bytes and lines of the journal already applied to _data
+        self._journal_offset = 0
+        self._journal_entries = 0
+        # Updates applied to _data but not written yet, and how many
+        # transactions are open; see transaction()
+        self._pending: list[dict] = []
+        self._depth = 0
+        # Reentrant: updates hold it across load() and _write()
+        self._lock = threading.RLock()
+
+    def _current_stamp(self) -> tuple[int, int] | None:
+        """
+        Return the mtime and size of the metadata file.
+
+        Returns:
+            tuple[int, int] | None: (mtime in nanoseconds, size in bytes),
+            or None if the file does not exist.
+        """
+
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _write(self, data: dict) -> None:
+        """
+        Write metadata to the file and cache it; the lock must be held.
+
+        Args:
+            data (dict): The metadata to write.
+
+        Side effects:
+            Replaces the file atomically (see `utils.write_json`).
+        """
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        utils.write_json(self.path, data)
+        self._data = data
+        self._stamp = self._current_stamp()
+        if self._journal_offset:
+            # data already includes the journal
+            self._truncate_journal()
+
+    def _truncate_journal(self) -> None:
+        """Empty the journal once the metadata file includes it."""
+
+        with open(self.journal_path, "wb"):
+            pass
+        self._journal_offset = self._journal_entries = 0
+
+    def _replay(self) -> None:
+        """
+        Apply journal lines written since the last call to the cached copy.
+
+        Behavior:
+            Only complete lines are applied; a line that is not valid JSON
+            (cut short by a crash) is skipped, and so is any entry whose
+            "seq" is not newer than the metadata's "journal_seq". If the
+            journal shrank, another process compacted it and the metadata
+            file is parsed again.
+        """
+
+        try:
+            size = self.journal_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size == self._journal_offset:
+            return
+        if size < self._journal_offset:
+            self._data = self._parse()
+            self._stamp = self._current_stamp()
+            self._journal_offset = self._journal_entries = 0
+
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            chunk = f.read(size - self._journal_offset)
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            self._journal_entries += 1
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("seq", 0) > self._data.get("journal_seq", 0):
+                _apply(self._data, entry)
+        self._journal_offset += end
+
+    def _parse(self) -> dict:
+        """
+        Parse the metadata file, migrating it to the current schema.
+
+        Returns:
+            dict: Metadata in schema version SCHEMA_VERSION.
+
+        Raises:
+            ValueError: If the file was written by a newer ayushman with a
+                schema this version does not understand.
+
+        Side effects:
+            A version 1 file is copied to `<file>.v1` and rewritten in the
+            current schema.
+        """
+
+        with open(self.path) as f:
+            data = json.load(f)
+
+        schema = data.get("schema_version", 1)
+        if schema > SCHEMA_VERSION:
+            raise ValueError(
+                f"{self.path} uses registry schema {schema}; this version of "
+                f"ayushman supports up to {SCHEMA_VERSION}"
+            )
+        if schema == 1:
+            backup = self.path.with_name(self.path.name + ".v1")
+            if not backup.exists():
+                shutil.copy2(self.path, backup)
+            data = _migrate_v1(data)
+            self._write(data)
+        return data
+
+    def load(self) -> dict:
+        """
+        Return the parsed metadata, parsing the file only if it changed.
+
+        Journal lines appended since the last call are applied on top, so
+        a read after another process's update reads only the new lines.
+
+        Returns:
+            dict: The cached metadata itself. Updates change it in place, so
+            only use it while holding the lock; use `read` or `snapshot`
+            for a copy.
+
+        Side effects:
+            Creates the metadata file if it does not exist, and migrates a
+            version 1 file (see `_parse`).
+        """
+
+        with self._lock:
+            if self._pending:
+                # Keep the transaction's updates until they are written
+                return self._data
+            stamp = self._current_stamp()
+            if stamp is None or self._data is None or stamp != self._stamp:
+                # Apply the whole journal again over the file's contents
+                self._journal_offset = self._journal_entries = 0
+                if stamp is None:
+                    self._write({"schema_version": SCHEMA_VERSION, "packages": {}})
+                else:
+                    self._data = self._parse()
+                    self._stamp = self._current_stamp()
+            self._replay()
+            return self._data
+
+    def read(self) -> dict:
+        """
+        Return a copy of the metadata that may be changed and saved.
+
+        Returns:
+            dict: A copy as described in `_copy`.
+        """
+
+        with self._lock:
+            return _copy(self.load())
+
+    def save(self, data: dict) -> None:
+        """
+        Write metadata to the file and cache it.
+
+        Args:
+            data (dict): The metadata to write. It becomes the cached copy,
+                so the caller must not modify it afterwards.
+
+        Side effects:
+            Creates the metadata file and parent directories if they do not
+            exist.
+        """
+
+        with self._lock:
+            self._write(data)
+
+    def snapshot(self) -> RegistrySnapshot:
+        """
+        Return a consistent read-only view of the current metadata.
+
+        Returns:
+            RegistrySnapshot: Answers any number of queries without reading
+            the file again. It holds a copy of the top level and of the
+            "packages" mapping, so later updates do not show through.
+        """
+
+        with self._lock:
+            return RegistrySnapshot(_copy(self.load()))
+
+    def _live(self) -> RegistrySnapshot:
+        """Return a view of the cached metadata; the lock must be held."""
+
+        return RegistrySnapshot(self.load())
+
+    def get(self, package_name: str) -> dict:
+        """Return the entry of the active version of a package."""
+
+        with self._lock:
+            return self._live().get(package_name)
+
+    def get_many(self, package_names: Iterable[str]) -> dict[str, dict]:
+        """Return the entries of the active versions of several packages."""
+
+        with self._lock:
+            return self._live().get_many(package_names)
+
+    def versions(self, package_name: str) -> list[str]:
+        """Return every recorded version of a package, the active one first."""
+
+        with self._lock:
+            return self._live().versions(package_name)
+
+    def entries(self) -> list[dict]:
+        """Return every recorded package version."""
+
+        with self._lock:
+            return self._live().entries()
+
+    def active_packages(self) -> list[dict]:
+        """Return the entry of the active version of every package."""
+
+        with self._lock:
+            return self._live().active_packages()
+
+    def bin_in_path(self) -> bool:
+        """Return whether the bin directory has been added to the user PATH."""
+
+        with self._lock:
+            return self._live().bin_in_path()
+
+    def add_version(self, package_name: str, version: str, record: dict) -> None:
+        """
+        Record a package version and make it the active one.
+
+        Args:
+            package_name (str): Name of the package.
+            version (str): Version installed.
+            record (dict): The version's record; replaces any earlier one.
+        """
+
+        self._update(
+            {"op": "add", "name": package_name, "version": version, "record": record}
+        )
+
+    def activate(self, package_name: str, version: str) -> bool:
+        """
+        Make a recorded version the active version of a package.
+
+        Args:
+            package_name (str): Name of the package.
+            version (str): Version to activate.
+
+        Returns:
+            bool: True if the version was recorded, False otherwise.
+        """
+
+        with self._lock:
+            versions = self.versions(package_name)
+            if version not in versions:
+                return False
+            if versions[0] != version:
+                self._update(
+                    {"op": "activate", "name": package_name, "version": version}
+                )
+            return True
+
+    def remove(self, package_name: str) -> bool:
+        """
+        Forget every version of a package.
+
+        Args:
+            package_name (str): Name of the package.
+
+        Returns:
+            bool: True if a package was removed, False if it was not found.
+        """
+
+        with self._lock:
+            if package_name not in self.load()["packages"]:
+                return False
+            self._update({"op": "remove", "name": package_name})
+            return True
+
+    def set_bin_in_path(self, value: bool) -> None:
+        """
+        Set the flag recording whether the bin directory is in the user PATH.
+
+        Args:
+            value (bool): The new value; the file is not rewritten if the
+                flag already has it.
+        """
+
+        with self._lock:
+            if self.bin_in_path() == value:
+                return
+            self._update({"op": "set", "key": "bin_in_path", "value": value})
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Group updates so that they are written once, when the block ends.
+
+        Yields:
+            None
+
+        Behavior:
+            Updates made inside the block, from any thread, are applied to
+            the cached copy at once, so reads see them, and written together
+            when the outermost transaction ends. They are written even if
+            the block raises, since each one records something already done
+            on disk. Nested transactions join the outer one.
+
+        Note:
+            Until the write, changes made by other ayushman processes are
+            not read; with the JSON backend the write replaces them.
+        """
+
+        with self._lock:
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if not self._depth and self._pending:
+                    self._flush()
+
+    def _update(self, entry: dict) -> None:
+        """
+        Apply one update, writing it unless a transaction is open.
+
+        Args:
+            entry (dict): The update, as described in `_apply`.
+        """
+
+        with self._lock:
+            # In place: only the changed package's record is copied (see
+            # `_edit_package`), so the cost does not grow with the registry
+            _apply(self.load(), entry)
+            self._pending.append(entry)
+            if not self._depth:
+                self._flush()
+
+    def _flush(self) -> None:
+        """
+        Write the pending updates by rewriting the metadata file once.
+
+        Failure modes:
+            If the write fails, the cached copy is dropped so that the next
+            read returns what is on disk, and the exception is re-raised.
+        """
+
+        self._pending = []
+        try:
+            self._write(self._data)
+        except BaseException:
+            self._forget()
+            raise
+
+    def _forget(self) -> None:
+        """Drop the cached copy and pending updates; the lock must be held."""
+
+        self._data = None
+        self._stamp = None
+        self._pending = []
+        self._journal_offset = self._journal_entries = 0
+
+
+class JournaledRegistry(Registry):
     """
-    Ensure that the global metadata file exists.
+    Registry that appends updates to a journal instead of rewriting the file.
+
+    Each update costs one appended line and one fsync, however many
+    packages are installed. Once the journal holds `get_compact_entries()`
+    lines, `compact` folds it into the metadata file.
 
-    Creates the parent directories if necessary and initializes the metadata
-    file with an empty installed_packages list if it does not exist.
+    Other ayushman processes may append to the same journal. Appending and
+    compacting hold an exclusive lock on `<file>.journal.lock`, and the
+    updates of other processes are applied first, so every process sees
+    the updates in the order of the journal.
+
+    Note:
+        Inside a transaction, updates made by other processes are only read
+        when the transaction is written.
     """
 
-    REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if not REGISTRY_PATH.exists():
-        REGISTRY_PATH.write_text(json.dumps({"installed_packages": []}, indent=4))
+    def _journal_lock(self) -> file_lock.FileLock:
+        """Return the lock guarding appends to, and compaction of, the journal."""
+
+        return file_lock.FileLock(
+            self.journal_path.with_name(self.journal_path.name + ".lock")
+        )
+
+    def _journal_size(self) -> int:
+        """Return the size of the journal in bytes, 0 if it does not exist."""
+
+        try:
+            return self.journal_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _flush(self) -> None:
+        """
+        Append the pending updates to the journal with one write and fsync.
+
+        Behavior:
+            With the journal lock held, the pending updates are given the
+            seqs following the last one on disk. If another process wrote
+            since the cached copy was read, the copy is rebuilt from disk
+            first and the pending updates applied again after its updates.
+
+        Side effects:
+            Creates the journal if it does not exist. May compact it.
+
+        Failure modes:
+            If the append fails, the cached copy is dropped so that the next
+            read returns what is on disk, and the exception is re-raised.
+        """
+
+        entries, self._pending = self._pending, []
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._journal_lock():
+                if (
+                    self._current_stamp() != self._stamp
+                    or self._journal_size() != self._journal_offset
+                ):
+                    self._forget()
+                    data = self.load()
+                    for entry in entries:
+                        _apply(data, entry)
+                self._append(entries)
+                if self._journal_entries >= get_compact_entries():
+                    self._compact()
+        except BaseException:
+            self._forget()
+            raise
+
+    def _append(self, entries: list[dict]) -> None:
+        """
+        Number updates and append them; the journal lock must be held.
+
+        Args:
+            entries (list[dict]): Updates already applied to the cached
+                copy, without a "seq".
+        """
+
+        seq = self._data.get("journal_seq", 0)
+        numbered = []
+        for entry in entries:
+            seq += 1
+            numbered.append({"seq": seq, **entry})
+        self._data["journal_seq"] = seq
+        lines = b"".join(json.dumps(entry).encode() + b"\n" for entry in numbered)
+
+        with open(self.journal_path, "ab+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                # Keep the new entries off a line cut short by a crash
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    lines = b"\n" + lines
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_offset = size + len(lines)
+        self._journal_entries += len(entries)
+
+    def compact(self) -> None:
+        """
+        Fold the journal into the metadata file and empty it.
+
+        Side effects:
+            Replaces the metadata file atomically, then truncates the
+            journal. A crash in between leaves entries that the new file
+            already includes; their seq keeps them from being applied again.
+        """
+
+        with self._lock, self._journal_lock():
+            self._compact()
+
+    def _compact(self) -> None:
+        """Compact as described in `compact`; both locks must be held."""
+
+        self._write(self.load())
+        self._truncate_journal()
+
+
+# One Registry per metadata file and class, so tests can point
+# REGISTRY_PATH elsewhere
+_registries: dict[tuple[Path, type], Registry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry() -> Registry:
+    """
+    Return the Registry for the current REGISTRY_PATH.
+
+    Returns:
+        Registry: A JournaledRegistry with the journal backend, otherwise a
+        Registry. The same object for every call with the same path, so
+        its cache is shared by the whole process.
+    """
+
+    cls = JournaledRegistry if get_backend() == JOURNAL_BACKEND else Registry
+    key = (Path(REGISTRY_PATH), cls)
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = cls(key[0])
+        return _registries[key]
+
+
+def get_backend() -> str:
+    """
+    Return which registry backend is in use.
+
+    Returns:
+        str: JOURNAL_BACKEND or SQLITE_BACKEND if AYUSHMAN_REGISTRY_BACKEND
+        names one of them (in any case), otherwise JSON_BACKEND.
+    """
+
+    value = os.getenv(BACKEND_ENV, "").strip().lower()
+    return value if value in (JOURNAL_BACKEND, SQLITE_BACKEND) else JSON_BACKEND
+
+
+def get_compact_entries() -> int:
+    """
+    Return how many journal lines trigger a compaction.
+
+    Returns:
+        int: The value of AYUSHMAN_REGISTRY_COMPACT_ENTRIES if set to a
+        positive integer, otherwise DEFAULT_COMPACT_ENTRIES.
+    """
+
+    value = os.getenv(COMPACT_ENTRIES_ENV)
+    if value is not None and value.strip().isdigit() and int(value) > 0:
+        return int(value)
+    return DEFAULT_COMPACT_ENTRIES
+
+
+def _store() -> Registry | registry_sqlite.SqliteRegistry:
+    """
+    Return the registry the module-level functions should use.
+
+    Returns:
+        Registry | SqliteRegistry: The JSON registry at REGISTRY_PATH, with
+        or without a journal, or the SQLite database next to it, depending
+        on `get_backend`.
+
+    Side effects:
+        The first use of the SQLite backend imports the JSON registry into
+        it, if the JSON file exists.
+    """
+
+    if get_backend() != SQLITE_BACKEND:
+        return get_registry()
+
+    json_path = Path(REGISTRY_PATH)
+    store = registry_sqlite.get_registry(json_path.with_suffix(".db"))
+    store.import_data(
+        lambda: get_registry().read() if json_path.exists() else {"packages": {}}
+    )
+    return store
 
 
 def _read_metadata() -> dict:
@@ -48,15 +918,14 @@ def _read_metadata() -> dict:
     Read and return the global metadata as a dictionary.
 
     Returns:
-        dict: The contents of the global metadata file.
+        dict: A copy of the global metadata that the caller may change, as
+        described in `Registry.read`.
 
     Side effects:
         Ensures that the metadata file exists before reading.
     """
 
-    _ensure_metadata_file()
-    with open(REGISTRY_PATH) as f:
-        return json.load(f)
+    return get_registry().read()
 
 
 def _write_metadata(data: dict) -> None:
@@ -70,9 +939,74 @@ def _write_metadata(data: dict) -> None:
         Creates the metadata file and parent directories if they do not exist.
     """
 
-    _ensure_metadata_file()
-    with open(REGISTRY_PATH, "w") as f:
-        json.dump(data, f, indent=4)
+    get_registry().save(data)
+
+
+def _edit_package(data: dict, package_name: str) -> dict:
+    """
+    Take a private copy of one package's record for modification.
+
+    Args:
+        data (dict): Metadata from `_read_metadata`.
+        package_name (str): Name of the package.
+
+    Returns:
+        dict: The package's record, copied into `data` and moved to the end
+        of "packages" as the most recently changed package. A new, empty
+        record if the package was not recorded.
+    """
+
+    package = data["packages"].pop(package_name, None)
+    package = copy.deepcopy(package) if package else {"versions": {}}
+    data["packages"][package_name] = package
+    return package
+
+
+def snapshot() -> RegistrySnapshot:
+    """
+    Return a read-only view of the registry for answering many queries.
+
+    Returns:
+        RegistrySnapshot: A view of the current global metadata.
+    """
+
+    store = _store()
+    if isinstance(store, Registry):
+        return store.snapshot()
+    return RegistrySnapshot(store.export())
+
+
+def transaction() -> AbstractContextManager[None]:
+    """
+    Group registry updates into a single write.
+
+    Returns:
+        AbstractContextManager[None]: A context manager; the updates made
+        while it is open are written once, when it closes. See
+        `Registry.transaction`.
+
+    Example:
+        with registry.transaction():
+            for install_result in results:
+                registry.add_package(install_result)
+    """
+
+    return _store().transaction()
+
+
+def get_many(package_names: Iterable[str]) -> dict[str, dict]:
+    """
+    Retrieve the metadata of several packages from a single read.
+
+    Args:
+        package_names (Iterable[str]): Names of the packages.
+
+    Returns:
+        dict[str, dict]: Entries keyed by name, in the order given; an empty
+        dict for packages that are not installed.
+    """
+
+    return _store().get_many(package_names)
 
 
 def add_package(install_result: result.InstallResult):
@@ -83,28 +1017,26 @@ def add_package(install_result: result.InstallResult):
         install_result (InstallResult): The result of a package installation.
 
     Behavior:
-        Removes any existing entry for the same package/version before adding
-        the new one, ensuring that the metadata reflects only the latest state.
+        Replaces any existing record of the same package/version, ensuring
+        that the metadata reflects only the latest state. The new version
+        becomes the active one, so lookups by name return the most recently
+        installed version. The release asset's URL, size and
+        published sha256 are recorded so the install can be reproduced (see
+        `ayushman.lockfile`).
     """
 
-    data = _read_metadata()
-
-    data["installed_packages"] = [
-        pkg
-        for pkg in data["installed_packages"]
-        if pkg["name"] != install_result.package_name
-        or pkg["version"] != install_result.version
-    ]
-    data["installed_packages"].append(
+    _store().add_version(
+        install_result.package_name,
+        install_result.version,
         {
-            "name": install_result.package_name,
-            "version": install_result.version,
             "install_path": install_result.install_path,
             "zip_file_name": install_result.zip_file_name,
             "metadata_path": install_result.metadata_path,
-        }
+            "asset_url": install_result.asset_url,
+            "asset_size": install_result.asset_size,
+            "sha256": install_result.remote_sha256,
+        },
     )
-    _write_metadata(data)
 
 
 def list_package() -> list[str]:
@@ -115,13 +1047,7 @@ def list_package() -> list[str]:
         list[str]: List of installed packages with their versions.
     """
 
-    data = _read_metadata()
-
-    package_list: list[str] = []
-    for pkg in data["installed_packages"]:
-        package_list.append(f"{pkg['name']} {pkg['version']}")
-
-    return package_list
+    return [f"{pkg['name']} {pkg['version']}" for pkg in _store().entries()]
 
 
 def get_installed_version(package_name: str) -> str | None:
@@ -132,14 +1058,57 @@ def get_installed_version(package_name: str) -> str | None:
         package_name (str): Name of the package.
 
     Returns:
-        str: Installed version if the package exists, otherwise an empty string.
+        str | None: Installed version if the package exists, otherwise None.
+    """
+
+    return _store().get(package_name).get("version")
+
+
+def get_installed_versions(package_name: str) -> list[str]:
+    """
+    Get every recorded version of a package.
+
+    Args:
+        package_name (str): Name of the package.
+
+    Returns:
+        list[str]: Versions, most recently installed or activated first;
+        the first one is the active version. Empty if not installed.
     """
 
-    data: dict = _read_metadata()
-    for pkg in data["installed_packages"]:
-        if pkg["name"] == package_name:
-            return pkg["version"]
-    return None
+    return _store().versions(package_name)
+
+
+def get_active_packages() -> list[dict]:
+    """
+    Get the registry entry of the active version of every package.
+
+    Returns:
+        list[dict]: One entry per installed package, in registry order.
+        Entries written before asset URLs were recorded lack the
+        "asset_url", "asset_size" and "sha256" keys.
+    """
+
+    return _store().active_packages()
+
+
+def activate_version(package_name: str, version: str) -> bool:
+    """
+    Make a recorded version the active version of a package.
+
+    Args:
+        package_name (str): Name of the package.
+        version (str): Version to activate.
+
+    Returns:
+        bool: True if the version was recorded, False otherwise.
+
+    Behavior:
+        Makes it the last, active version of the package. Does not touch the
+        filesystem.
+    """
+
+    return _store().activate(package_name, version)
 
 
 def is_package_installed(package_name: str) -> bool:
@@ -153,11 +1122,7 @@ def is_package_installed(package_name: str) -> bool:
         bool: True if installed, False otherwise.
     """
 
-    data: dict = _read_metadata()
-    for pkg in data["installed_packages"]:
-        if pkg["name"] == package_name:
-            return True
-    return False
+    return bool(_store().get(package_name))
 
 
 def get_package_metadata(package_name: str) -> dict:
@@ -170,11 +1135,8 @@ def get_package_metadata(package_name: str) -> dict:
     Returns:
         dict: Package metadata if found, otherwise an empty dict.
     """
-    data: dict = _read_metadata()
-    for pkg in data["installed_packages"]:
-        if pkg["name"] == package_name:
-            return pkg
-    return {}
+
+    return _store().get(package_name)
 
 
 def remove_package(package_name: str) -> bool:
@@ -191,18 +1153,7 @@ def remove_package(package_name: str) -> bool:
         Only removes the package entry from metadata; does not touch the filesystem.
     """
 
-    data: dict = _read_metadata()
-
-    before: int = len(data["installed_packages"])
-
-    data["installed_packages"] = [
-        pkg for pkg in data["installed_packages"] if pkg["name"] != package_name
-    ]
-
-    removed: bool = before != len(data["installed_packages"])
-    if removed:
-        _write_metadata(data)
-    return removed
+    return _store().remove(package_name)
 
 
 def set_bin_in_path(value: bool) -> None:
@@ -211,11 +1162,12 @@ def set_bin_in_path(value: bool) -> None:
 
     Args:
         value (bool): True if the bin directory has been added to PATH, False otherwise.
+
+    Behavior:
+        Does not rewrite the file if the flag already has this value.
     """
 
-    data: dict = _read_metadata()
-    data["bin_in_path"] = value
-    _write_metadata(data)
+    _store().set_bin_in_path(value)
 
 
 def get_bin_in_path() -> bool:
@@ -226,5 +1178,4 @@ def get_bin_in_path() -> bool:
         bool: True if the bin directory has been added to PATH, False otherwise.
     """
 
-    data: dict = _read_metadata()
-    return data.get("bin_in_path", False)
+    return _store().bin_in_path()
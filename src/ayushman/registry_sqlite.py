@@ -0,0 +1,431 @@
+"""
+SQLite backend for the ayushman registry.
+
+The JSON registry rewrites the whole metadata file on every change, so
+ayushman processes running at the same time take turns on that write and
+can lose each other's updates. This backend keeps the same data in an
+SQLite database in WAL mode instead: every change is a small transaction,
+readers never wait for writers, and lookups by name use an index.
+
+It is selected with `AYUSHMAN_REGISTRY_BACKEND=sqlite` and used through
+the functions in `ayushman.registry`, never directly.
+
+Layout:
+    versions(name, version, seq, record)
+        One row per installed package version. `seq` grows with every
+        install or activation, so a package's active version is its row
+        with the highest `seq`. `record` is the version's JSON record, as
+        in the JSON registry.
+    settings(key, value)
+        Flags such as bin_in_path, as JSON values.
+
+Key behaviors:
+    - Writes run in `BEGIN IMMEDIATE` transactions and wait up to
+      BUSY_TIMEOUT_MS for another process's transaction to finish.
+    - Each thread uses its own connection.
+    - `import_data` copies the JSON registry into an empty database once;
+      the JSON file is left untouched.
+"""
+
+import json
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+__all__ = ["BUSY_TIMEOUT_MS", "SqliteRegistry", "get_registry"]
+
+# How long a write waits for another process's transaction, in milliseconds
+BUSY_TIMEOUT_MS: int = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (name, version)
+);
+CREATE INDEX IF NOT EXISTS versions_by_name_seq ON versions (name, seq);
+CREATE INDEX IF NOT EXISTS versions_by_seq ON versions (seq);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Settings key marking that the JSON registry has been imported
+_IMPORTED_KEY = "imported_json"
+
+
+def _entry(name: str, version: str, record: str) -> dict:
+    """
+    Build the flat entry callers see for one package version.
+
+    Args:
+        name (str): Package name.
+        version (str): Version.
+        record (str): The version's JSON record.
+
+    Returns:
+        dict: "name" and "version" followed by the record's fields.
+    """
+
+    return {"name": name, "version": version, **json.loads(record)}
+
+
+class SqliteRegistry:
+    """
+    Registry stored in an SQLite database.
+
+    Offers the same queries as `ayushman.registry.RegistrySnapshot` and the
+    same updates as `ayushman.registry.Registry`.
+
+    Attributes:
+        path (Path): Location of the database file.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._local = threading.local()
+        self._imported = False
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return this thread's connection, opening it on first use.
+
+        Returns:
+            sqlite3.Connection: A connection in autocommit mode, with WAL
+            journaling and the busy timeout configured.
+        """
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None
+            )
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements in one transaction.
+
+        Args:
+            write (bool): Take the write lock up front (`BEGIN IMMEDIATE`),
+                so the transaction cannot fail halfway on a busy database.
+
+        Yields:
+            sqlite3.Connection: This thread's connection.
+
+        Failure modes:
+            Any exception rolls the transaction back and is re-raised.
+        """
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Accept `ayushman.registry.transaction` blocks.
+
+        Yields:
+            None
+
+        Note:
+            Each update is already one small transaction that writes only
+            its own rows, so there is no whole-file write to save. Updates
+            are not held back: a write transaction spanning the block would
+            block updates from the other threads of a bulk install.
+        """
+
+        yield
+
+    def close(self) -> None:
+        """Close this thread's connection, if it is open."""
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---------- queries ----------
+
+    def get(self, package_name: str) -> dict:
+        """
+        Return the entry of the active version of a package.
+
+        Args:
+            package_name (str): Name of the package.
+
+        Returns:
+            dict: The entry, or an empty dict if the package is not installed.
+        """
+
+        row = (
+            self._connection()
+            .execute(
+                "SELECT name, version, record FROM versions WHERE name = ? "
+                "ORDER BY seq DESC LIMIT 1",
+                (package_name,),
+            )
+            .fetchone()
+        )
+        return _entry(*row) if row else {}
+
+    def get_many(self, package_names: Iterable[str]) -> dict[str, dict]:
+        """
+        Return the entries of the active versions of several packages.
+
+        Args:
+            package_names (Iterable[str]): Names of the packages.
+
+        Returns:
+            dict[str, dict]: Entries keyed by the given names, in the order
+            given; an empty dict for packages that are not installed.
+        """
+
+        with self._transaction():
+            return {name: self.get(name) for name in package_names}
+
+    def versions(self, package_name: str) -> list[str]:
+        """
+        Return every recorded version of a package, the active one first.
+
+        Args:
+            package_name (str): Name of the package.
+
+        Returns:
+            list[str]: Versions; empty if the package is not installed.
+        """
+
+        rows = self._connection().execute(
+            "SELECT version FROM versions WHERE name = ? ORDER BY seq DESC",
+            (package_name,),
+        )
+        return [version for (version,) in rows]
+
+    def entries(self) -> list[dict]:
+        """
+        Return every recorded package version.
+
+        Returns:
+            list[dict]: Entries, most recently changed package first and,
+            within a package, the active version first.
+        """
+
+        rows = self._connection().execute(
+            "SELECT v.name, v.version, v.record FROM versions v "
+            "JOIN (SELECT name, MAX(seq) AS latest FROM versions GROUP BY name) p "
+            "ON p.name = v.name ORDER BY p.latest DESC, v.seq DESC"
+        )
+        return [_entry(*row) for row in rows]
+
+    def active_packages(self) -> list[dict]:
+        """
+        Return the entry of the active version of every package.
+
+        Returns:
+            list[dict]: One entry per installed package, most recently
+            changed first.
+        """
+
+        rows = self._connection().execute(
+            "SELECT v.name, v.version, v.record FROM versions v "
+            "JOIN (SELECT name, MAX(seq) AS latest FROM versions GROUP BY name) p "
+            "ON p.name = v.name AND p.latest = v.seq ORDER BY v.seq DESC"
+        )
+        return [_entry(*row) for row in rows]
+
+    def bin_in_path(self) -> bool:
+        """Return whether the bin directory has been added to the user PATH."""
+
+        row = (
+            self._connection()
+            .execute("SELECT value FROM settings WHERE key = 'bin_in_path'")
+            .fetchone()
+        )
+        return bool(json.loads(row[0])) if row else False
+
+    def export(self) -> dict:
+        """
+        Return the whole registry in the JSON registry's schema.
+
+        Returns:
+            dict: {"packages": ..., plus every setting}, read in one
+            transaction so it is consistent.
+        """
+
+        packages: dict[str, dict] = {}
+        with self._transaction() as conn:
+            for name, version, record in conn.execute(
+                "SELECT name, version, record FROM versions ORDER BY seq"
+            ):
+                package = packages.pop(name, None) or {"versions": {}}
+                package["versions"][version] = json.loads(record)
+                packages[name] = package
+            settings = {
+                key: json.loads(value)
+                for key, value in conn.execute("SELECT key, value FROM settings")
+                if key != _IMPORTED_KEY
+            }
+        return {**settings, "packages": packages}
+
+    # ---------- updates ----------
+
+    def add_version(self, package_name: str, version: str, record: dict) -> None:
+        """
+        Record a package version and make it the active one.
+
+        Args:
+            package_name (str): Name of the package.
+            version (str): Version installed.
+            record (dict): The version's record; replaces any earlier one.
+        """
+
+        with self._transaction(write=True) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO versions (name, version, seq, record) "
+                "VALUES (?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM versions), ?)",
+                (package_name, version, json.dumps(record)),
+            )
+
+    def activate(self, package_name: str, version: str) -> bool:
+        """
+        Make a recorded version the active version of a package.
+
+        Args:
+            package_name (str): Name of the package.
+            version (str): Version to activate.
+
+        Returns:
+            bool: True if the version was recorded, False otherwise.
+        """
+
+        with self._transaction(write=True) as conn:
+            cursor = conn.execute(
+                "UPDATE versions SET seq = "
+                "(SELECT COALESCE(MAX(seq), 0) + 1 FROM versions) "
+                "WHERE name = ? AND version = ?",
+                (package_name, version),
+            )
+            return cursor.rowcount > 0
+
+    def remove(self, package_name: str) -> bool:
+        """
+        Forget every version of a package.
+
+        Args:
+            package_name (str): Name of the package.
+
+        Returns:
+            bool: True if a package was removed, False if it was not found.
+        """
+
+        with self._transaction(write=True) as conn:
+            cursor = conn.execute(
+                "DELETE FROM versions WHERE name = ?", (package_name,)
+            )
+            return cursor.rowcount > 0
+
+    def set_bin_in_path(self, value: bool) -> None:
+        """
+        Set the flag recording whether the bin directory is in the user PATH.
+
+        Args:
+            value (bool): The new value.
+        """
+
+        with self._transaction(write=True) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO settings (key, value) "
+                "VALUES ('bin_in_path', ?)",
+                (json.dumps(bool(value)),),
+            )
+
+    def import_data(self, load: Callable[[], dict]) -> bool:
+        """
+        Copy the JSON registry into the database, once.
+
+        Args:
+            load (Callable[[], dict]): Returns the JSON registry's data in
+                schema version 2; only called if nothing was imported yet.
+
+        Returns:
+            bool: True if data was imported by this call, False if the
+            database had already been initialized.
+
+        Behavior:
+            Runs in one write transaction that first checks and then sets an
+            "imported" marker, so concurrent processes import only once.
+            Versions keep their order, so the same versions stay active.
+        """
+
+        if self._imported:
+            return False
+        with self._transaction(write=True) as conn:
+            done = conn.execute(
+                "SELECT 1 FROM settings WHERE key = ?", (_IMPORTED_KEY,)
+            ).fetchone()
+            if not done:
+                data = load()
+                seq = 0
+                rows = []
+                for name, package in data.get("packages", {}).items():
+                    for version, record in package["versions"].items():
+                        seq += 1
+                        rows.append((name, version, seq, json.dumps(record)))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO versions (name, version, seq, record) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                settings = {
+                    key: value
+                    for key, value in data.items()
+                    if key not in ("packages", "schema_version", "journal_seq")
+                }
+                settings[_IMPORTED_KEY] = True
+                conn.executemany(
+                    "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in settings.items()],
+                )
+        self._imported = True
+        return not done
+
+
+# One SqliteRegistry per database file, so connections are reused
+_registries: dict[Path, SqliteRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(path: str | Path) -> SqliteRegistry:
+    """
+    Return the SqliteRegistry for a database file.
+
+    Args:
+        path (str | Path): Location of the database.
+
+    Returns:
+        SqliteRegistry: The same object for every call with the same path.
+    """
+
+    path = Path(path)
+    with _registries_lock:
+        if path not in _registries:
+            _registries[path] = SqliteRegistry(path)
+        return _registries[path]
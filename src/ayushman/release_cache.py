@@ -0,0 +1,241 @@
+"""
+Release metadata cache for ayushman.
+
+This module stores GitHub API responses (such as `releases/latest`) on disk
+together with their ETag and the time they were fetched, so that repeated
+runs do not use up the API rate limit:
+
+    - Within DEFAULT_TTL seconds, a cached response is served without any
+      request at all.
+    - After that, the request is made conditional with `If-None-Match`. A
+      `304 Not Modified` reply (which GitHub does not count against the rate
+      limit) refreshes the entry and the cached JSON is served.
+    - Failures such as a 404 for an unknown package, or a release without a
+      ZIP asset, are cached for NEGATIVE_TTL seconds so a bad package name
+      does not hit the API on every run.
+
+Layout:
+    <CACHE_DIR>/releases/<key>.json
+"""
+
+import json
+import shutil
+import time
+from pathlib import Path
+
+import requests
+
+import ayushman.global_paths as global_paths
+import ayushman.http_client as http_client
+import ayushman.utils as utils
+
+__all__ = [
+    "DEFAULT_TTL",
+    "NEGATIVE_TTL",
+    "CachedFailure",
+    "get_json",
+    "is_fresh",
+    "mark_failed",
+    "clear",
+]
+
+# Seconds a successful response is served without contacting GitHub
+DEFAULT_TTL: float = 60.0
+
+# Seconds a failed lookup is remembered
+NEGATIVE_TTL: float = 300.0
+
+# HTTP statuses that mean "this does not exist" and are worth remembering
+NEGATIVE_STATUSES: tuple[int, ...] = (404, 410)
+
+
+class CachedFailure(Exception):
+    """Raised when a lookup failed recently and the failure is still cached."""
+
+
+def _now() -> float:
+    """
+    Return the current time used for cache ages.
+
+    Returns:
+        float: Seconds since the epoch.
+    """
+
+    return time.time()
+
+
+def _entry_path(key: str) -> Path:
+    """
+    Return the file that stores the cache entry for `key`.
+
+    Args:
+        key (str): Cache key chosen by the caller, e.g. "occ-latest".
+
+    Returns:
+        Path: <CACHE_DIR>/releases/<key>.json
+    """
+
+    return global_paths.CACHE_DIR / "releases" / f"{key}.json"
+
+
+def _read_entry(key: str) -> dict | None:
+    """
+    Load a cache entry.
+
+    Args:
+        key (str): Cache key.
+
+    Returns:
+        dict | None: The entry, or None if missing or unreadable.
+    """
+
+    try:
+        with open(_entry_path(key)) as f:
+            return json.load(f)
+    except OSError:
+        return None
+    except ValueError:
+        # A truncated entry is treated as a miss and overwritten
+        return None
+
+
+def _write_entry(key: str, entry: dict) -> None:
+    """
+    Store a cache entry, replacing any previous one atomically.
+
+    Args:
+        key (str): Cache key.
+        entry (dict): Entry to store.
+    """
+
+    path = _entry_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    utils.write_json(path, entry, indent=None)
+
+
+def is_fresh(url: str, key: str, ttl: float = DEFAULT_TTL) -> bool:
+    """
+    Tell whether `get_json` would answer from the cache without a request.
+
+    Args:
+        url (str): API URL.
+        key (str): Cache key for this URL.
+        ttl (float): Seconds a cached response is served without a request.
+
+    Returns:
+        bool: True for a response younger than `ttl`, or a failure younger
+        than NEGATIVE_TTL.
+    """
+
+    entry = _read_entry(key)
+    if entry is None or entry.get("url") != url:
+        return False
+    age = _now() - entry.get("fetched_at", 0)
+    if entry.get("error") is not None:
+        return age < NEGATIVE_TTL
+    return age < ttl
+
+
+def get_json(url: str, key: str, headers: dict | None = None, ttl: float = DEFAULT_TTL):
+    """
+    Fetch a JSON API response, using the on-disk cache where possible.
+
+    Args:
+        url (str): API URL to fetch.
+        key (str): Cache key for this URL.
+        headers (dict | None): Extra request headers.
+        ttl (float): Seconds a cached response is served without a request.
+
+    Returns:
+        The decoded JSON body.
+
+    Raises:
+        CachedFailure: If the lookup failed less than NEGATIVE_TTL seconds ago.
+        requests.RequestException: On network errors and HTTP error statuses.
+            Statuses in NEGATIVE_STATUSES are cached before being raised.
+    """
+
+    entry = _read_entry(key)
+    now = _now()
+
+    if entry is not None and entry.get("url") == url:
+        age = now - entry.get("fetched_at", 0)
+        if entry.get("error") is not None:
+            if age < NEGATIVE_TTL:
+                raise CachedFailure(entry["error"])
+        elif age < ttl:
+            return entry["data"]
+    else:
+        entry = None
+
+    request_headers = dict(headers or {})
+    if entry is not None and entry.get("etag"):
+        request_headers["If-None-Match"] = entry["etag"]
+
+    response = http_client.api_get(url, headers=request_headers)
+
+    if response.status_code == 304 and entry is not None:
+        entry["fetched_at"] = now
+        entry["error"] = None
+        _write_entry(key, entry)
+        return entry["data"]
+
+    try:
+        response.raise_for_status()
+    except requests.HTTPError as e:
+        if response.status_code in NEGATIVE_STATUSES:
+            _write_entry(
+                key,
+                {
+                    "url": url,
+                    "etag": None,
+                    "fetched_at": now,
+                    "data": None,
+                    "error": str(e),
+                },
+            )
+        raise
+
+    data = response.json()
+    _write_entry(
+        key,
+        {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "fetched_at": now,
+            "data": data,
+            "error": None,
+        },
+    )
+    return data
+
+
+def mark_failed(key: str, message: str) -> None:
+    """
+    Remember that a cached response could not be used.
+
+    The response data and ETag are kept, so once NEGATIVE_TTL has passed the
+    next lookup is still a conditional request.
+
+    Args:
+        key (str): Cache key of the response.
+        message (str): Error to report while the failure is cached.
+    """
+
+    entry = _read_entry(key)
+    if entry is None:
+        return
+    entry["error"] = message
+    entry["fetched_at"] = _now()
+    _write_entry(key, entry)
+
+
+def clear() -> None:
+    """
+    Remove all cached release metadata.
+
+    Side effects:
+        - Deletes <CACHE_DIR>/releases/ if it exists.
+    """
+
+    shutil.rmtree(global_paths.CACHE_DIR / "releases", ignore_errors=True)
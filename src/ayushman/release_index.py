@@ -0,0 +1,157 @@
+"""
+Per-package release index for ayushman.
+
+Installing a pinned tag (`pkg@v1.2.0`) needs that release's ZIP asset URL
+and sha256. A tagged release rarely changes once published, so this module
+keeps what ayushman has learned about each package's releases on disk, and
+repeated pinned installs resolve without any API call.
+
+Layout:
+    <CACHE_DIR>/releases/<pkg>-index.json
+
+Key behaviors:
+    - Entries are keyed by tag and hold only what installing needs: the tag,
+      publication date, author, and the ZIP asset's name, URL, size and
+      digest. They use the same field names as the GitHub API, so callers
+      can treat an entry like a release response.
+    - `record` merges releases into the index; newer data for a tag
+      replaces older data.
+    - The index lives next to `ayushman.release_cache` entries, so
+      `ayushman cache clear` drops it too.
+
+Note:
+    This module only stores; fetching release pages from GitHub is done by
+    `ayushman.request_url`.
+"""
+
+import json
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+import ayushman.global_paths as global_paths
+import ayushman.utils as utils
+
+__all__ = ["lookup", "record", "list_tags"]
+
+# Keys of a release kept in the index, and of its ZIP asset
+_RELEASE_FIELDS: tuple[str, ...] = ("tag_name", "published_at")
+_ASSET_FIELDS: tuple[str, ...] = ("name", "browser_download_url", "size", "digest")
+
+# Concurrent installs of the same package may record releases at once
+_index_lock = threading.Lock()
+
+
+def _index_path(package: str) -> Path:
+    """
+    Return where a package's release index is stored.
+
+    Args:
+        package (str): Package name.
+
+    Returns:
+        Path: <CACHE_DIR>/releases/<package>-index.json
+    """
+
+    return global_paths.CACHE_DIR / "releases" / f"{package}-index.json"
+
+
+def _read_index(package: str) -> dict:
+    """
+    Read a package's release index.
+
+    Args:
+        package (str): Package name.
+
+    Returns:
+        dict: Release entries keyed by tag; empty if there is no readable
+        index.
+    """
+
+    try:
+        with open(_index_path(package)) as f:
+            data = json.load(f)
+    except OSError:
+        return {}
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _summarize(release: dict) -> dict:
+    """
+    Keep the parts of a GitHub release response that installing needs.
+
+    Args:
+        release (dict): A release object from the GitHub API.
+
+    Returns:
+        dict: The release fields, the author's login and the first ZIP
+        asset, if any, under the API's own field names.
+    """
+
+    summary = {field: release.get(field) for field in _RELEASE_FIELDS}
+    author = release.get("author")
+    summary["author"] = {"login": author.get("login", "")} if author else {}
+    summary["assets"] = [
+        {field: asset.get(field) for field in _ASSET_FIELDS}
+        for asset in release.get("assets", [])
+        if str(asset.get("name", "")).endswith(".zip")
+    ][:1]
+    return summary
+
+
+def lookup(package: str, tag: str) -> dict | None:
+    """
+    Find a release in the local index.
+
+    Args:
+        package (str): Package name.
+        tag (str): Release tag.
+
+    Returns:
+        dict | None: The indexed release, shaped like a GitHub release
+        response, or None if the tag is not indexed.
+    """
+
+    entry = _read_index(package).get(tag)
+    return entry if isinstance(entry, dict) else None
+
+
+def record(package: str, releases: Iterable[dict]) -> None:
+    """
+    Add releases to a package's index.
+
+    Args:
+        package (str): Package name.
+        releases (Iterable[dict]): Release objects from the GitHub API;
+            drafts and releases without a tag are skipped.
+    """
+
+    with _index_lock:
+        index = _read_index(package)
+        for release in releases:
+            if release.get("draft") or not release.get("tag_name"):
+                continue
+            index[release["tag_name"]] = _summarize(release)
+
+        index_path = _index_path(package)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        utils.write_json(index_path, index)
+
+
+def list_tags(package: str) -> list[str]:
+    """
+    List the indexed tags of a package, most recently published first.
+
+    Args:
+        package (str): Package name.
+
+    Returns:
+        list[str]: Indexed tags.
+    """
+
+    index = _read_index(package)
+    return sorted(
+        index, key=lambda tag: index[tag].get("published_at") or "", reverse=True
+    )
@@ -0,0 +1,349 @@
+"""
+Remote ZIP member fetching for ayushman.
+
+Only the `.exe` members of a release ZIP are ever installed, yet some
+releases bundle documentation, licenses or large data files next to the
+executables. This module fetches just the members that are needed, using
+HTTP range requests against the asset URL:
+
+    1. Read the tail of the archive and locate the end-of-central-directory
+       record.
+    2. Read and parse the central directory (the member table).
+    3. Fetch the local header and compressed bytes of each selected member.
+       Members stored next to each other are fetched with a single request.
+
+The fetched records are copied verbatim into a new, smaller ZIP with its own
+central directory, so the regular extraction code can install from it. Every
+member's CRC32 is checked before the ZIP is handed back.
+
+Note:
+    The published sha256 covers the whole archive and cannot be checked on a
+    partial fetch; the CRC32 of each member is the only integrity check.
+    ZIP64 archives, multi-disk archives and encrypted members are not
+    supported and raise RemoteZipError, so callers can fall back to a full
+    download.
+"""
+
+import struct
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+
+import ayushman.http_client as http_client
+
+__all__ = ["RemoteZipError", "RemoteMember", "read_members", "fetch_members"]
+
+# End of central directory record: signature, disk numbers, entry counts,
+# central directory size and offset, comment length
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+
+# Central directory file header, followed by name, extra field and comment
+_CENTRAL = struct.Struct("<4s4B4HL2L5H2L")
+_CENTRAL_SIGNATURE = b"PK\x01\x02"
+
+# Local file header, followed by name and extra field
+_LOCAL = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+# The EOCD record is at most this far from the end (22 bytes + max comment)
+_EOCD_SEARCH: int = _EOCD.size + 0xFFFF
+
+# Offset of the "relative offset of local header" field in a central header
+_CENTRAL_OFFSET_FIELD: int = 42
+
+# Compression methods zipfile can read back for the CRC32 check
+_SUPPORTED_METHODS = frozenset(
+    {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2, zipfile.ZIP_LZMA}
+)
+
+# Members whose data is further apart than this are fetched separately
+MERGE_GAP: int = 64 * 1024
+
+# Bytes read from the network per iteration while reading a range
+READ_CHUNK_SIZE: int = 64 * 1024
+
+
+class RemoteZipError(Exception):
+    """Raised when an archive cannot be read member by member."""
+
+
+class RemoteMember:
+    """
+    One member of a remote archive, as listed in its central directory.
+
+    Attributes:
+        filename (str): Member path inside the archive.
+        header_offset (int): Offset of the member's local header.
+        compress_size (int): Size of the compressed data in bytes.
+        file_size (int): Size of the uncompressed data in bytes.
+        crc (int): CRC32 of the uncompressed data.
+        central_record (bytes): The raw central directory entry.
+        end (int): Offset just past the member's local record, i.e. the
+            start of the next member or of the central directory.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        header_offset: int,
+        compress_size: int,
+        file_size: int,
+        crc: int,
+        central_record: bytes,
+    ) -> None:
+        self.filename = filename
+        self.header_offset = header_offset
+        self.compress_size = compress_size
+        self.file_size = file_size
+        self.crc = crc
+        self.central_record = central_record
+        self.end = header_offset
+
+    def is_dir(self) -> bool:
+        """
+        Returns:
+            bool: Whether the member is a directory entry.
+        """
+
+        return self.filename.endswith("/")
+
+
+def _read_range(url: str, first: int, last: int) -> bytes:
+    """
+    Fetch an inclusive byte range of `url`.
+
+    Args:
+        url (str): Asset URL.
+        first (int): First byte offset.
+        last (int): Last byte offset.
+
+    Returns:
+        bytes: Exactly `last - first + 1` bytes.
+
+    Raises:
+        RemoteZipError: If the server does not answer with the requested range.
+        requests.RequestException: On network errors and error statuses.
+
+    Note:
+        The status and Content-Range are checked before any of the body is
+        read, so a server that ignores Range and sends the whole asset is
+        hung up on instead of downloaded.
+    """
+
+    headers = {"Range": f"bytes={first}-{last}", "Accept-Encoding": "identity"}
+    length = last - first + 1
+    with http_client.get(url, stream=True, headers=headers) as response:
+        response.raise_for_status()
+        content_range = response.headers.get("Content-Range", "")
+        if response.status_code != 206 or not content_range.startswith(
+            f"bytes {first}-{last}/"
+        ):
+            raise RemoteZipError(f"server did not honor range {first}-{last}")
+
+        data = bytearray()
+        for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+            data += chunk
+            if len(data) > length:
+                break
+    if len(data) != length:
+        raise RemoteZipError(f"server did not honor range {first}-{last}")
+    return bytes(data)
+
+
+def read_members(url: str, size: int) -> tuple[list[RemoteMember], int]:
+    """
+    Read the member table of a remote archive.
+
+    Args:
+        url (str): Asset URL.
+        size (int): Exact asset size in bytes.
+
+    Returns:
+        tuple[list[RemoteMember], int]: The members in archive order, and the
+        number of bytes transferred to read them.
+
+    Raises:
+        RemoteZipError: If the archive is not a plain single-disk ZIP or the
+            server does not support ranges.
+        requests.RequestException: On network errors.
+    """
+
+    if size < _EOCD.size:
+        raise RemoteZipError("archive too small")
+
+    tail_start = max(0, size - _EOCD_SEARCH)
+    tail = _read_range(url, tail_start, size - 1)
+    transferred = len(tail)
+
+    eocd_at = tail.rfind(_EOCD_SIGNATURE)
+    if eocd_at < 0 or eocd_at + _EOCD.size > len(tail):
+        raise RemoteZipError("end of central directory not found")
+    (_, disk, cd_disk, disk_entries, entries, cd_size, cd_offset, _) = (
+        _EOCD.unpack_from(tail, eocd_at)
+    )
+    if disk != 0 or cd_disk != 0 or disk_entries != entries:
+        raise RemoteZipError("multi-disk archives are not supported")
+    if entries == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        raise RemoteZipError("ZIP64 archives are not supported")
+    if cd_offset + cd_size > tail_start + eocd_at:
+        raise RemoteZipError("central directory overlaps its end record")
+
+    if cd_offset >= tail_start:
+        directory = tail[cd_offset - tail_start : cd_offset - tail_start + cd_size]
+    else:
+        directory = _read_range(url, cd_offset, cd_offset + cd_size - 1)
+        transferred += len(directory)
+
+    members: list[RemoteMember] = []
+    pos = 0
+    for _ in range(entries):
+        if pos + _CENTRAL.size > len(directory):
+            raise RemoteZipError("truncated central directory")
+        fields = _CENTRAL.unpack_from(directory, pos)
+        if fields[0] != _CENTRAL_SIGNATURE:
+            raise RemoteZipError("bad central directory entry")
+        flag_bits, compress_type = fields[5], fields[6]
+        crc, compress_size, file_size = fields[9], fields[10], fields[11]
+        name_len, extra_len, comment_len = fields[12], fields[13], fields[14]
+        header_offset = fields[18]
+        record_len = _CENTRAL.size + name_len + extra_len + comment_len
+        if 0xFFFFFFFF in (compress_size, file_size, header_offset):
+            raise RemoteZipError("ZIP64 archives are not supported")
+        if flag_bits & 0x1:
+            raise RemoteZipError("encrypted members are not supported")
+        if compress_type not in _SUPPORTED_METHODS:
+            raise RemoteZipError(f"unknown compression method {compress_type}")
+
+        raw_name = directory[pos + _CENTRAL.size : pos + _CENTRAL.size + name_len]
+        filename = raw_name.decode("utf-8" if flag_bits & 0x800 else "cp437")
+        members.append(
+            RemoteMember(
+                filename=filename,
+                header_offset=header_offset,
+                compress_size=compress_size,
+                file_size=file_size,
+                crc=crc,
+                central_record=directory[pos : pos + record_len],
+            )
+        )
+        pos += record_len
+
+    # A member's local record runs up to the next record (or the directory)
+    boundaries = sorted({m.header_offset for m in members} | {cd_offset})
+    for member in members:
+        member.end = boundaries[boundaries.index(member.header_offset) + 1]
+
+    return members, transferred
+
+
+def _coalesce(members: list[RemoteMember]) -> list[list[RemoteMember]]:
+    """
+    Group members whose records are close enough to fetch in one request.
+
+    Args:
+        members (list[RemoteMember]): Selected members.
+
+    Returns:
+        list[list[RemoteMember]]: Groups of members in offset order.
+    """
+
+    groups: list[list[RemoteMember]] = []
+    for member in sorted(members, key=lambda m: m.header_offset):
+        if groups and member.header_offset - groups[-1][-1].end <= MERGE_GAP:
+            groups[-1].append(member)
+        else:
+            groups.append([member])
+    return groups
+
+
+def _check_local_header(record: bytes, member: RemoteMember) -> None:
+    """
+    Make sure a fetched record starts with the member's local header.
+
+    Args:
+        record (bytes): The fetched local record.
+        member (RemoteMember): The member it should belong to.
+
+    Raises:
+        RemoteZipError: If the local header is missing or too short.
+    """
+
+    if len(record) < _LOCAL.size or record[:4] != _LOCAL_SIGNATURE:
+        raise RemoteZipError(f"bad local header for {member.filename}")
+    fields = _LOCAL.unpack_from(record)
+    data_start = _LOCAL.size + fields[10] + fields[11]
+    if data_start + member.compress_size > len(record):
+        raise RemoteZipError(f"truncated record for {member.filename}")
+
+
+def fetch_members(
+    url: str,
+    size: int,
+    dest: str | Path,
+    select: Callable[[str], bool],
+) -> int:
+    """
+    Fetch the selected members of a remote archive into a new local ZIP.
+
+    Args:
+        url (str): Asset URL.
+        size (int): Exact asset size in bytes.
+        dest (str | Path): Path of the ZIP to create.
+        select (Callable[[str], bool]): Called with each member's file name;
+            members for which it returns True are fetched.
+
+    Returns:
+        int: Total number of bytes transferred.
+
+    Raises:
+        RemoteZipError: If the archive cannot be read member by member, or a
+            member fails its CRC32 check.
+        requests.RequestException: On network errors.
+
+    Side effects:
+        - Writes `dest`. It is removed again if a CRC32 check fails.
+    """
+
+    members, transferred = read_members(url, size)
+    selected = [m for m in members if not m.is_dir() and select(m.filename)]
+
+    dest = Path(dest)
+    central: list[bytes] = []
+    with open(dest, "wb") as out:
+        for group in _coalesce(selected):
+            first, last = group[0].header_offset, group[-1].end - 1
+            block = _read_range(url, first, last)
+            transferred += len(block)
+            for member in group:
+                record = block[member.header_offset - first : member.end - first]
+                _check_local_header(record, member)
+                new_offset = out.tell()
+                out.write(record)
+                central.append(
+                    member.central_record[:_CENTRAL_OFFSET_FIELD]
+                    + struct.pack("<L", new_offset)
+                    + member.central_record[_CENTRAL_OFFSET_FIELD + 4 :]
+                )
+
+        cd_offset = out.tell()
+        for record in central:
+            out.write(record)
+        cd_size = out.tell() - cd_offset
+        out.write(
+            _EOCD.pack(
+                _EOCD_SIGNATURE, 0, 0, len(central), len(central), cd_size, cd_offset, 0
+            )
+        )
+
+    try:
+        with zipfile.ZipFile(dest) as zip_ref:
+            bad_member = zip_ref.testzip()
+    except zipfile.BadZipFile as e:
+        dest.unlink()
+        raise RemoteZipError(str(e)) from e
+    if bad_member is not None:
+        dest.unlink()
+        raise RemoteZipError(f"{bad_member} failed its CRC32 check")
+
+    return transferred
@@ -1,60 +1,341 @@
 """
 Download helpers for ayushman.
 
-This module provides functions to fetch the latest release ZIP files for
-packages hosted on the GitHub owner configured in `ayushman.constants`.
-It handles network requests, error handling, and populates InstallResult
-objects with metadata, file paths, and download status.
+This module provides functions to fetch the latest (or a pinned) release ZIP
+files for packages hosted on the GitHub owner configured in
+`ayushman.constants`.
+Resolving a release (one small API call) is kept separate from downloading
+its asset, so callers can skip the download when the installed version is
+already current. Both steps populate InstallResult objects with metadata,
+file paths, and download status.
 
-All downloads are saved to the current working directory. Any failures
+All network traffic goes through the shared session in `ayushman.http_client`.
+All downloads are saved under `<CACHE_DIR>/downloads`, in one directory per
+package and asset URL, as resumable `.part` files and renamed once complete.
+Any failures
 are reported via the InstallResult.error_message field, and the InstallResult
 object is always returned to capture success/failure and relevant data.
 """
 
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable
 from pathlib import Path
+from urllib.parse import quote
 
 import requests
 
 import ayushman.constants as constants
+import ayushman.extract_zip as extract_zip
+import ayushman.file_lock as file_lock
+import ayushman.global_paths as global_paths
+import ayushman.http_client as http_client
+import ayushman.rate_limit as rate_limit
+import ayushman.release_cache as release_cache
+import ayushman.release_index as release_index
+import ayushman.remote_zip as remote_zip
 import ayushman.result as result
+import ayushman.segmented_download as segmented_download
+import ayushman.stream_unzip as stream_unzip
 import ayushman.utils as utils
 
-__all__ = ["download_zip"]
+__all__ = [
+    "resolve_release",
+    "download_asset",
+    "download_zip",
+    "download_executables",
+    "api_requests_needed",
+    "fetch_rate_limit",
+]
 
+# Base URL of the GitHub REST API
+GITHUB_API_URL: str = "https://api.github.com"
 
-def download_zip(package: str) -> result.InstallResult:
+# Releases requested per page when listing a package's releases
+RELEASES_PAGE_SIZE: int = 100
+
+# Most release pages fetched when refreshing a package's release index
+MAX_RELEASE_PAGES: int = 10
+
+# Bytes read from the network per iteration while streaming an asset
+DOWNLOAD_CHUNK_SIZE: int = 64 * 1024
+
+# Headers sent with every GitHub REST API request
+GITHUB_API_HEADERS: dict[str, str] = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
+
+
+def _latest_url(package: str) -> str:
     """
-    Download the latest release ZIP of a package from GitHub.
+    Return the API URL of a package's latest release.
+
+    Args:
+        package (str): Package name.
+
+    Returns:
+        str: The `releases/latest` URL.
+    """
+
+    return f"{GITHUB_API_URL}/repos/{constants.GITHUB_OWNER}/{package}/releases/latest"
+
+
+def _latest_key(package: str) -> str:
+    """
+    Return the release cache key of a package's latest release.
+
+    Args:
+        package (str): Package name.
+
+    Returns:
+        str: "<package>-latest"
+    """
+
+    return f"{package}-latest"
+
+
+def _releases_url(package: str, page: int) -> str:
+    """
+    Return the API URL of one page of a package's releases.
+
+    Args:
+        package (str): Package name.
+        page (int): Page number, starting at 1.
+
+    Returns:
+        str: The `releases` listing URL.
+    """
+
+    return (
+        f"{GITHUB_API_URL}/repos/{constants.GITHUB_OWNER}/{package}/releases"
+        f"?per_page={RELEASES_PAGE_SIZE}&page={page}"
+    )
+
+
+def _tag_url(package: str, tag: str) -> str:
+    """
+    Return the API URL of the release with a given tag.
+
+    Args:
+        package (str): Package name.
+        tag (str): Release tag.
+
+    Returns:
+        str: The `releases/tags/<tag>` URL.
+    """
+
+    return (
+        f"{GITHUB_API_URL}/repos/{constants.GITHUB_OWNER}/{package}"
+        f"/releases/tags/{quote(tag, safe='')}"
+    )
+
+
+def _is_latest(tag: str | None) -> bool:
+    """
+    Tell whether a requested tag means the latest release.
+
+    Args:
+        tag (str | None): Tag from a `pkg@tag` spec, if any.
+
+    Returns:
+        bool: True for no tag and for "latest".
+    """
+
+    return tag is None or tag.lower() == "latest"
+
+
+def api_requests_needed(packages: Iterable[str]) -> int:
+    """
+    Count the GitHub API requests resolving `packages` will make.
+
+    Args:
+        packages (Iterable[str]): Package names or `pkg@tag` specs. As in
+            `install.install_packages`, names are compared without case and
+            only the first spec given for each package counts.
+
+    Returns:
+        int: Number of packages whose latest release is not fresh in the
+        release cache, plus pinned tags missing from the release index.
+        This is an upper bound: releases that fail validation before
+        resolving make no request at all, and a missing tag may take more
+        than one request only for packages with hundreds of releases.
+    """
+
+    specs: dict[str, str | None] = {}
+    for package in packages:
+        name, tag = utils.split_spec(package)
+        specs.setdefault(name, tag)
+    needed = 0
+    for name, tag in specs.items():
+        if _is_latest(tag):
+            fresh = release_cache.is_fresh(_latest_url(name), key=_latest_key(name))
+        else:
+            fresh = release_index.lookup(name, tag) is not None
+        needed += 0 if fresh else 1
+    return needed
+
+
+def fetch_rate_limit() -> rate_limit.Budget | None:
+    """
+    Ask GitHub for the current API budget.
+
+    The `/rate_limit` endpoint does not count against the limit itself. The
+    answer is recorded in `rate_limit.limiter`.
+
+    Returns:
+        Budget | None: The core API budget, or None if it could not be
+        fetched.
+    """
+
+    try:
+        response = http_client.get(
+            f"{GITHUB_API_URL}/rate_limit", headers=GITHUB_API_HEADERS
+        )
+        response.raise_for_status()
+        payload = response.json()
+    except requests.RequestException:
+        # Includes a body that is not valid JSON
+        return None
+
+    core = (
+        payload.get("resources", {}).get("core") if isinstance(payload, dict) else None
+    )
+    if not isinstance(core, dict) or not {"limit", "remaining", "reset"} <= core.keys():
+        return None
+
+    rate_limit.limiter.observe(
+        int(core["limit"]), int(core["remaining"]), float(core["reset"])
+    )
+    return rate_limit.limiter.budget()
+
+
+def _refresh_release_index(package: str) -> None:
+    """
+    List a package's releases page by page and record them in the index.
+
+    Each page goes through `ayushman.release_cache`, so pages that did not
+    change come back as free `304 Not Modified` replies.
+
+    Args:
+        package (str): Package name.
+
+    Raises:
+        requests.RequestException: On network errors and HTTP error statuses.
+        release_cache.CachedFailure: If the listing failed recently.
+    """
+
+    for page in range(1, MAX_RELEASE_PAGES + 1):
+        releases = release_cache.get_json(
+            _releases_url(package, page),
+            key=f"{package}-releases-{page}",
+            headers=GITHUB_API_HEADERS,
+        )
+        if not isinstance(releases, list):
+            return
+        release_index.record(package, releases)
+        if len(releases) < RELEASES_PAGE_SIZE:
+            return
+
+
+def _resolve_tag(package: str, tag: str) -> dict | None:
+    """
+    Find the release with a given tag, from the local index if possible.
+
+    Args:
+        package (str): Package name.
+        tag (str): Release tag.
 
-    This function queries the GitHub API for the latest release of the specified
-    package, finds a ZIP asset, downloads it to the current working directory,
-    and returns an InstallResult containing all relevant information.
+    Returns:
+        dict | None: The release, shaped like a GitHub release response, or
+        None if the package has no release with that tag.
+
+    Raises:
+        requests.RequestException: On network errors and HTTP error statuses.
+        release_cache.CachedFailure: If the listing failed recently.
+
+    Behavior:
+        - An indexed tag resolves without any request.
+        - Otherwise the package's releases are listed (usually one page)
+          and indexed, so later pins of other tags are free as well.
+        - A tag still missing, e.g. beyond MAX_RELEASE_PAGES, is asked for
+          through the `releases/tags/<tag>` endpoint.
+    """
+
+    release = release_index.lookup(package, tag)
+    if release is not None:
+        return release
+
+    _refresh_release_index(package)
+    release = release_index.lookup(package, tag)
+    if release is not None:
+        return release
+
+    try:
+        data = release_cache.get_json(
+            _tag_url(package, tag),
+            key=f"{package}-tag-{quote(tag, safe='')}",
+            headers=GITHUB_API_HEADERS,
+        )
+    except release_cache.CachedFailure:
+        return None
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return None
+        raise
+    release_index.record(package, [data])
+    return release_index.lookup(package, tag)
+
+
+def resolve_release(package: str, tag: str | None = None) -> result.InstallResult:
+    """
+    Resolve a release of a package without downloading its asset.
+
+    Only the GitHub API is queried: the release tag, the ZIP asset URL and
+    its published sha256 are recorded on the returned InstallResult, so the
+    caller can decide whether the asset is worth downloading at all.
 
     Args:
         package (str): The name of the package repository under the GitHub owner
         configured in `ayushman.constants.GITHUB_OWNER`.
+        tag (str | None): Release tag to resolve; None or "latest" resolves
+            the latest release.
 
     Returns:
-        InstallResult: An object containing package information, the local ZIP file name,
-        download success status, error messages (if any), and package metadata.
+        InstallResult: An object containing the release version, the asset file
+        name and URL, the remote sha256 (if published) and package metadata.
 
     Side effects:
-        - Performs HTTP requests to GitHub API and asset URLs.
-        - Writes the ZIP file to the current working directory if found.
+        - For the latest release, performs at most one HTTP request to the
+          GitHub API. Recent and unchanged responses are served from
+          `ayushman.release_cache`.
+        - A pinned tag resolves from `ayushman.release_index` without any
+          request once it has been seen; see `_resolve_tag` otherwise.
+        - Records the resolved release in the release index.
 
     Failure modes:
         - Network issues or bad HTTP status codes.
-        - No ZIP asset found in the latest release.
-        - Failed to download the ZIP due to I/O or network errors.
+        - No release with the requested tag.
+        - No ZIP asset found in the release.
         In these cases, `success` will be False and `error_message` populated.
     """
 
-    url = f"https://api.github.com/repos/{constants.GITHUB_OWNER}/{package}/releases/latest"
+    latest = _is_latest(tag)
+    cache_key = _latest_key(package)
+    release_name = "latest release" if latest else f"release {tag}"
 
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-    except requests.RequestException as e:
+        if latest:
+            data = release_cache.get_json(
+                _latest_url(package), key=cache_key, headers=GITHUB_API_HEADERS
+            )
+            release_index.record(package, [data])
+        else:
+            data = _resolve_tag(package, tag)
+    except (requests.RequestException, release_cache.CachedFailure) as e:
         # Network error or bad status code
         return result.InstallResult(
             package_name=package,
@@ -70,19 +351,32 @@ def download_zip(package: str) -> result.InstallResult:
             hash_verified=False,
         )
 
-    data = response.json()
+    if data is None:
+        return result.InstallResult(
+            package_name=package,
+            version=tag,
+            zip_file_name="",
+            install_path="",
+            success=False,
+            error_message=f"{package} has no release tagged {tag}",
+            metadata={},
+            metadata_path="",
+        )
+
     assets = data.get("assets", [])
     zip_asset = next((a for a in assets if a["name"].endswith(".zip")), None)
 
     if not zip_asset:
         # Zip asset not found in releases
+        if latest:
+            release_cache.mark_failed(cache_key, "No zip asset found in latest release")
         return result.InstallResult(
             package_name=package,
             version=data.get("tag_name", ""),
             zip_file_name="",
             install_path="",
             success=False,
-            error_message="No zip asset found in latest release",
+            error_message=f"No zip asset found in {release_name}",
             metadata=data,
             metadata_path="",
             local_sha256="",
@@ -92,31 +386,6 @@ def download_zip(package: str) -> result.InstallResult:
 
     remote_digest = zip_asset.get("digest", None)
     remote_sha256 = remote_digest.split(":")[1] if remote_digest else None
-    zip_url = zip_asset.get("browser_download_url")
-    local_zip_file_name = zip_asset.get("name")
-    version = data.get("tag_name", "")
-
-    # Download the zip
-    try:
-        with requests.get(zip_url, stream=True) as r:
-            r.raise_for_status()
-            with open(local_zip_file_name, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-    except requests.RequestException as e:
-        return result.InstallResult(
-            package_name=package,
-            version=version,
-            zip_file_name=local_zip_file_name,
-            install_path="",
-            success=False,
-            error_message=f"Failed to download ZIP: {e}",
-            metadata=data,
-            metadata_path="",
-            local_sha256="",
-            remote_sha256=None,
-            hash_verified=False,
-        )
 
     package_metadata = {
         "author": data.get("author", {}).get("login", ""),
@@ -124,25 +393,513 @@ def download_zip(package: str) -> result.InstallResult:
         "published_at": data.get("published_at", ""),
     }
 
-    calculated_local_sha256 = utils.get_sha256(
-        str(Path(local_zip_file_name).absolute().resolve())
-    )
-
-    # Success! Return a fully populated InstallResult
     return result.InstallResult(
         package_name=package,
-        version=version,
-        zip_file_name=local_zip_file_name,
+        version=data.get("tag_name", ""),
+        zip_file_name=zip_asset.get("name"),
         install_path="",  # Will be filled after extraction
         success=True,
         error_message=None,
         metadata=package_metadata,
         metadata_path="",  # Will be filled after extraction
-        local_sha256=calculated_local_sha256,
+        local_sha256="",  # Will be filled after download
         remote_sha256=remote_sha256,
-        hash_verified=(remote_sha256 == calculated_local_sha256),
+        hash_verified=False,
+        asset_url=zip_asset.get("browser_download_url", ""),
+        asset_size=zip_asset.get("size"),
+    )
+
+
+def _downloads_dir() -> Path:
+    """
+    Return the directory where assets are downloaded before installation.
+
+    Returns:
+        Path: <CACHE_DIR>/downloads
+    """
+
+    return global_paths.CACHE_DIR / "downloads"
+
+
+def _asset_dir(package: str, url: str) -> Path:
+    """
+    Return the directory a release asset is downloaded into.
+
+    Two packages whose assets share a name (e.g. `windows-x64.zip`), or two
+    releases of one package, never share a `.part` file.
+
+    Args:
+        package (str): Package name.
+        url (str): Asset URL.
+
+    Returns:
+        Path: <CACHE_DIR>/downloads/<package>-<first 16 hex digits of the
+        URL's sha256>
+    """
+
+    digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+    return _downloads_dir() / f"{Path(package).name}-{digest}"
+
+
+def _read_part_state(state_path: Path) -> dict | None:
+    """
+    Read the sidecar describing a partial download.
+
+    Args:
+        state_path (Path): Path of the `.part.json` sidecar.
+
+    Returns:
+        dict | None: The recorded url, size and etag, or None if the sidecar
+        is missing or unreadable.
+    """
+
+    try:
+        with open(state_path) as f:
+            return json.load(f)
+    except OSError:
+        return None
+    except ValueError:
+        # Sidecar was truncated or is not valid JSON
+        return None
+
+
+def _discard_part(part_path: Path, state_path: Path) -> None:
+    """
+    Delete a partial download and its sidecar.
+
+    Args:
+        part_path (Path): Path of the `.part` file.
+        state_path (Path): Path of the `.part.json` sidecar.
+    """
+
+    part_path.unlink(missing_ok=True)
+    state_path.unlink(missing_ok=True)
+
+
+def _hash_existing(
+    part_path: Path,
+    hash_object,
+    extractor: stream_unzip.StreamExtractor | None = None,
+) -> None:
+    """
+    Feed the bytes already on disk into a running hash.
+
+    Args:
+        part_path (Path): The partial download being resumed.
+        hash_object: A hashlib object to update.
+        extractor (StreamExtractor | None): Also fed the bytes, so streaming
+            extraction picks up where the download resumes.
+    """
+
+    with open(part_path, "rb") as f:
+        while chunk := f.read(utils.HASH_BUFFER_SIZE):
+            hash_object.update(chunk)
+            if extractor is not None:
+                extractor.feed(chunk)
+
+
+def _content_range_start(response: requests.Response) -> int | None:
+    """
+    Return the first byte position of a 206 response.
+
+    Args:
+        response (requests.Response): A partial-content response.
+
+    Returns:
+        int | None: The start offset from Content-Range, or None if absent.
+    """
+
+    content_range = response.headers.get("Content-Range", "")
+    if not content_range.startswith("bytes "):
+        return None
+    start, _, _ = content_range[len("bytes ") :].partition("-")
+    return int(start) if start.isdigit() else None
+
+
+def _fetch_to_part(
+    url: str,
+    part_path: Path,
+    state_path: Path,
+    expected_size: int | None,
+    extractor: stream_unzip.StreamExtractor | None = None,
+):
+    """
+    Download `url` into `part_path`, resuming a previous attempt if possible.
+
+    A previous attempt is resumed only when its sidecar records the same URL
+    and asset size. The request then carries `Range` and, when an ETag was
+    recorded, `If-Range`, so a changed asset is sent in full instead.
+
+    Args:
+        url (str): Asset URL.
+        part_path (Path): Path of the `.part` file.
+        state_path (Path): Path of the `.part.json` sidecar.
+        expected_size (int | None): Asset size published by the API.
+        extractor (StreamExtractor | None): Fed every byte of the file in
+            order, including bytes kept from a previous attempt.
+
+    Returns:
+        tuple: The sha256 hex digest of the whole file and the number of
+        bytes in `part_path`.
+
+    Raises:
+        requests.RequestException: On network errors. The partial file and
+        its sidecar are kept so that the next attempt can resume.
+    """
+
+    state = _read_part_state(state_path)
+    offset = 0
+    if (
+        part_path.exists()
+        and state is not None
+        and state.get("url") == url
+        and state.get("size") == expected_size
+    ):
+        offset = part_path.stat().st_size
+    if offset == 0 or (expected_size is not None and offset > expected_size):
+        _discard_part(part_path, state_path)
+        offset = 0
+
+    hash_object = hashlib.sha256()
+    if extractor is not None:
+        extractor.reset()
+    if expected_size is not None and offset == expected_size and offset > 0:
+        # A previous attempt finished writing but was stopped before renaming
+        _hash_existing(part_path, hash_object, extractor)
+        return hash_object.hexdigest(), offset
+
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        if state.get("etag"):
+            headers["If-Range"] = state["etag"]
+
+    with http_client.get(url, stream=True, headers=headers) as r:
+        if offset and (
+            r.status_code == 416
+            or (r.status_code == 206 and _content_range_start(r) != offset)
+        ):
+            # The server cannot continue from our offset; start over
+            _discard_part(part_path, state_path)
+            return _fetch_to_part(url, part_path, state_path, expected_size, extractor)
+        r.raise_for_status()
+
+        if r.status_code == 206:
+            _hash_existing(part_path, hash_object, extractor)
+            mode = "ab"
+        else:
+            # Full response: Range unsupported, or the asset changed
+            offset = 0
+            mode = "wb"
+            with open(state_path, "w") as f:
+                json.dump(
+                    {"url": url, "size": expected_size, "etag": r.headers.get("ETag")},
+                    f,
+                )
+
+        # Hash each chunk as it is written so the file never has to be read
+        # back from disk
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                hash_object.update(chunk)
+                if extractor is not None:
+                    extractor.feed(chunk)
+                offset += len(chunk)
+
+    return hash_object.hexdigest(), offset
+
+
+def _fetch_segmented(
+    url: str, part_path: Path, state_path: Path, size: int, segments: int
+):
+    """
+    Try a segmented download into `part_path`.
+
+    Args:
+        url (str): Asset URL.
+        part_path (Path): Path of the `.part` file.
+        state_path (Path): Path of the `.part.json` sidecar.
+        size (int): Asset size published by the API.
+        segments (int): Number of concurrent connections.
+
+    Returns:
+        tuple | None: The sha256 hex digest and size on success, or None if
+        the server does not support ranges and a single-stream download
+        should be used instead.
+
+    Raises:
+        requests.RequestException: On network errors.
+    """
+
+    # Segments are written out of order, so they cannot be resumed
+    _discard_part(part_path, state_path)
+    try:
+        digest = segmented_download.download_segmented(url, part_path, size, segments)
+    except segmented_download.RangeNotSupportedError:
+        _discard_part(part_path, state_path)
+        return None
+    except BaseException:
+        _discard_part(part_path, state_path)
+        raise
+
+    return digest, size
+
+
+def download_asset(
+    install_result: result.InstallResult,
+    segments: int = 1,
+    extractor: stream_unzip.StreamExtractor | None = None,
+) -> result.InstallResult:
+    """
+    Download the release asset described by a resolved InstallResult.
+
+    The asset is streamed into `<asset dir>/<asset>.part` next to a
+    `<asset>.part.json` sidecar recording its URL, expected size and ETag,
+    where the asset dir is keyed by package and asset URL (see
+    `_asset_dir`). If the transfer is interrupted, both are kept and the
+    next attempt resumes with an HTTP Range request. The sha256 always
+    covers the complete file.
+
+    The `.part` file is only touched while holding `<asset>.lock`. If another
+    process or worker is already downloading the same asset, this download
+    goes to a private temporary directory instead and is not resumable.
+
+    With segments > 1, assets of at least SEGMENT_THRESHOLD bytes are
+    fetched over several concurrent range requests instead (see
+    `ayushman.segmented_download`). If the server ignores ranges, the
+    download falls back to a single stream.
+
+    Args:
+        install_result (InstallResult): A successful result from
+            `resolve_release`. Must include asset_url and zip_file_name.
+        segments (int): Number of connections for large assets. 1 disables
+            segmented downloads.
+        extractor (StreamExtractor | None): Extracts members while a
+            single-stream download is in progress. Segmented downloads
+            arrive out of order, so the extractor is abandoned for them.
+
+    Returns:
+        InstallResult: The same object, updated with:
+            - zip_file_name: Path of the completed download
+            - local_sha256: sha256 of the downloaded file, computed while
+              streaming
+            - hash_verified: Whether it matches the published sha256
+            - success / error_message: Download status
+
+    Side effects:
+        - Performs an HTTP request to the asset URL.
+        - Writes the ZIP file to a directory under `<CACHE_DIR>/downloads`.
+
+    Failure modes:
+        Network or I/O errors set `success` to False and populate
+        `error_message`. A partial download is kept for the next attempt,
+        unless it was made in a private directory.
+    """
+
+    asset_dir = _asset_dir(install_result.package_name, install_result.asset_url)
+    asset_dir.mkdir(parents=True, exist_ok=True)
+    asset_name = Path(install_result.zip_file_name).name
+
+    part_lock = file_lock.FileLock(asset_dir / (asset_name + ".lock"))
+    if not part_lock.acquire(blocking=False):
+        # Someone else owns the .part file; download without touching it
+        private_dir = Path(
+            tempfile.mkdtemp(prefix=asset_dir.name + ".", dir=_downloads_dir())
+        )
+        try:
+            install_result = _download_to(
+                install_result, private_dir / asset_name, segments, extractor, False
+            )
+        finally:
+            if not install_result.success:
+                shutil.rmtree(private_dir, ignore_errors=True)
+        return install_result
+
+    try:
+        install_result = _download_to(
+            install_result, asset_dir / asset_name, segments, extractor, True
+        )
+    finally:
+        # A finished download leaves no .part file for the lock to guard
+        part_lock.release(remove=install_result.success)
+    return install_result
+
+
+def _download_to(
+    install_result: result.InstallResult,
+    final_path: Path,
+    segments: int,
+    extractor: stream_unzip.StreamExtractor | None,
+    resumable: bool,
+) -> result.InstallResult:
+    """
+    Download the asset of `install_result` to `final_path`.
+
+    Args:
+        install_result (InstallResult): As for `download_asset`.
+        final_path (Path): Where the completed download is renamed to. The
+            `.part` file and its sidecar are kept next to it.
+        segments (int): As for `download_asset`.
+        extractor (StreamExtractor | None): As for `download_asset`.
+        resumable (bool): Whether a partial download is kept on failure.
+
+    Returns:
+        InstallResult: The same object, updated as described in
+        `download_asset`.
+    """
+
+    part_path = final_path.with_name(final_path.name + ".part")
+    state_path = final_path.with_name(final_path.name + ".part.json")
+    expected_size = install_result.asset_size
+
+    try:
+        fetched = None
+        if (
+            segments > 1
+            and expected_size is not None
+            and expected_size >= segmented_download.SEGMENT_THRESHOLD
+        ):
+            if extractor is not None:
+                extractor.abandon()
+            fetched = _fetch_segmented(
+                install_result.asset_url,
+                part_path,
+                state_path,
+                expected_size,
+                segments,
+            )
+        if fetched is None:
+            fetched = _fetch_to_part(
+                install_result.asset_url,
+                part_path,
+                state_path,
+                expected_size,
+                extractor if extractor is not None and extractor.active else None,
+            )
+        calculated_local_sha256, size = fetched
+    except requests.RequestException as e:
+        install_result.success = False
+        install_result.error_message = f"Failed to download ZIP: {e}"
+        if resumable and part_path.exists() and part_path.stat().st_size > 0:
+            install_result.error_message += (
+                " (partial download kept, run again to resume)"
+            )
+        return install_result
+
+    if expected_size is not None and size != expected_size:
+        _discard_part(part_path, state_path)
+        install_result.success = False
+        install_result.error_message = (
+            f"Failed to download ZIP: expected {expected_size} bytes, got {size}"
+        )
+        return install_result
+
+    os.replace(part_path, final_path)
+    state_path.unlink(missing_ok=True)
+
+    install_result.zip_file_name = str(final_path)
+    install_result.local_sha256 = calculated_local_sha256
+    install_result.hash_verified = (
+        install_result.remote_sha256 == calculated_local_sha256
+    )
+    install_result.success = True
+    install_result.error_message = None
+    return install_result
+
+
+def download_executables(install_result: result.InstallResult) -> result.InstallResult:
+    """
+    Fetch only the `.exe` members of a resolved release asset.
+
+    The member table is read with range requests and only the records of
+    executables are transferred (see `ayushman.remote_zip`). They are
+    written to `<asset>.exe-only.zip` in a new directory under
+    `<CACHE_DIR>/downloads`, which the regular extraction code can install
+    from.
+
+    Args:
+        install_result (InstallResult): A successful result from
+            `resolve_release`. Must include asset_url and asset_size.
+
+    Returns:
+        InstallResult: The same object, updated with:
+            - zip_file_name: Path of the reduced ZIP
+            - partial_fetch: True
+            - hash_verified: False, the published sha256 covers the whole
+              archive; each member's CRC32 has been checked instead
+            - success / error_message: Download status
+
+    Raises:
+        remote_zip.RemoteZipError: If the archive cannot be read member by
+            member (ZIP64, no range support, CRC32 mismatch...). Callers
+            should fall back to `download_asset`.
+
+    Failure modes:
+        Network errors set `success` to False and populate `error_message`.
+    """
+
+    if install_result.asset_size is None:
+        raise remote_zip.RemoteZipError("asset size unknown")
+
+    # Not resumable, so each fetch gets a directory of its own
+    downloads_dir = _downloads_dir()
+    downloads_dir.mkdir(parents=True, exist_ok=True)
+    asset_dir = _asset_dir(install_result.package_name, install_result.asset_url)
+    dest = Path(tempfile.mkdtemp(prefix=asset_dir.name + ".", dir=downloads_dir)) / (
+        Path(install_result.zip_file_name).stem + ".exe-only.zip"
     )
 
+    try:
+        remote_zip.fetch_members(
+            install_result.asset_url,
+            install_result.asset_size,
+            dest,
+            select=extract_zip.is_executable,
+        )
+    except requests.RequestException as e:
+        shutil.rmtree(dest.parent, ignore_errors=True)
+        install_result.success = False
+        install_result.error_message = f"Failed to download ZIP: {e}"
+        return install_result
+    except remote_zip.RemoteZipError:
+        shutil.rmtree(dest.parent, ignore_errors=True)
+        raise
+
+    install_result.zip_file_name = str(dest)
+    install_result.local_sha256 = None
+    install_result.hash_verified = False
+    install_result.partial_fetch = True
+    install_result.success = True
+    install_result.error_message = None
+    return install_result
+
+
+def download_zip(package: str) -> result.InstallResult:
+    """
+    Download the latest release ZIP of a package from GitHub.
+
+    Convenience wrapper that runs `resolve_release` followed by
+    `download_asset`.
+
+    Args:
+        package (str): The name of the package repository under the GitHub owner
+        configured in `ayushman.constants.GITHUB_OWNER`.
+
+    Returns:
+        InstallResult: An object containing package information, the local ZIP file name,
+        download success status, error messages (if any), and package metadata.
+
+    Side effects:
+        - Performs HTTP requests to GitHub API and asset URLs.
+        - Writes the ZIP file to `<CACHE_DIR>/downloads` if found.
+    """
+
+    install_result = resolve_release(package)
+    if not install_result.success:
+        return install_result
+    return download_asset(install_result)
+
 
 if __name__ == "__main__":
     result_obj = download_zip("PDF-Toolkit")
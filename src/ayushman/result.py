@@ -34,6 +34,19 @@ class InstallResult:
         remote_sha256 (str | None): sha256 as received in response from Github.
         hash_verified (bool): Whether sha256 calculated locally and received from Github match or not.
         metadata_path (str): Path to the per-package metadata JSON file.
+        asset_url (str): Download URL of the release ZIP asset.
+        asset_size (int | None): Size of the release ZIP asset in bytes, if known.
+        from_cache (bool): Whether the ZIP came from the local download cache.
+        up_to_date (bool): Whether the latest version was already installed.
+        previous_version (str | None): Version replaced by an upgrade, if any.
+        partial_fetch (bool): Whether only the .exe members were fetched from
+            the remote ZIP; they are checked by CRC32 instead of sha256.
+        staged_files (dict): Members already extracted while downloading,
+            keyed by their name in the archive (see `ayushman.stream_unzip`).
+        reused_files (list[str]): Executables hard-linked from the object
+            store or the previous version instead of being extracted again.
+        link_strategy (str | None): How the bin entry was created: one of
+            the strategies in `ayushman.link`, None if none was created.
     """
 
     def __init__(
@@ -49,6 +62,15 @@ class InstallResult:
         local_sha256: str = "",
         remote_sha256: str | None = None,
         hash_verified: bool = False,
+        asset_url: str = "",
+        asset_size: int | None = None,
+        from_cache: bool = False,
+        up_to_date: bool = False,
+        previous_version: str | None = None,
+        partial_fetch: bool = False,
+        staged_files: dict | None = None,
+        reused_files: list[str] | None = None,
+        link_strategy: str | None = None,
     ) -> None:
         self.package_name = package_name
         self.version = version
@@ -61,6 +83,15 @@ class InstallResult:
         self.error_message = error_message
         self.metadata = metadata
         self.metadata_path = metadata_path
+        self.asset_url = asset_url
+        self.asset_size = asset_size
+        self.from_cache = from_cache
+        self.up_to_date = up_to_date
+        self.previous_version = previous_version
+        self.partial_fetch = partial_fetch
+        self.staged_files = staged_files or {}
+        self.reused_files = reused_files or []
+        self.link_strategy = link_strategy
 
 
 class UninstallResult:
@@ -74,6 +105,8 @@ class UninstallResult:
         removed_bins (list[str]): List of executable paths that were deleted.
         removed_packages (list[str]): List of package directories that were deleted.
         error_message (str): Error message if uninstallation failed.
+        freed_bytes (int): Bytes freed by removing stored executables that
+            no other version links to.
     """
 
     def __init__(
@@ -84,6 +117,7 @@ class UninstallResult:
         removed_bins: list[str] | None = None,
         removed_packages: list[str] | None = None,
         error_message: str = "",
+        freed_bytes: int = 0,
     ):
         self.package_name = package_name
         self.versions = versions
@@ -91,3 +125,4 @@ class UninstallResult:
         self.removed_bins = removed_bins or []
         self.removed_packages = removed_packages or []
         self.error_message = error_message
+        self.freed_bytes = freed_bytes
@@ -0,0 +1,170 @@
+"""
+Segmented downloads for ayushman.
+
+This module downloads a single large release asset over several HTTP
+connections at once. The asset is split into contiguous byte ranges, each
+range is fetched with its own `Range` request, and every worker writes its
+bytes straight into the right place of a preallocated file. On high-latency
+links this uses bandwidth that a single stream cannot.
+
+Segmented downloads are opt-in and only used for assets of at least
+SEGMENT_THRESHOLD bytes. If the server answers a range request with anything
+but a matching 206, RangeNotSupportedError is raised so the caller can fall
+back to a regular single-stream download.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+import ayushman.http_client as http_client
+import ayushman.utils as utils
+
+__all__ = [
+    "SEGMENT_THRESHOLD",
+    "RangeNotSupportedError",
+    "split_ranges",
+    "download_segmented",
+]
+
+# Assets smaller than this are always downloaded over a single connection
+SEGMENT_THRESHOLD: int = 32 * 1024 * 1024
+
+# Segments are never made smaller than this, whatever the requested count
+MIN_SEGMENT_SIZE: int = 1024 * 1024
+
+# Bytes read from the network per iteration within a segment
+CHUNK_SIZE: int = 64 * 1024
+
+
+class RangeNotSupportedError(Exception):
+    """Raised when the server does not honor byte-range requests."""
+
+
+def split_ranges(size: int, segments: int) -> list[tuple[int, int]]:
+    """
+    Split `size` bytes into contiguous, inclusive byte ranges.
+
+    Args:
+        size (int): Total number of bytes.
+        segments (int): Desired number of ranges.
+
+    Returns:
+        list[tuple[int, int]]: (first, last) byte offsets, in order. Fewer
+        ranges are returned when segments would be smaller than
+        MIN_SEGMENT_SIZE.
+    """
+
+    if size <= 0:
+        return []
+    segments = max(1, min(segments, size // MIN_SEGMENT_SIZE or 1))
+    step = -(-size // segments)
+    return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+
+def _content_range(headers) -> tuple[int, int] | None:
+    """
+    Parse the first and last byte offsets from a Content-Range header.
+
+    Args:
+        headers: Response headers.
+
+    Returns:
+        tuple[int, int] | None: (first, last), or None if missing or malformed.
+    """
+
+    value = headers.get("Content-Range", "")
+    if not value.startswith("bytes "):
+        return None
+    span = value[len("bytes ") :].split("/", 1)[0]
+    first, _, last = span.partition("-")
+    if not (first.isdigit() and last.isdigit()):
+        return None
+    return int(first), int(last)
+
+
+def _fetch_range(
+    url: str, dest: Path, first: int, last: int, cancelled: threading.Event
+) -> None:
+    """
+    Fetch one byte range and write it at its offset in `dest`.
+
+    Args:
+        url (str): Asset URL.
+        dest (Path): Preallocated destination file.
+        first (int): First byte offset (inclusive).
+        last (int): Last byte offset (inclusive).
+        cancelled (threading.Event): Set when another segment failed.
+
+    Raises:
+        RangeNotSupportedError: If the server ignored or misanswered the range.
+        requests.RequestException: On network errors, including a
+            connection closed before the whole range was received.
+    """
+
+    headers = {"Range": f"bytes={first}-{last}", "Accept-Encoding": "identity"}
+    with http_client.get(url, stream=True, headers=headers) as r:
+        if r.status_code != 206 or _content_range(r.headers) != (first, last):
+            r.raise_for_status()
+            raise RangeNotSupportedError(
+                f"server answered range {first}-{last} with status {r.status_code}"
+            )
+
+        written = 0
+        with open(dest, "r+b") as f:
+            f.seek(first)
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if cancelled.is_set():
+                    return
+                f.write(chunk)
+                written += len(chunk)
+
+    if written != last - first + 1:
+        # A network error like any other, so callers report it as one
+        raise requests.exceptions.ChunkedEncodingError(
+            f"segment {first}-{last} incomplete: got {written} of {last - first + 1} bytes"
+        )
+
+
+def download_segmented(url: str, dest: str | Path, size: int, segments: int) -> str:
+    """
+    Download `url` into `dest` over several concurrent range requests.
+
+    Args:
+        url (str): Asset URL.
+        dest (str | Path): Destination file; created or overwritten.
+        size (int): Exact asset size in bytes.
+        segments (int): Number of concurrent connections to use.
+
+    Returns:
+        str: sha256 hex digest of the complete file, computed once all
+        segments have been written.
+
+    Raises:
+        RangeNotSupportedError: If the server does not support ranges. The
+            destination may contain partial data and should be discarded.
+        requests.RequestException: On network errors or short segments.
+        OSError: On I/O errors.
+    """
+
+    dest = Path(dest)
+    with open(dest, "wb") as f:
+        f.truncate(size)
+
+    ranges = split_ranges(size, segments)
+    cancelled = threading.Event()
+    with ThreadPoolExecutor(max_workers=max(1, len(ranges))) as executor:
+        futures = [
+            executor.submit(_fetch_range, url, dest, first, last, cancelled)
+            for first, last in ranges
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            cancelled.set()
+            raise
+
+    return utils.get_sha256(str(dest))
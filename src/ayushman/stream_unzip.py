@@ -0,0 +1,400 @@
+"""
+Streaming ZIP extraction for ayushman.
+
+A ZIP archive starts with its members, each preceded by a local file
+header; the central directory only follows at the very end. This module
+parses those local headers as the download arrives and writes the wanted
+members (the `.exe` files) to a staging directory while the rest of the
+archive is still in flight, so extraction overlaps with the download.
+
+Key behaviors:
+    - Chunks are fed in download order through `StreamExtractor.feed`.
+    - Selected members are decompressed into the staging directory with
+      their CRC32 and size computed along the way.
+    - Members that are not selected are skipped without being decompressed
+      whenever their size is known up front.
+    - Anything the parser cannot handle (ZIP64, encryption, unknown
+      compression, stored members with a trailing data descriptor, corrupt
+      headers) makes it give up quietly. Extraction then happens from the
+      finished download as usual.
+
+Note:
+    Staged members are only trusted once the download is complete and its
+    sha256 checked: `ayushman.extract_zip` compares each one's CRC32 and size
+    with the central directory before moving it into place, and extracts any
+    member that does not match from the archive itself.
+"""
+
+import os
+import struct
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+
+__all__ = ["StagedMember", "StreamExtractor"]
+
+# Local file header, followed by name and extra field
+_LOCAL = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+# Signatures that end the member section of an archive
+_CENTRAL_SIGNATURE = b"PK\x01\x02"
+_EOCD_SIGNATURE = b"PK\x05\x06"
+
+# Optional signature in front of a data descriptor
+_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+
+# Most bytes of decompressed output produced per decompress call
+_OUTPUT_CHUNK: int = 1024 * 1024
+
+_STORED = 0
+_DEFLATED = 8
+
+
+class StagedMember:
+    """
+    An archive member extracted while the archive was downloading.
+
+    Attributes:
+        path (Path): Staged file holding the uncompressed data.
+        crc (int): CRC32 of the data written.
+        size (int): Number of bytes written.
+    """
+
+    def __init__(self, path: Path, crc: int, size: int) -> None:
+        self.path = path
+        self.crc = crc
+        self.size = size
+
+
+class _GiveUp(Exception):
+    """Raised internally when the stream cannot be parsed any further."""
+
+
+# Errors that make the extractor give up instead of failing the download
+_PARSE_ERRORS = (_GiveUp, zlib.error, OSError, UnicodeDecodeError)
+
+
+class _PendingMember:
+    """
+    Parser state for the member whose data is currently streaming in.
+
+    Attributes:
+        name (str): Member name in the archive.
+        crc (int): CRC32 from the local header (unused with a descriptor).
+        file_size (int): Uncompressed size from the local header.
+        remaining (int | None): Compressed bytes still to come, or None when
+            a data descriptor follows the data.
+        selected (bool): Whether the member is being extracted.
+        decompressor: zlib decompressor, or None for data that is copied or
+            skipped as is.
+        in_descriptor (bool): Whether the data is done and the data
+            descriptor is being read.
+        path (Path | None): Staged file of a selected member.
+        file: Open handle on `path`.
+        written_crc (int): CRC32 of the bytes written so far.
+        written (int): Number of bytes written so far.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        crc: int,
+        file_size: int,
+        remaining: int | None,
+        selected: bool,
+        decompressor,
+    ) -> None:
+        self.name = name
+        self.crc = crc
+        self.file_size = file_size
+        self.remaining = remaining
+        self.selected = selected
+        self.decompressor = decompressor
+        self.in_descriptor = False
+        self.path: Path | None = None
+        self.file = None
+        self.written_crc = 0
+        self.written = 0
+
+
+class StreamExtractor:
+    """
+    Incremental parser that extracts selected members from a ZIP stream.
+
+    Args:
+        staging_dir (str | Path): Directory for extracted members; created
+            if needed.
+        select (Callable[[str], bool]): Called with each member's file name;
+            members for which it returns True are extracted.
+
+    Attributes:
+        active (bool): False once the parser gave up; `staged` then stays
+            empty.
+    """
+
+    def __init__(self, staging_dir: str | Path, select: Callable[[str], bool]) -> None:
+        self._staging_dir = Path(staging_dir)
+        self._select = select
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget everything seen so far, e.g. when a download starts over.
+        """
+
+        self._close_member()
+        self.active = True
+        self._buffer = bytearray()
+        self._done = False
+        self._member = None
+        self._staged: dict[str, StagedMember] = {}
+        self._count = 0
+
+    def abandon(self) -> None:
+        """
+        Stop extracting; the archive will be extracted after the download.
+        """
+
+        self._close_member()
+        self.active = False
+        self._buffer = bytearray()
+        self._staged = {}
+
+    @property
+    def staged(self) -> dict[str, StagedMember]:
+        """
+        Members fully extracted so far, keyed by their name in the archive.
+
+        Returns:
+            dict[str, StagedMember]: Empty if the parser gave up.
+        """
+
+        return dict(self._staged) if self.active else {}
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Process the next chunk of the archive.
+
+        Never raises: if the stream cannot be parsed, the extractor gives up
+        and the download carries on undisturbed.
+
+        Args:
+            chunk (bytes): The next bytes of the archive, in order.
+        """
+
+        if not self.active or self._done:
+            return
+        self._buffer += chunk
+        try:
+            self._parse()
+        except _PARSE_ERRORS:
+            self.abandon()
+
+    # ---------- Parser ----------
+
+    def _parse(self) -> None:
+        """Advance through the buffer as far as its contents allow."""
+
+        while not self._done:
+            if self._member is None:
+                if not self._read_header():
+                    return
+            elif not self._member.in_descriptor:
+                if not self._read_data():
+                    return
+            elif not self._read_descriptor():
+                return
+
+    def _read_header(self) -> bool:
+        """
+        Parse the next local file header, or notice the end of the members.
+
+        Returns:
+            bool: True if a header was consumed.
+        """
+
+        if len(self._buffer) < 4:
+            return False
+        signature = bytes(self._buffer[:4])
+        if signature in (_CENTRAL_SIGNATURE, _EOCD_SIGNATURE):
+            self._done = True
+            self._buffer = bytearray()
+            return False
+        if signature != _LOCAL_SIGNATURE:
+            raise _GiveUp("unexpected signature")
+        if len(self._buffer) < _LOCAL.size:
+            return False
+
+        fields = _LOCAL.unpack_from(self._buffer)
+        flag_bits, method = fields[3], fields[4]
+        crc, compress_size, file_size = fields[7], fields[8], fields[9]
+        name_len, extra_len = fields[10], fields[11]
+        header_len = _LOCAL.size + name_len + extra_len
+        if len(self._buffer) < header_len:
+            return False
+
+        raw_name = bytes(self._buffer[_LOCAL.size : _LOCAL.size + name_len])
+        name = raw_name.decode("utf-8" if flag_bits & 0x800 else "cp437")
+        del self._buffer[:header_len]
+
+        if flag_bits & 0x1:
+            raise _GiveUp("encrypted member")
+        if 0xFFFFFFFF in (compress_size, file_size):
+            raise _GiveUp("ZIP64 member")
+        has_descriptor = bool(flag_bits & 0x8)
+        selected = not name.endswith("/") and self._select(name)
+
+        if has_descriptor and method != _DEFLATED:
+            # Only deflate marks its own end; the size comes after the data
+            raise _GiveUp("data descriptor without deflate")
+        if (selected or has_descriptor) and method not in (_STORED, _DEFLATED):
+            raise _GiveUp(f"unsupported compression method {method}")
+
+        member = _PendingMember(
+            name=name,
+            crc=crc,
+            file_size=file_size,
+            remaining=None if has_descriptor else compress_size,
+            selected=selected,
+            decompressor=(
+                zlib.decompressobj(-15)
+                if method == _DEFLATED and (selected or has_descriptor)
+                else None
+            ),
+        )
+        if selected:
+            self._staging_dir.mkdir(parents=True, exist_ok=True)
+            self._count += 1
+            member.path = self._staging_dir / f"{self._count}.stage"
+            member.file = open(member.path, "wb")
+        self._member = member
+        return True
+
+    def _read_data(self) -> bool:
+        """
+        Consume buffered data of the current member.
+
+        Returns:
+            bool: True once the member's data is complete.
+        """
+
+        member = self._member
+        if not self._buffer:
+            return False
+
+        remaining = member.remaining
+        if remaining is not None:
+            take = min(remaining, len(self._buffer))
+            data = bytes(self._buffer[:take])
+            del self._buffer[:take]
+            member.remaining -= take
+            self._consume(data)
+            if member.remaining:
+                return False
+            self._flush()
+            self._finish_member(verify=True)
+            return True
+
+        # Data descriptor follows: deflate tells us where the data ends
+        data = bytes(self._buffer)
+        self._buffer = bytearray()
+        self._consume(data)
+        decompressor = member.decompressor
+        if not decompressor.eof:
+            return False
+        self._buffer = bytearray(decompressor.unused_data)
+        self._flush()
+        member.in_descriptor = True
+        return True
+
+    def _read_descriptor(self) -> bool:
+        """
+        Consume the data descriptor that follows the current member.
+
+        Returns:
+            bool: True if the descriptor was consumed.
+        """
+
+        if len(self._buffer) < 4:
+            return False
+        length = 16 if bytes(self._buffer[:4]) == _DESCRIPTOR_SIGNATURE else 12
+        if len(self._buffer) < length:
+            return False
+        del self._buffer[:length]
+        # The descriptor's own fields are checked later against the central
+        # directory; what counts is what was actually written
+        self._finish_member(verify=False)
+        return True
+
+    def _consume(self, data: bytes) -> None:
+        """Decompress, copy or skip a piece of the current member's data."""
+
+        member = self._member
+        decompressor = member.decompressor
+        if decompressor is None:
+            if member.selected:
+                self._write(data)
+            return
+        output = decompressor.decompress(data, _OUTPUT_CHUNK)
+        self._write_if_selected(output)
+        while decompressor.unconsumed_tail and not decompressor.eof:
+            output = decompressor.decompress(
+                decompressor.unconsumed_tail, _OUTPUT_CHUNK
+            )
+            self._write_if_selected(output)
+
+    def _flush(self) -> None:
+        """Write out whatever the decompressor still holds."""
+
+        decompressor = self._member.decompressor
+        if decompressor is not None and not decompressor.eof:
+            self._write_if_selected(decompressor.flush())
+
+    def _write_if_selected(self, data: bytes) -> None:
+        """Write decompressed output of a selected member."""
+
+        if self._member.selected and data:
+            self._write(data)
+
+    def _write(self, data: bytes) -> None:
+        """Append to the staged file, updating its CRC32 and size."""
+
+        member = self._member
+        member.file.write(data)
+        member.written_crc = zlib.crc32(data, member.written_crc)
+        member.written += len(data)
+
+    def _finish_member(self, verify: bool) -> None:
+        """
+        Close the current member and record it as staged.
+
+        Args:
+            verify (bool): Check CRC32 and size against the local header;
+                not possible when they come in a data descriptor.
+
+        Raises:
+            _GiveUp: If the check fails.
+        """
+
+        member = self._member
+        self._member = None
+        if not member.selected:
+            return
+        member.file.close()
+        if verify and (
+            member.written_crc != member.crc or member.written != member.file_size
+        ):
+            os.remove(member.path)
+            raise _GiveUp(f"{member.name} failed its CRC32 check")
+        self._staged[member.name] = StagedMember(
+            member.path, member.written_crc, member.written
+        )
+
+    def _close_member(self) -> None:
+        """Close the staged file of an unfinished member, if any."""
+
+        member = getattr(self, "_member", None)
+        if member is not None and member.file is not None:
+            member.file.close()
+        self._member = None
@@ -0,0 +1,228 @@
+"""
+Version switching for ayushman.
+
+Upgrades keep every version folder under `PACKAGE_DIR/<pkg>/<version>`.
+This module points a package's bin entry back at one of those folders, so
+going back to an installed version needs no download and no extraction:
+only the bin link and the registry change.
+
+Key behaviors:
+    - `use_version` activates a specific installed version.
+    - `rollback` activates the version that was active before the current
+      one, according to the registry's history.
+    - The bin entry is relinked through `ayushman.link`, so the same
+      fallbacks apply as during installation.
+
+Note:
+    Like `ayushman.install`, this module does no printing; outcomes are
+    reported through an InstallResult.
+"""
+
+import json
+from pathlib import Path
+
+import ayushman.extract_zip as extract_zip
+import ayushman.global_paths as global_paths
+import ayushman.link as link
+import ayushman.registry as registry
+import ayushman.result as result
+
+__all__ = ["use_version", "rollback"]
+
+
+def _failed_result(
+    package_name: str, version: str, error_message: str
+) -> result.InstallResult:
+    """
+    Build an InstallResult describing a switch that could not be made.
+
+    Args:
+        package_name (str): Name of the package.
+        version (str): Version that was asked for, if any.
+        error_message (str): Reason for the failure.
+
+    Returns:
+        InstallResult: A result with success set to False.
+    """
+
+    return result.InstallResult(
+        package_name=package_name,
+        version=version,
+        zip_file_name="",
+        install_path="",
+        success=False,
+        error_message=error_message,
+        metadata={},
+        metadata_path="",
+    )
+
+
+def _linked_executable(package_name: str, version_folder: Path) -> Path | None:
+    """
+    Find the executable the bin entry of a version should point to.
+
+    Args:
+        package_name (str): Name of the package.
+        version_folder (Path): Versioned package folder.
+
+    Returns:
+        Path | None: The last executable in archive order according to the
+        manifest, as during installation. Without a manifest, `<pkg>.exe`
+        or the only executable in the folder. None if it cannot be told.
+    """
+
+    names = list(extract_zip.read_manifest(version_folder))
+    if names and (version_folder / names[-1]).is_file():
+        return version_folder / names[-1]
+
+    own = version_folder / f"{package_name}.exe"
+    if own.is_file():
+        return own
+    executables = [
+        f for f in version_folder.iterdir() if extract_zip.is_executable(f.name)
+    ]
+    return executables[0] if len(executables) == 1 else None
+
+
+def _read_metadata(version_folder: Path) -> dict:
+    """
+    Read the per-package metadata stored with a version.
+
+    Args:
+        version_folder (Path): Versioned package folder.
+
+    Returns:
+        dict: The metadata, or an empty dict if it cannot be read.
+    """
+
+    try:
+        with open(version_folder / "metadata.json") as f:
+            return json.load(f)
+    except OSError:
+        return {}
+    except ValueError:
+        return {}
+
+
+def _is_path_component(value: str) -> bool:
+    """
+    Tell whether a name can be joined to a directory without leaving it.
+
+    Args:
+        value (str): A package name or version from the command line.
+
+    Returns:
+        bool: False for empty names, "." and "..", and names containing a
+        path separator or a drive.
+    """
+
+    return bool(value) and value not in (".", "..") and Path(value).name == value
+
+
+def use_version(package_name: str, version: str) -> result.InstallResult:
+    """
+    Make an installed version the active version of a package.
+
+    Args:
+        package_name (str): Name of the package.
+        version (str): A version whose folder is still on disk.
+
+    Returns:
+        InstallResult: The outcome. `previous_version` holds the version that
+        was active before, `up_to_date` is set if it already was `version`,
+        and `link_strategy` tells how the bin entry was created.
+
+    Side effects:
+        - Replaces `BIN_DIR/<pkg>.exe`.
+        - Moves the version to the front of the registry, recording it
+          there if it was missing.
+
+    Failure modes:
+        A package name or version that is not a single path component, a
+        missing version folder, an unidentifiable executable or a failed
+        link set success to False and populate error_message; the bin entry
+        and the registry are then left as they were.
+    """
+
+    package_name = str(package_name).lower()
+    if not _is_path_component(package_name):
+        return _failed_result(
+            package_name, version, f"invalid package name {package_name!r}"
+        )
+    if not _is_path_component(version):
+        return _failed_result(package_name, version, f"invalid version {version!r}")
+    version_folder = global_paths.PACKAGE_DIR / package_name / version
+    if not version_folder.is_dir():
+        return _failed_result(
+            package_name, version, f"{package_name} {version} is not installed"
+        )
+
+    executable = _linked_executable(package_name, version_folder)
+    if executable is None:
+        return _failed_result(
+            package_name,
+            version,
+            f"cannot tell which executable of {package_name} {version} to link",
+        )
+
+    entry = registry.get_package_metadata(package_name)
+    active_version = entry.get("version")
+    install_result = result.InstallResult(
+        package_name=package_name,
+        version=version,
+        zip_file_name="",
+        install_path=str(version_folder),
+        success=True,
+        error_message=None,
+        metadata=_read_metadata(version_folder),
+        metadata_path=str(version_folder / "metadata.json"),
+        up_to_date=active_version == version,
+        previous_version=None if active_version == version else active_version,
+    )
+
+    try:
+        global_paths.BIN_DIR.mkdir(parents=True, exist_ok=True)
+        install_result.link_strategy = link.link_file(
+            executable, global_paths.BIN_DIR / f"{package_name}.exe"
+        )
+    except OSError as e:
+        return _failed_result(package_name, version, str(e))
+
+    if not registry.activate_version(package_name, version):
+        registry.add_package(install_result)
+    return install_result
+
+
+def rollback(package_name: str) -> result.InstallResult:
+    """
+    Go back to the version that was active before the current one.
+
+    Args:
+        package_name (str): Name of the package.
+
+    Returns:
+        InstallResult: The outcome, as for `use_version`.
+
+    Behavior:
+        Walks the registry's history, most recent first, and activates the
+        first earlier version whose folder is still on disk. Rolling back
+        twice therefore returns to the version rolled back from.
+    """
+
+    package_name = str(package_name).lower()
+    if not _is_path_component(package_name):
+        return _failed_result(
+            package_name, "", f"invalid package name {package_name!r}"
+        )
+    versions = registry.get_installed_versions(package_name)
+    if not versions:
+        return _failed_result(package_name, "", f"{package_name} is not installed")
+
+    for version in versions[1:]:
+        if (global_paths.PACKAGE_DIR / package_name / version).is_dir():
+            return use_version(package_name, version)
+    return _failed_result(
+        package_name,
+        versions[0],
+        f"no earlier version of {package_name} to roll back to",
+    )
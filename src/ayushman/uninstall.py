@@ -6,6 +6,7 @@ and their associated binaries from the system. It handles:
 
     - Deletion of versioned package folders.
     - Removal of hard links in the ayushman bin directory.
+    - Removal of stored executables no other package links to.
     - Reporting of operation results via the UninstallResult object.
 
 Note:
@@ -16,13 +17,35 @@ Note:
 
 import os
 import shutil
+from pathlib import Path
 
+import ayushman.extract_zip as extract_zip
 import ayushman.global_paths as global_paths
+import ayushman.object_store as object_store
 import ayushman.result as result
 
 __all__ = ["uninstall_package"]
 
 
+def _stored_digests(version_folder: Path) -> list[str]:
+    """
+    Return the sha256 of the stored executables a version links to.
+
+    Args:
+        version_folder (Path): Versioned package folder.
+
+    Returns:
+        list[str]: Digests listed in its manifest.json; empty if there is
+        none.
+    """
+
+    return [
+        entry["sha256"]
+        for entry in extract_zip.read_manifest(version_folder).values()
+        if isinstance(entry, dict) and isinstance(entry.get("sha256"), str)
+    ]
+
+
 def uninstall_package(package_name: str):
     """
     Uninstall a package and remove its binaries from the system.
@@ -36,12 +59,14 @@ def uninstall_package(package_name: str):
             - versions: List of versions that were removed
             - removed_bins: List of executable paths deleted from the bin folder
             - removed_packages: List of package folders deleted
+            - freed_bytes: Bytes freed in the object store
             - success: True if uninstallation succeeded, False otherwise
             - error_message: Error message if uninstallation failed
 
     Side effects:
         - Deletes all versioned folders of the package from the package directory.
-        - Deletes associated hard links in the bin directory.
+        - Deletes the package's `bin/<pkg>.exe` entry.
+        - Deletes stored executables that no other version links to.
         - Creates no side effects outside of ayushman's directories.
 
     Failure modes:
@@ -65,22 +90,27 @@ def uninstall_package(package_name: str):
     versions_installed = [d.name for d in package_folder.iterdir() if d.is_dir()]
     removed_bins = []
     removed_packages = []
+    digests: list[str] = []
 
     try:
-        # Remove hardlinks
         for version_folder in package_folder.iterdir():
-            if not version_folder.is_dir():
-                continue
-            for exe_file in version_folder.glob("*.exe"):
-                bin_link = bin_folder / exe_file.name
-                if bin_link.exists():
-                    os.unlink(bin_link)
-                    removed_bins.append(str(bin_link))
+            if version_folder.is_dir():
+                digests.extend(_stored_digests(version_folder))
+
+        # extract_zip and switch expose a package as bin/<pkg>.exe, whatever
+        # its executables are called
+        bin_link = bin_folder / f"{package_name}.exe"
+        if bin_link.exists():
+            os.unlink(bin_link)
+            removed_bins.append(str(bin_link))
 
         # Remove entire package folder
         shutil.rmtree(package_folder)
         removed_packages.append(str(package_folder))
 
+        # Only now are the objects unreferenced, unless another package uses them
+        freed = object_store.collect(digests)
+
         return result.UninstallResult(
             package_name=package_name,
             versions=versions_installed,
@@ -88,6 +118,7 @@ def uninstall_package(package_name: str):
             removed_packages=removed_packages,
             success=True,
             error_message="",
+            freed_bytes=sum(obj.size for obj in freed),
         )
 
     except Exception as e:
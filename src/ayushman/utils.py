@@ -1,10 +1,57 @@
-from hashlib import sha256
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# Read size used when hashing a file that is already on disk
+HASH_BUFFER_SIZE: int = 1024 * 1024
 
 
 def get_sha256(file: str) -> str:
-    hash_object = sha256()
     with open(file, "rb") as f:
-        while chunk := f.read(4096):
+        # hashlib.file_digest (3.11+) hashes straight from a reusable buffer
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        hash_object = hashlib.sha256()
+        while chunk := f.read(HASH_BUFFER_SIZE):
             hash_object.update(chunk)
 
     return hash_object.hexdigest()
+
+
+def write_json(path: str | Path, data: object, indent: int | None = 4) -> None:
+    # Write a temporary file next to `path`, fsync it and rename it over
+    # `path`, so a crash leaves either the old or the new file, never half
+    # of one
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(
+        prefix=path.name + ".", suffix=".tmp", dir=path.parent
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+
+def split_spec(spec: str) -> tuple[str, str | None]:
+    # "occ@v1.2.0" -> ("occ", "v1.2.0"); "occ" -> ("occ", None)
+    name, sep, version = str(spec).partition("@")
+    return name.strip().lower(), (version.strip() or None) if sep else None
+
+
+def format_size(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
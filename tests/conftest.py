@@ -1,5 +1,141 @@
 import os
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
 
 if sys.platform != "win32":
     os.environ.setdefault("LOCALAPPDATA", "/tmp/fake-localappdata")
+
+# ---------- Local HTTP stand-in ----------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server: LocalHTTPServer = self.server.owner
+        server.requests.append(("GET", self.path, dict(self.headers)))
+
+        responses = server.routes.get(self.path)
+        if not responses:
+            self._send(404, {}, b"not found")
+            return
+
+        # Scripted responses are consumed in order; the last one repeats
+        response = responses.pop(0) if len(responses) > 1 else responses[0]
+        if callable(response):
+            response(self)
+            return
+        status, headers, body = response
+        self._send(status, headers, body)
+
+    def _send(self, status: int, headers: dict, body: bytes) -> None:
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping connections mid-response is expected in tests
+        pass
+
+
+class LocalHTTPServer:
+    """
+    Minimal threaded HTTP server for network tests.
+
+    routes maps a request path to a list of responses. Each response is a
+    (status, headers, body) tuple or a callable taking the request handler.
+    """
+
+    def __init__(self):
+        self.routes: dict[str, list] = {}
+        self.requests: list[tuple[str, str, dict]] = []
+        self._httpd = _QuietHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.owner = self
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+
+    def file_responder(
+        self,
+        body: bytes,
+        etag: str | None = None,
+        honor_range: bool = True,
+        truncate_after: int | None = None,
+    ):
+        """
+        Build a route that serves `body`, answering single Range requests
+        (including suffix ranges and If-Range) with 206 when honor_range is
+        set. With truncate_after, the connection is dropped after that many
+        body bytes to simulate an interrupted transfer.
+        """
+
+        def respond(handler):
+            headers = {"Accept-Ranges": "bytes"} if honor_range else {}
+            if etag is not None:
+                headers["ETag"] = etag
+            status, start, end = 200, 0, len(body) - 1
+
+            range_header = handler.headers.get("Range")
+            if_range = handler.headers.get("If-Range")
+            if honor_range and range_header and if_range in (None, etag):
+                first, _, last = range_header.split("=", 1)[1].partition("-")
+                if first == "":
+                    start = max(0, len(body) - int(last))
+                else:
+                    start = int(first)
+                    end = min(int(last), end) if last else end
+                if start >= len(body):
+                    headers["Content-Range"] = f"bytes */{len(body)}"
+                    handler._send(416, headers, b"")
+                    return
+                status = 206
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+
+            payload = body[start : end + 1]
+            handler.send_response(status)
+            for key, value in headers.items():
+                handler.send_header(key, value)
+            handler.send_header("Content-Length", str(len(payload)))
+            handler.end_headers()
+            if truncate_after is not None:
+                handler.wfile.write(payload[:truncate_after])
+                handler.wfile.flush()
+                handler.close_connection = True
+                return
+            handler.wfile.write(payload)
+
+        return respond
+
+    def url(self, path: str) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def http_server():
+    server = LocalHTTPServer().start()
+    yield server
+    server.stop()
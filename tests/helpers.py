@@ -0,0 +1,30 @@
+"""Helpers shared by several test modules"""
+
+import io
+import zipfile
+
+from ayushman.result import InstallResult
+
+
+def make_install_result(**overrides) -> InstallResult:
+    defaults = dict(
+        package_name="pdf-toolkit",
+        version="1.0.0",
+        zip_file_name="pdf-toolkit.zip",
+        install_path=r"C:\bin\pdf-toolkit\1.0.0",
+        success=True,
+        error_message=None,
+        metadata={},
+        metadata_path=r"C:\bin\pdf-toolkit\1.0.0\metadata.json",
+    )
+    defaults.update(overrides)
+    return InstallResult(**defaults)
+
+
+def zip_bytes(entries: dict) -> bytes:
+    """Build a ZIP in memory with fixed timestamps so its sha256 is stable."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, content in entries.items():
+            zf.writestr(zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0)), content)
+    return buffer.getvalue()
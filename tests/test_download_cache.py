@@ -0,0 +1,165 @@
+"""Tests for ayushman.download_cache"""
+
+import os
+import shutil
+
+import pytest
+
+import ayushman.download_cache as download_cache
+
+
+@pytest.fixture
+def isolated_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(download_cache.global_paths, "CACHE_DIR", cache_dir)
+    monkeypatch.delenv(download_cache.MAX_BYTES_ENV, raising=False)
+    monkeypatch.setattr(download_cache, "_pinned", {})
+    return cache_dir
+
+
+def add_entry(tmp_path, sha: str, size: int, last_used: float, release=True):
+    """Store a file of `size` bytes under `sha` and backdate its last use."""
+    source = tmp_path / f"{sha}.zip"
+    source.write_bytes(b"x" * size)
+    cached = download_cache.store(source, sha)
+    os.utime(cached, (last_used, last_used))
+    if release:
+        download_cache.release(sha)
+    return cached
+
+
+class TestStoreAndLookup:
+    def test_store_moves_file_under_its_digest(self, isolated_cache, tmp_path):
+        source = tmp_path / "pkg.zip"
+        source.write_bytes(b"zip bytes")
+
+        cached = download_cache.store(source, "a" * 64)
+
+        assert not source.exists()
+        assert cached == isolated_cache / "assets" / ("a" * 64) / "pkg.zip"
+        assert cached.read_bytes() == b"zip bytes"
+
+    def test_lookup_miss_returns_none(self, isolated_cache):
+        assert download_cache.lookup("b" * 64) is None
+
+    def test_lookup_hit_returns_path_and_marks_used(self, isolated_cache, tmp_path):
+        cached = add_entry(tmp_path, "a" * 64, 10, last_used=1_000)
+
+        found = download_cache.lookup("a" * 64)
+
+        assert found == cached
+        assert found.stat().st_mtime > 1_000
+
+
+class TestListEntries:
+    def test_empty_cache(self, isolated_cache):
+        assert download_cache.list_entries() == []
+
+    def test_most_recently_used_first(self, isolated_cache, tmp_path):
+        add_entry(tmp_path, "a" * 64, 10, last_used=1_000)
+        add_entry(tmp_path, "b" * 64, 20, last_used=3_000)
+        add_entry(tmp_path, "c" * 64, 30, last_used=2_000)
+
+        entries = download_cache.list_entries()
+
+        assert [e.sha256[0] for e in entries] == ["b", "c", "a"]
+        assert [e.size for e in entries] == [20, 30, 10]
+
+    def test_entry_removed_while_listing_is_skipped(
+        self, isolated_cache, tmp_path, monkeypatch
+    ):
+        add_entry(tmp_path, "a" * 64, 10, last_used=1_000)
+        add_entry(tmp_path, "b" * 64, 20, last_used=2_000)
+        entry_file = download_cache._entry_file
+
+        def evicted_meanwhile(entry_dir):
+            found = entry_file(entry_dir)
+            if entry_dir.name == "a" * 64:
+                shutil.rmtree(entry_dir)
+            return found
+
+        monkeypatch.setattr(download_cache, "_entry_file", evicted_meanwhile)
+
+        assert [e.sha256[0] for e in download_cache.list_entries()] == ["b"]
+
+
+class TestPrune:
+    def test_evicts_least_recently_used_until_within_budget(
+        self, isolated_cache, tmp_path
+    ):
+        add_entry(tmp_path, "a" * 64, 100, last_used=1_000)
+        add_entry(tmp_path, "b" * 64, 100, last_used=2_000)
+        add_entry(tmp_path, "c" * 64, 100, last_used=3_000)
+
+        removed = download_cache.prune(max_bytes=200)
+
+        assert [e.sha256[0] for e in removed] == ["a"]
+        assert sorted(e.sha256[0] for e in download_cache.list_entries()) == [
+            "b",
+            "c",
+        ]
+
+    def test_store_enforces_budget_from_environment(
+        self, isolated_cache, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv(download_cache.MAX_BYTES_ENV, "150")
+        add_entry(tmp_path, "a" * 64, 100, last_used=1_000)
+        add_entry(tmp_path, "b" * 64, 100, last_used=2_000)
+
+        assert [e.sha256[0] for e in download_cache.list_entries()] == ["b"]
+
+    def test_pinned_entries_are_not_evicted(self, isolated_cache, tmp_path):
+        add_entry(tmp_path, "a" * 64, 100, last_used=1_000, release=False)
+        add_entry(tmp_path, "b" * 64, 100, last_used=2_000)
+
+        removed = download_cache.prune(max_bytes=0)
+
+        assert [e.sha256[0] for e in removed] == ["b"]
+        download_cache.release("a" * 64)
+        assert [e.sha256[0] for e in download_cache.prune(max_bytes=0)] == ["a"]
+
+    def test_entries_pinned_by_another_process_are_not_evicted(
+        self, isolated_cache, tmp_path
+    ):
+        add_entry(tmp_path, "a" * 64, 100, last_used=1_000, release=False)
+        # Hand the pin over, as if another process held it
+        (pin,) = download_cache._pinned.pop("a" * 64)
+
+        assert download_cache.clear() == []
+
+        pin.release()
+        assert [e.sha256[0] for e in download_cache.clear()] == ["a"]
+
+    def test_pin_left_by_an_exited_process_is_ignored(self, isolated_cache, tmp_path):
+        add_entry(tmp_path, "a" * 64, 100, last_used=1_000)
+        pins_dir = isolated_cache / "pins" / ("a" * 64)
+        pins_dir.mkdir(parents=True)
+        (pins_dir / "4242-dead").touch()
+
+        assert [e.sha256[0] for e in download_cache.clear()] == ["a"]
+        assert not pins_dir.exists()
+
+    def test_released_pins_leave_no_files(self, isolated_cache, tmp_path):
+        add_entry(tmp_path, "a" * 64, 100, last_used=1_000)
+
+        assert not (isolated_cache / "pins" / ("a" * 64)).exists()
+
+    def test_clear_removes_everything(self, isolated_cache, tmp_path):
+        add_entry(tmp_path, "a" * 64, 10, last_used=1_000)
+        add_entry(tmp_path, "b" * 64, 10, last_used=2_000)
+
+        assert len(download_cache.clear()) == 2
+        assert download_cache.list_entries() == []
+
+
+class TestMaxBytes:
+    def test_default_budget(self, isolated_cache):
+        assert download_cache.get_max_bytes() == download_cache.DEFAULT_MAX_BYTES
+
+    def test_environment_override(self, isolated_cache, monkeypatch):
+        monkeypatch.setenv(download_cache.MAX_BYTES_ENV, "1024")
+        assert download_cache.get_max_bytes() == 1024
+
+    def test_invalid_environment_value_is_ignored(self, isolated_cache, monkeypatch):
+        monkeypatch.setenv(download_cache.MAX_BYTES_ENV, "lots")
+        assert download_cache.get_max_bytes() == download_cache.DEFAULT_MAX_BYTES
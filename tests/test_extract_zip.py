@@ -1,7 +1,11 @@
 """Tests for ayushman.extract_zip.extract_zip_file"""
 
+import hashlib
 import json
+import shutil
+import tracemalloc
 import zipfile
+import zlib
 from pathlib import Path
 
 import pytest
@@ -35,6 +39,18 @@ def make_zip(path: Path, entries: dict) -> Path:
     return path
 
 
+def install_version(tmp_path, version, entries, previous_version=None):
+    """Extract a ZIP of `entries` as `version` of pdf-toolkit."""
+    zip_path = make_zip(tmp_path / f"pkg-{version}.zip", entries)
+    return extract_zip.extract_zip_file(
+        make_install_result(
+            zip_file_name=str(zip_path),
+            version=version,
+            previous_version=previous_version,
+        )
+    )
+
+
 # ---------- Fixture: isolate global_paths ----------
 
 
@@ -44,6 +60,7 @@ def isolated_paths(tmp_path, monkeypatch):
     bin_dir = tmp_path / "bin"
     monkeypatch.setattr(extract_zip.global_paths, "PACKAGE_DIR", package_dir)
     monkeypatch.setattr(extract_zip.global_paths, "BIN_DIR", bin_dir)
+    monkeypatch.setattr(extract_zip.global_paths, "OBJECTS_DIR", tmp_path / "objects")
     return package_dir, bin_dir
 
 
@@ -203,6 +220,182 @@ class TestUpgradeBehavior:
         assert hardlink.read_bytes() == b"binary b"
 
 
+class TestUnchangedMembers:
+    def test_manifest_records_crc_size_and_sha256(self, tmp_path, isolated_paths):
+        package_dir, _ = isolated_paths
+        install_version(tmp_path, "1.0.0", {"bin/tool.exe": b"tool", "a.txt": b"x"})
+
+        manifest = json.loads(
+            (package_dir / "pdf-toolkit" / "1.0.0" / "manifest.json").read_text()
+        )
+        assert manifest == {
+            "files": {
+                "tool.exe": {
+                    "crc": zlib.crc32(b"tool"),
+                    "size": 4,
+                    "sha256": hashlib.sha256(b"tool").hexdigest(),
+                }
+            }
+        }
+
+    def test_unchanged_members_are_linked_from_previous_version(
+        self, tmp_path, isolated_paths, monkeypatch
+    ):
+        package_dir, bin_dir = isolated_paths
+        install_version(tmp_path, "1.0.0", {"a.exe": b"same", "b.exe": b"old b"})
+        extracted = []
+        inner = extract_zip._extract_member
+
+        def record(zip_ref, file_info, target_path, buffer_size):
+            extracted.append(file_info.filename)
+            inner(zip_ref, file_info, target_path, buffer_size)
+
+        monkeypatch.setattr(extract_zip, "_extract_member", record)
+        result = install_version(
+            tmp_path, "2.0.0", {"a.exe": b"same", "b.exe": b"new b"}, "1.0.0"
+        )
+
+        old = package_dir / "pdf-toolkit" / "1.0.0"
+        new = package_dir / "pdf-toolkit" / "2.0.0"
+        assert result.success is True
+        assert result.reused_files == ["a.exe"]
+        assert extracted == ["b.exe"]
+        assert (new / "a.exe").stat().st_ino == (old / "a.exe").stat().st_ino
+        assert (new / "b.exe").read_bytes() == b"new b"
+        assert (old / "b.exe").read_bytes() == b"old b"
+        assert (bin_dir / "pdf-toolkit.exe").read_bytes() == b"new b"
+
+    def test_version_without_sha256_is_linked_from_its_folder(
+        self, tmp_path, isolated_paths
+    ):
+        package_dir, _ = isolated_paths
+        old = package_dir / "pdf-toolkit" / "1.0.0"
+        old.mkdir(parents=True)
+        (old / "a.exe").write_bytes(b"same")
+        (old / "manifest.json").write_text(
+            json.dumps({"files": {"a.exe": {"crc": zlib.crc32(b"same"), "size": 4}}})
+        )
+
+        result = install_version(tmp_path, "2.0.0", {"a.exe": b"same"}, "1.0.0")
+
+        new = package_dir / "pdf-toolkit" / "2.0.0"
+        assert result.reused_files == ["a.exe"]
+        assert (new / "a.exe").stat().st_ino == (old / "a.exe").stat().st_ino
+
+    def test_version_without_manifest_is_extracted(self, tmp_path, isolated_paths):
+        package_dir, _ = isolated_paths
+        old = package_dir / "pdf-toolkit" / "1.0.0"
+        old.mkdir(parents=True)
+        (old / "a.exe").write_bytes(b"same")
+
+        result = install_version(tmp_path, "2.0.0", {"a.exe": b"same"}, "1.0.0")
+
+        assert result.success is True
+        assert result.reused_files == []
+
+    def test_missing_previous_file_is_extracted(self, tmp_path, isolated_paths):
+        package_dir, _ = isolated_paths
+        old = package_dir / "pdf-toolkit" / "1.0.0"
+        old.mkdir(parents=True)
+        (old / "manifest.json").write_text(
+            json.dumps({"files": {"a.exe": {"crc": zlib.crc32(b"same"), "size": 4}}})
+        )
+
+        result = install_version(tmp_path, "2.0.0", {"a.exe": b"same"}, "1.0.0")
+
+        assert result.success is True
+        assert result.reused_files == []
+        assert (package_dir / "pdf-toolkit" / "2.0.0" / "a.exe").read_bytes() == b"same"
+
+    def test_reinstall_does_not_write_through_shared_links(
+        self, tmp_path, isolated_paths
+    ):
+        package_dir, _ = isolated_paths
+        install_version(tmp_path, "1.0.0", {"a.exe": b"same"})
+        install_version(tmp_path, "2.0.0", {"a.exe": b"same"}, "1.0.0")
+
+        # Reinstalling 2.0.0 from a different archive must not touch 1.0.0
+        install_version(tmp_path, "2.0.0", {"a.exe": b"patched"})
+
+        assert (package_dir / "pdf-toolkit" / "1.0.0" / "a.exe").read_bytes() == b"same"
+        assert (
+            package_dir / "pdf-toolkit" / "2.0.0" / "a.exe"
+        ).read_bytes() == b"patched"
+
+
+class TestObjectStore:
+    def test_identical_binaries_share_one_stored_file(self, tmp_path, isolated_paths):
+        package_dir, bin_dir = isolated_paths
+        install_version(tmp_path, "1.0.0", {"a.exe": b"same"})
+        install_version(tmp_path, "2.0.0", {"a.exe": b"same"})
+
+        stored = extract_zip.object_store.object_path(
+            hashlib.sha256(b"same").hexdigest()
+        )
+        assert stored.exists()
+        assert stored.stat().st_nlink == 4  # store, 1.0.0, 2.0.0 and bin
+        assert (bin_dir / "pdf-toolkit.exe").stat().st_ino == stored.stat().st_ino
+
+    def test_known_version_is_reinstalled_by_linking_only(
+        self, tmp_path, isolated_paths, monkeypatch
+    ):
+        package_dir, _ = isolated_paths
+        zip_path = make_zip(tmp_path / "pkg.zip", {"a.exe": b"tool"})
+        extract_zip.extract_zip_file(make_install_result(zip_file_name=str(zip_path)))
+        shutil.rmtree(package_dir / "pdf-toolkit")
+
+        def no_extract(*args, **kwargs):
+            raise AssertionError("stored executables must not be extracted again")
+
+        monkeypatch.setattr(extract_zip, "_extract_member", no_extract)
+        result = extract_zip.extract_zip_file(
+            make_install_result(zip_file_name=str(zip_path))
+        )
+
+        assert result.success is True
+        assert result.reused_files == ["a.exe"]
+        assert (package_dir / "pdf-toolkit" / "1.0.0" / "a.exe").read_bytes() == b"tool"
+
+    def test_crc_match_with_different_content_is_extracted(
+        self, tmp_path, isolated_paths
+    ):
+        package_dir, _ = isolated_paths
+        install_version(tmp_path, "1.0.0", {"a.exe": b"tool"})
+        store = extract_zip.object_store
+        # Pretend another binary of the same size shares that CRC32
+        index = store._read_index()
+        index[store._index_key(zlib.crc32(b"evil"), 4)] = hashlib.sha256(
+            b"tool"
+        ).hexdigest()
+        store._write_index(index)
+
+        result = install_version(tmp_path, "2.0.0", {"b.exe": b"evil"})
+
+        assert result.success is True
+        assert result.reused_files == []
+        assert (package_dir / "pdf-toolkit" / "2.0.0" / "b.exe").read_bytes() == b"evil"
+
+    def test_store_failure_keeps_extracted_copy(
+        self, tmp_path, isolated_paths, monkeypatch
+    ):
+        package_dir, _ = isolated_paths
+
+        def unavailable(*args, **kwargs):
+            raise OSError("hard links not supported")
+
+        monkeypatch.setattr(extract_zip.object_store, "add", unavailable)
+        zip_path = make_zip(tmp_path / "pkg.zip", {"a.exe": b"tool"})
+        result = extract_zip.extract_zip_file(
+            make_install_result(zip_file_name=str(zip_path))
+        )
+
+        manifest = json.loads(
+            (package_dir / "pdf-toolkit" / "1.0.0" / "manifest.json").read_text()
+        )
+        assert result.success is True
+        assert manifest["files"]["a.exe"]["sha256"] is None
+
+
 # ---------- Failure modes ----------
 
 
@@ -243,3 +436,128 @@ class TestFailureModes:
         # Function returns early on exception, before these get overwritten
         assert result.install_path == "unchanged"
         assert result.metadata_path == "unchanged"
+
+
+# ---------- Memory use ----------
+
+
+class TestStreamingExtraction:
+    def test_peak_memory_is_bounded_by_buffer_size(self, tmp_path, isolated_paths):
+        package_dir, _ = isolated_paths
+        size = 32 * 1024 * 1024
+        zip_path = tmp_path / "big.zip"
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            with zf.open("pdf-toolkit.exe", "w") as member:
+                block = bytes(range(256)) * 4096
+                for _ in range(size // len(block)):
+                    member.write(block)
+
+        install_result = make_install_result(zip_file_name=str(zip_path))
+        tracemalloc.start()
+        try:
+            result = extract_zip.extract_zip_file(install_result, buffer_size=64 * 1024)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert result.success is True
+        extracted = package_dir / "pdf-toolkit" / "1.0.0" / "pdf-toolkit.exe"
+        assert extracted.stat().st_size == size
+        assert peak < 4 * 1024 * 1024
+
+    def test_corrupt_member_fails_crc_check(self, tmp_path, isolated_paths):
+        zip_path = tmp_path / "pkg.zip"
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zf:
+            zf.writestr("tool.exe", b"A" * 10_000)
+        data = bytearray(zip_path.read_bytes())
+        data[data.index(b"A" * 100) + 50] = ord("B")
+        zip_path.write_bytes(bytes(data))
+
+        result = extract_zip.extract_zip_file(
+            make_install_result(zip_file_name=str(zip_path))
+        )
+
+        assert result.success is False
+        assert "CRC" in result.error_message
+
+
+# ---------- Parallel extraction ----------
+
+
+class TestParallelExtraction:
+    def test_all_members_extracted_and_last_linked(self, tmp_path, isolated_paths):
+        package_dir, bin_dir = isolated_paths
+        entries = {f"tool_{i}.exe": f"binary {i}".encode() * 1000 for i in range(6)}
+        zip_path = make_zip(tmp_path / "pkg.zip", entries)
+
+        result = extract_zip.extract_zip_file(
+            make_install_result(zip_file_name=str(zip_path)), workers=3
+        )
+
+        assert result.success is True
+        pkg_folder = package_dir / "pdf-toolkit" / "1.0.0"
+        for name, content in entries.items():
+            assert (pkg_folder / name).read_bytes() == content
+        assert (bin_dir / "pdf-toolkit.exe").read_bytes() == entries["tool_5.exe"]
+
+    def test_each_worker_opens_its_own_handle(
+        self, tmp_path, isolated_paths, monkeypatch
+    ):
+        zip_path = make_zip(
+            tmp_path / "pkg.zip", {"a.exe": b"a" * 5000, "b.exe": b"b" * 5000}
+        )
+        opened = []
+        real_zipfile = zipfile.ZipFile
+
+        def counting_zipfile(*args, **kwargs):
+            handle = real_zipfile(*args, **kwargs)
+            opened.append(handle)
+            return handle
+
+        monkeypatch.setattr(extract_zip.zipfile, "ZipFile", counting_zipfile)
+        extract_zip.extract_zip_file(
+            make_install_result(zip_file_name=str(zip_path)), workers=2
+        )
+
+        # One handle to list the members, then one per worker
+        assert len(opened) == 3
+
+    def test_failed_member_leaves_bin_untouched(self, tmp_path, isolated_paths):
+        _, bin_dir = isolated_paths
+        bin_dir.mkdir(parents=True)
+        (bin_dir / "pdf-toolkit.exe").write_bytes(b"old version")
+        zip_path = tmp_path / "pkg.zip"
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zf:
+            zf.writestr("a.exe", b"A" * 10_000)
+            zf.writestr("b.exe", b"B" * 10_000)
+        data = bytearray(zip_path.read_bytes())
+        data[data.index(b"A" * 100) + 50] = ord("Z")
+        zip_path.write_bytes(bytes(data))
+
+        result = extract_zip.extract_zip_file(
+            make_install_result(zip_file_name=str(zip_path)), workers=2
+        )
+
+        assert result.success is False
+        assert (bin_dir / "pdf-toolkit.exe").read_bytes() == b"old version"
+
+    def test_workers_default_to_environment(
+        self, tmp_path, isolated_paths, monkeypatch
+    ):
+        monkeypatch.setenv(extract_zip.EXTRACT_WORKERS_ENV, "4")
+        assert extract_zip.get_extract_workers() == 4
+        monkeypatch.setenv(extract_zip.EXTRACT_WORKERS_ENV, "zero")
+        assert extract_zip.get_extract_workers() == 1
+
+    def test_partition_balances_sizes(self):
+        members = [
+            (zipfile.ZipInfo(f"{size}.exe"), Path(f"{size}.exe"))
+            for size in (100, 60, 50, 40, 10)
+        ]
+        for info, _ in members:
+            info.file_size = int(info.filename.split(".")[0])
+
+        groups = extract_zip._partition(members, 2)
+
+        loads = sorted(sum(info.file_size for info, _ in g) for g in groups)
+        assert loads == [120, 140]
@@ -0,0 +1,52 @@
+"""Tests for ayushman.file_lock"""
+
+import ayushman.file_lock as file_lock
+
+
+class TestFileLock:
+    def test_second_holder_is_refused_until_release(self, tmp_path):
+        first = file_lock.FileLock(tmp_path / "x.lock")
+        second = file_lock.FileLock(tmp_path / "x.lock")
+
+        assert first.acquire(blocking=False) is True
+        assert second.acquire(blocking=False) is False
+
+        first.release()
+        assert second.acquire(blocking=False) is True
+        second.release()
+
+    def test_context_manager_holds_the_lock(self, tmp_path):
+        with file_lock.FileLock(tmp_path / "x.lock") as held:
+            assert held.locked is True
+            assert file_lock.FileLock(tmp_path / "x.lock").acquire(False) is False
+
+        assert held.locked is False
+
+    def test_release_can_remove_the_lock_file(self, tmp_path):
+        lock = file_lock.FileLock(tmp_path / "x.lock")
+        lock.acquire()
+        lock.release(remove=True)
+
+        assert not (tmp_path / "x.lock").exists()
+
+    def test_lock_on_a_removed_file_does_not_count(self, tmp_path, monkeypatch):
+        # Opened before the holder removed it, locked after: must retry on
+        # the file now at the path
+        holder = file_lock.FileLock(tmp_path / "x.lock")
+        holder.acquire()
+        stale = file_lock.FileLock(tmp_path / "x.lock")
+        original = file_lock.os.open
+
+        def open_then_release(*args, **kwargs):
+            fd = original(*args, **kwargs)
+            if holder.locked:
+                holder.release(remove=True)
+            return fd
+
+        with monkeypatch.context() as m:
+            m.setattr(file_lock.os, "open", open_then_release)
+            assert stale.acquire() is True
+
+        assert (tmp_path / "x.lock").exists()
+        assert file_lock.FileLock(tmp_path / "x.lock").acquire(False) is False
+        stale.release()
@@ -0,0 +1,114 @@
+"""Tests for ayushman.http_client"""
+
+import time
+
+import pytest
+import requests
+
+import ayushman.http_client as http_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_session(monkeypatch):
+    """Make every test build its own session with fast retry settings."""
+    monkeypatch.setattr(http_client, "BACKOFF_FACTOR", 0)
+    http_client.close_session()
+    yield
+    http_client.close_session()
+
+
+class TestSession:
+    def test_session_is_shared(self):
+        assert http_client.get_session() is http_client.get_session()
+
+    def test_close_session_builds_a_new_one(self):
+        first = http_client.get_session()
+        http_client.close_session()
+        assert http_client.get_session() is not first
+
+    def test_user_agent_identifies_ayushman(self):
+        assert http_client.get_session().headers["User-Agent"].startswith("ayushman")
+
+    def test_default_timeout_is_applied(self, monkeypatch):
+        seen = {}
+
+        def fake_get(url, **kwargs):
+            seen.update(kwargs)
+
+        monkeypatch.setattr(http_client.get_session(), "get", fake_get)
+        http_client.get("https://example.invalid")
+
+        assert seen["timeout"] == (
+            http_client.CONNECT_TIMEOUT,
+            http_client.READ_TIMEOUT,
+        )
+
+    def test_explicit_timeout_is_kept(self, monkeypatch):
+        seen = {}
+
+        def fake_get(url, **kwargs):
+            seen.update(kwargs)
+
+        monkeypatch.setattr(http_client.get_session(), "get", fake_get)
+        http_client.get("https://example.invalid", timeout=1)
+
+        assert seen["timeout"] == 1
+
+
+class TestRetries:
+    def test_retries_transient_status_then_succeeds(self, http_server):
+        http_server.routes["/flaky"] = [
+            (503, {"Retry-After": "0"}, b"busy"),
+            (200, {}, b"ok"),
+        ]
+
+        response = http_client.get(http_server.url("/flaky"))
+
+        assert response.status_code == 200
+        assert response.content == b"ok"
+        assert len(http_server.requests) == 2
+
+    def test_honors_retry_after(self, http_server):
+        http_server.routes["/limited"] = [
+            (429, {"Retry-After": "1"}, b"slow down"),
+            (200, {}, b"ok"),
+        ]
+
+        start = time.monotonic()
+        response = http_client.get(http_server.url("/limited"))
+
+        assert response.status_code == 200
+        assert time.monotonic() - start >= 1
+
+    def test_gives_up_after_max_retries(self, http_server, monkeypatch):
+        monkeypatch.setattr(http_client, "MAX_RETRIES", 2)
+        http_server.routes["/down"] = [(500, {}, b"error")]
+
+        response = http_client.get(http_server.url("/down"))
+
+        assert response.status_code == 500
+        assert len(http_server.requests) == 3
+        with pytest.raises(requests.HTTPError):
+            response.raise_for_status()
+
+    def test_client_errors_are_not_retried(self, http_server):
+        http_server.routes["/missing"] = [(404, {}, b"nope")]
+
+        response = http_client.get(http_server.url("/missing"))
+
+        assert response.status_code == 404
+        assert len(http_server.requests) == 1
+
+
+class TestTimeouts:
+    def test_stalled_read_raises_instead_of_hanging(self, http_server, monkeypatch):
+        monkeypatch.setattr(http_client, "MAX_RETRIES", 0)
+
+        def stall(handler):
+            time.sleep(1)
+            handler._send(200, {}, b"late")
+
+        http_server.routes["/stall"] = [stall]
+
+        with pytest.raises(requests.RequestException):
+            http_client.get(http_server.url("/stall"), timeout=(1, 0.2))
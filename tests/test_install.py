@@ -0,0 +1,457 @@
+"""Tests for ayushman.install"""
+
+import hashlib
+import threading
+from pathlib import Path
+
+import pytest
+from helpers import zip_bytes
+
+import ayushman.install as install
+import ayushman.registry as registry
+from ayushman.result import InstallResult
+
+# ---------- Helpers ----------
+
+
+@pytest.fixture
+def isolated_install(tmp_path, monkeypatch):
+    package_dir = tmp_path / "packages"
+    bin_dir = tmp_path / "bin"
+    monkeypatch.setattr(install.extract_zip.global_paths, "PACKAGE_DIR", package_dir)
+    monkeypatch.setattr(install.extract_zip.global_paths, "BIN_DIR", bin_dir)
+    monkeypatch.setattr(
+        install.extract_zip.global_paths, "CACHE_DIR", tmp_path / "cache"
+    )
+    monkeypatch.setattr(
+        install.extract_zip.global_paths, "OBJECTS_DIR", tmp_path / "objects"
+    )
+    monkeypatch.setattr(registry, "REGISTRY_PATH", tmp_path / "metadata.json")
+    return package_dir, bin_dir
+
+
+@pytest.fixture
+def fake_download(tmp_path, monkeypatch):
+    """
+    Replace request_url.resolve_release / download_asset with local stand-ins
+    serving a small ZIP for the requested package. Returns a dict of versions
+    that tests can edit, and a list recording every package whose asset was
+    "downloaded".
+    """
+    versions: dict[str, str] = {}
+    calls: list[str] = []
+    downloads = tmp_path / "cache" / "downloads"
+    downloads.mkdir(parents=True)
+
+    def payload(package: str) -> bytes:
+        version = versions.get(package, "1.0.0")
+        return zip_bytes({f"{package}.exe": f"{package} {version}".encode()})
+
+    def resolve_release(package: str, tag=None) -> InstallResult:
+        return InstallResult(
+            package_name=package,
+            version=versions.get(package, "1.0.0"),
+            zip_file_name=str(downloads / f"{package}.zip"),
+            install_path="",
+            success=True,
+            error_message=None,
+            metadata={"author": "someone"},
+            metadata_path="",
+            remote_sha256=hashlib.sha256(payload(package)).hexdigest(),
+            asset_url=f"https://example.invalid/{package}.zip",
+        )
+
+    def download_asset(
+        install_result: InstallResult, segments: int = 1, extractor=None
+    ) -> InstallResult:
+        package = install_result.package_name
+        calls.append(package)
+        data = payload(package)
+        if extractor is not None:
+            extractor.feed(data)
+        Path(install_result.zip_file_name).write_bytes(data)
+        install_result.local_sha256 = hashlib.sha256(data).hexdigest()
+        install_result.hash_verified = (
+            install_result.local_sha256 == install_result.remote_sha256
+        )
+        return install_result
+
+    monkeypatch.setattr(install.request_url, "resolve_release", resolve_release)
+    monkeypatch.setattr(install.request_url, "download_asset", download_asset)
+    return versions, calls
+
+
+# ---------- install_package ----------
+
+
+class TestInstallPackage:
+    def test_installs_and_registers_package(self, isolated_install, fake_download):
+        package_dir, bin_dir = isolated_install
+        result = install.install_package("pdf-toolkit")
+
+        assert result.success is True
+        assert result.up_to_date is False
+        assert result.previous_version is None
+        assert (bin_dir / "pdf-toolkit.exe").read_bytes() == b"pdf-toolkit 1.0.0"
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+
+    def test_verified_download_is_moved_into_cache(
+        self, isolated_install, fake_download, tmp_path
+    ):
+        result = install.install_package("pdf-toolkit")
+
+        assert not (tmp_path / "cache" / "downloads" / "pdf-toolkit.zip").exists()
+        assert Path(result.zip_file_name).parent.name == result.remote_sha256
+        assert Path(result.zip_file_name).exists()
+
+    def test_members_extracted_during_download_are_used(
+        self, isolated_install, fake_download, monkeypatch, tmp_path
+    ):
+        _, bin_dir = isolated_install
+
+        def no_extract(*args, **kwargs):
+            raise AssertionError("member should have been staged while downloading")
+
+        monkeypatch.setattr(install.extract_zip, "_extract_member", no_extract)
+        result = install.install_package("pdf-toolkit")
+
+        assert result.success is True
+        assert (bin_dir / "pdf-toolkit.exe").read_bytes() == b"pdf-toolkit 1.0.0"
+        assert list((tmp_path / "cache" / "staging").iterdir()) == []
+
+    def test_cache_hit_skips_download(self, isolated_install, fake_download):
+        versions, calls = fake_download
+        install.install_package("pdf-toolkit")
+        versions["pdf-toolkit"] = "2.0.0"
+        install.install_package("pdf-toolkit")
+        # Going back to 1.0.0 (e.g. a repair or rollback) reuses the cached ZIP
+        registry.remove_package("pdf-toolkit")
+        versions["pdf-toolkit"] = "1.0.0"
+        result = install.install_package("pdf-toolkit")
+
+        assert result.success is True
+        assert result.from_cache is True
+        assert result.hash_verified is True
+        assert calls == ["pdf-toolkit", "pdf-toolkit"]
+
+    def test_download_without_remote_hash_is_not_cached(
+        self, isolated_install, fake_download, monkeypatch, tmp_path
+    ):
+        inner = install.request_url.resolve_release
+
+        def resolve_release(package, tag=None):
+            resolved = inner(package, tag=tag)
+            resolved.remote_sha256 = None
+            return resolved
+
+        monkeypatch.setattr(install.request_url, "resolve_release", resolve_release)
+        result = install.install_package("pdf-toolkit")
+
+        assert result.success is True
+        assert not Path(result.zip_file_name).exists()
+        assert not (tmp_path / "cache" / "assets").exists()
+
+    def test_unsupported_package_fails_without_download(
+        self, isolated_install, fake_download
+    ):
+        _, calls = fake_download
+        result = install.install_package("not-a-real-package")
+
+        assert result.success is False
+        assert "not found" in result.error_message
+        assert calls == []
+
+    def test_same_version_is_reported_up_to_date(self, isolated_install, fake_download):
+        install.install_package("pdf-toolkit")
+        result = install.install_package("pdf-toolkit")
+
+        assert result.success is True
+        assert result.up_to_date is True
+
+    def test_up_to_date_check_happens_before_download(
+        self, isolated_install, fake_download
+    ):
+        _, calls = fake_download
+        install.install_package("pdf-toolkit")
+        install.install_package("pdf-toolkit")
+
+        assert calls == ["pdf-toolkit"]
+
+    def test_new_release_is_installed_as_upgrade(self, isolated_install, fake_download):
+        versions, _ = fake_download
+        install.install_package("pdf-toolkit")
+        versions["pdf-toolkit"] = "2.0.0"
+        result = install.install_package("pdf-toolkit")
+
+        assert result.success is True
+        assert result.previous_version == "1.0.0"
+        assert registry.get_installed_version("pdf-toolkit") == "2.0.0"
+
+    def test_pinned_tag_is_passed_to_resolution(
+        self, isolated_install, fake_download, monkeypatch
+    ):
+        asked: list = []
+        inner = install.request_url.resolve_release
+
+        def resolve_release(package, tag=None):
+            asked.append((package, tag))
+            return inner(package, tag=tag)
+
+        monkeypatch.setattr(install.request_url, "resolve_release", resolve_release)
+        result = install.install_package("PDF-Toolkit@v1.0.0")
+
+        assert result.success is True
+        assert asked == [("pdf-toolkit", "v1.0.0")]
+
+    def test_hash_mismatch_fails_and_does_not_register(
+        self, isolated_install, fake_download, monkeypatch, tmp_path
+    ):
+        inner = install.request_url.download_asset
+
+        def download_asset(install_result, segments=1, extractor=None):
+            install_result = inner(install_result, segments=segments)
+            install_result.local_sha256 = "a" * 64
+            install_result.hash_verified = False
+            return install_result
+
+        monkeypatch.setattr(install.request_url, "download_asset", download_asset)
+        result = install.install_package("pdf-toolkit")
+
+        assert result.success is False
+        assert "sha256 mismatch" in result.error_message
+        assert registry.is_package_installed("pdf-toolkit") is False
+        assert not (tmp_path / "cache" / "downloads" / "pdf-toolkit.zip").exists()
+        assert not (tmp_path / "cache" / "assets").exists()
+
+    def test_failed_download_does_not_remove_files_in_cwd(
+        self, isolated_install, fake_download, monkeypatch, tmp_path
+    ):
+        cwd = tmp_path / "cwd"
+        cwd.mkdir()
+        (cwd / "pdf-toolkit.zip").write_bytes(b"not ours")
+        monkeypatch.chdir(cwd)
+
+        def download_asset(install_result, segments=1, extractor=None):
+            # zip_file_name is still the bare asset name, as after a real failure
+            install_result.zip_file_name = "pdf-toolkit.zip"
+            install_result.success = False
+            install_result.error_message = "Failed to download ZIP: connection reset"
+            return install_result
+
+        monkeypatch.setattr(install.request_url, "download_asset", download_asset)
+        result = install.install_package("pdf-toolkit")
+
+        assert result.success is False
+        assert (cwd / "pdf-toolkit.zip").read_bytes() == b"not ours"
+
+    def test_exception_during_fetch_removes_staging_dir(
+        self, isolated_install, fake_download, monkeypatch, tmp_path
+    ):
+        def download_asset(install_result, segments=1, extractor=None):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(install.request_url, "download_asset", download_asset)
+        with pytest.raises(OSError):
+            install.install_package("pdf-toolkit")
+
+        assert list((tmp_path / "cache" / "staging").iterdir()) == []
+
+    def test_exe_only_installs_partial_fetch_without_caching(
+        self, isolated_install, fake_download, monkeypatch, tmp_path
+    ):
+        _, calls = fake_download
+
+        def download_executables(install_result):
+            path = tmp_path / "cache" / "downloads" / "pdf-toolkit.exe-only.zip"
+            path.write_bytes(zip_bytes({"pdf-toolkit.exe": b"exe only"}))
+            install_result.zip_file_name = str(path)
+            install_result.partial_fetch = True
+            return install_result
+
+        monkeypatch.setattr(
+            install.request_url, "download_executables", download_executables
+        )
+        result = install.install_package("pdf-toolkit", exe_only=True)
+
+        assert result.success is True
+        assert result.partial_fetch is True
+        assert calls == []
+        assert not Path(result.zip_file_name).exists()
+        assert not (tmp_path / "cache" / "assets").exists()
+
+    def test_exe_only_falls_back_to_full_download(
+        self, isolated_install, fake_download, monkeypatch
+    ):
+        _, calls = fake_download
+
+        def download_executables(install_result):
+            raise install.remote_zip.RemoteZipError("ZIP64 archives are not supported")
+
+        monkeypatch.setattr(
+            install.request_url, "download_executables", download_executables
+        )
+        result = install.install_package("pdf-toolkit", exe_only=True)
+
+        assert result.success is True
+        assert result.partial_fetch is False
+        assert calls == ["pdf-toolkit"]
+
+
+# ---------- install_packages ----------
+
+
+class TestInstallPackages:
+    def test_results_follow_input_order(self, isolated_install, fake_download):
+        results = install.install_packages(["pdf-toolkit", "cpp-cloc", "occ"], jobs=3)
+
+        assert [r.package_name for r in results] == ["pdf-toolkit", "cpp-cloc", "occ"]
+        assert all(r.success for r in results)
+        assert sorted(registry.list_package()) == [
+            "cpp-cloc 1.0.0",
+            "occ 1.0.0",
+            "pdf-toolkit 1.0.0",
+        ]
+
+    def test_duplicates_are_installed_once(self, isolated_install, fake_download):
+        _, calls = fake_download
+        results = install.install_packages(["occ", "occ"], jobs=2)
+
+        assert len(results) == 1
+        assert calls == ["occ"]
+
+    def test_same_package_in_other_case_or_with_tag_is_installed_once(
+        self, isolated_install, fake_download
+    ):
+        _, calls = fake_download
+        results = install.install_packages(["occ", "OCC", "occ@v1.0.0"], jobs=3)
+
+        assert [r.package_name for r in results] == ["occ"]
+        assert calls == ["occ"]
+
+    def test_one_failure_does_not_stop_the_others(
+        self, isolated_install, fake_download
+    ):
+        results = install.install_packages(["not-a-real-package", "occ"], jobs=2)
+
+        assert results[0].success is False
+        assert results[1].success is True
+
+    def test_downloads_overlap(self, isolated_install, fake_download, monkeypatch):
+        # Both workers must be inside download_asset at the same time for the
+        # barrier to release; a serial implementation would time out.
+        barrier = threading.Barrier(2, timeout=5)
+        inner = install.request_url.download_asset
+
+        def download_asset(install_result, segments=1, extractor=None):
+            barrier.wait()
+            return inner(install_result, segments=segments, extractor=extractor)
+
+        monkeypatch.setattr(install.request_url, "download_asset", download_asset)
+        results = install.install_packages(["occ", "sweep"], jobs=2)
+
+        assert all(r.success for r in results)
+
+    def test_on_result_called_once_per_package(self, isolated_install, fake_download):
+        seen: list[str] = []
+        install.install_packages(
+            ["occ", "sweep"], jobs=2, on_result=lambda r: seen.append(r.package_name)
+        )
+        assert sorted(seen) == ["occ", "sweep"]
+
+    def test_empty_input_returns_empty_list(self, isolated_install, fake_download):
+        assert install.install_packages([], jobs=4) == []
+
+
+# ---------- check_updates ----------
+
+
+class TestCheckUpdates:
+    def test_reports_installed_against_latest(self, isolated_install, fake_download):
+        versions, calls = fake_download
+        install.install_packages(["occ", "sweep"])
+        versions["occ"] = "2.0.0"
+
+        results = install.check_updates()
+
+        by_name = {r.package_name: r for r in results}
+        assert by_name["occ"].previous_version == "1.0.0"
+        assert by_name["occ"].version == "2.0.0"
+        assert by_name["occ"].up_to_date is False
+        assert by_name["sweep"].up_to_date is True
+        assert sorted(calls) == ["occ", "sweep"]  # nothing new downloaded
+
+    def test_lookups_overlap(self, isolated_install, fake_download, monkeypatch):
+        install.install_packages(["occ", "sweep"])
+        barrier = threading.Barrier(2, timeout=5)
+        inner = install.request_url.resolve_release
+
+        def resolve_release(package, tag=None):
+            barrier.wait()
+            return inner(package, tag=tag)
+
+        monkeypatch.setattr(install.request_url, "resolve_release", resolve_release)
+        results = install.check_updates(jobs=2)
+
+        assert all(r.success for r in results)
+
+    def test_failed_lookup_keeps_installed_version(
+        self, isolated_install, fake_download, monkeypatch
+    ):
+        install.install_package("occ")
+        monkeypatch.setattr(
+            install.request_url,
+            "resolve_release",
+            lambda package, tag=None: install._failed_result(package, "offline"),
+        )
+
+        (checked,) = install.check_updates()
+
+        assert checked.success is False
+        assert checked.previous_version == "1.0.0"
+        assert checked.up_to_date is False
+
+    def test_stale_results_install_without_resolving_again(
+        self, isolated_install, fake_download, monkeypatch
+    ):
+        versions, calls = fake_download
+        install.install_packages(["occ", "sweep"])
+        versions["sweep"] = "2.0.0"
+        stale = [r for r in install.check_updates() if not r.up_to_date]
+
+        def no_resolve(package, tag=None):
+            raise AssertionError("release was already resolved")
+
+        monkeypatch.setattr(install.request_url, "resolve_release", no_resolve)
+        results = install.install_releases(stale, jobs=2)
+
+        assert [r.package_name for r in results] == ["sweep"]
+        assert results[0].previous_version == "1.0.0"
+        assert registry.get_installed_version("sweep") == "2.0.0"
+        assert registry.get_installed_version("occ") == "1.0.0"
+        assert calls.count("occ") == 1
+
+    def test_exe_only_reaches_partial_fetch(
+        self, isolated_install, fake_download, monkeypatch, tmp_path
+    ):
+        versions, calls = fake_download
+        install.install_packages(["sweep"])
+        versions["sweep"] = "2.0.0"
+        stale = [r for r in install.check_updates() if not r.up_to_date]
+        fetched = []
+
+        def download_executables(install_result):
+            fetched.append(install_result.package_name)
+            path = tmp_path / "cache" / "downloads" / "sweep.exe-only.zip"
+            path.write_bytes(zip_bytes({"sweep.exe": b"exe only"}))
+            install_result.zip_file_name = str(path)
+            install_result.partial_fetch = True
+            return install_result
+
+        monkeypatch.setattr(
+            install.request_url, "download_executables", download_executables
+        )
+        (upgraded,) = install.install_releases(stale, exe_only=True)
+
+        assert fetched == ["sweep"]
+        assert upgraded.partial_fetch is True
+        assert calls == ["sweep"]
@@ -0,0 +1,120 @@
+"""Tests for ayushman.link"""
+
+import errno
+import zipfile
+
+import pytest
+
+import ayushman.extract_zip as extract_zip
+import ayushman.link as link
+from ayushman.result import InstallResult
+
+
+def refuse(*args, **kwargs):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "tool.exe"
+    path.write_bytes(b"MZ" + bytes(range(256)) * 5000)
+    return path
+
+
+class TestLinkFile:
+    def test_hardlink_is_preferred(self, tmp_path, src):
+        dst = tmp_path / "bin.exe"
+
+        strategy = link.link_file(src, dst)
+
+        assert strategy == link.HARDLINK
+        assert dst.stat().st_ino == src.stat().st_ino
+
+    def test_falls_back_when_hardlinks_fail(self, tmp_path, src, monkeypatch):
+        monkeypatch.setattr(link.os, "link", refuse)
+        dst = tmp_path / "bin.exe"
+
+        strategy = link.link_file(src, dst)
+
+        assert strategy in (link.REFLINK, link.ZERO_COPY, link.COPY)
+        assert dst.read_bytes() == src.read_bytes()
+        assert dst.stat().st_ino != src.stat().st_ino
+
+    def test_zero_copy_after_clone_fails(self, tmp_path, src, monkeypatch):
+        monkeypatch.setattr(link.os, "link", refuse)
+        monkeypatch.setattr(link, "_clone", refuse)
+        monkeypatch.setattr(link, "COPY_BUFFER_SIZE", 4096)
+        dst = tmp_path / "bin.exe"
+
+        strategy = link.link_file(src, dst)
+
+        assert strategy == link.ZERO_COPY
+        assert dst.read_bytes() == src.read_bytes()
+
+    def test_sendfile_when_copy_file_range_fails(self, tmp_path, src, monkeypatch):
+        if not hasattr(link.os, "sendfile"):
+            pytest.skip("os.sendfile is not available")
+        monkeypatch.setattr(link.os, "copy_file_range", refuse, raising=False)
+        dst = tmp_path / "bin.exe"
+
+        link._zero_copy(src, dst)
+
+        assert dst.read_bytes() == src.read_bytes()
+
+    def test_buffered_copy_is_the_last_resort(self, tmp_path, src, monkeypatch):
+        monkeypatch.setattr(link.os, "link", refuse)
+        monkeypatch.setattr(link, "_clone", refuse)
+        monkeypatch.setattr(link, "_zero_copy", refuse)
+        dst = tmp_path / "bin.exe"
+
+        assert link.link_file(src, dst) == link.COPY
+        assert dst.read_bytes() == src.read_bytes()
+
+    def test_existing_destination_is_replaced(self, tmp_path, src, monkeypatch):
+        monkeypatch.setattr(link.os, "link", refuse)
+        dst = tmp_path / "bin.exe"
+        dst.write_bytes(b"old version" * 100_000)
+
+        link.link_file(src, dst)
+
+        assert dst.read_bytes() == src.read_bytes()
+        assert not (tmp_path / "bin.exe.link").exists()
+
+    def test_failure_leaves_destination_untouched(self, tmp_path, src, monkeypatch):
+        for name in ("_hardlink", "_clone", "_zero_copy", "_copy"):
+            monkeypatch.setattr(link, name, refuse)
+        dst = tmp_path / "bin.exe"
+        dst.write_bytes(b"old version")
+
+        with pytest.raises(OSError):
+            link.link_file(src, dst)
+        assert dst.read_bytes() == b"old version"
+        assert not (tmp_path / "bin.exe.link").exists()
+
+
+class TestExtractFallback:
+    def test_install_succeeds_without_hardlinks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(extract_zip.global_paths, "PACKAGE_DIR", tmp_path / "pkgs")
+        monkeypatch.setattr(extract_zip.global_paths, "BIN_DIR", tmp_path / "bin")
+        monkeypatch.setattr(extract_zip.global_paths, "OBJECTS_DIR", tmp_path / "obj")
+        monkeypatch.setattr(link.os, "link", refuse)
+        zip_path = tmp_path / "pkg.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("tool.exe", b"binary")
+
+        result = extract_zip.extract_zip_file(
+            InstallResult(
+                package_name="tool",
+                version="1.0.0",
+                zip_file_name=str(zip_path),
+                install_path="",
+                success=False,
+                error_message=None,
+                metadata={},
+                metadata_path="",
+            )
+        )
+
+        assert result.success is True
+        assert result.link_strategy != link.HARDLINK
+        assert (tmp_path / "bin" / "tool.exe").read_bytes() == b"binary"
@@ -0,0 +1,249 @@
+"""Tests for ayushman.lockfile"""
+
+import hashlib
+import json
+
+import pytest
+from helpers import make_install_result, zip_bytes
+
+import ayushman.http_client as http_client
+import ayushman.lockfile as lockfile
+import ayushman.registry as registry
+from ayushman.result import InstallResult
+
+# ---------- Helpers ----------
+
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch, http_server):
+    paths = lockfile.install.global_paths
+    monkeypatch.setattr(paths, "PACKAGE_DIR", tmp_path / "packages")
+    monkeypatch.setattr(paths, "BIN_DIR", tmp_path / "bin")
+    monkeypatch.setattr(paths, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(paths, "OBJECTS_DIR", tmp_path / "objects")
+    monkeypatch.setattr(registry, "REGISTRY_PATH", tmp_path / "metadata.json")
+    monkeypatch.setattr(http_client, "BACKOFF_FACTOR", 0)
+    # Any API lookup would hit this server and fail the test
+    monkeypatch.setattr(lockfile.request_url, "GITHUB_API_URL", http_server.url("/api"))
+    http_client.close_session()
+    yield http_server
+    http_client.close_session()
+
+
+def serve_package(server, name: str, tag: str) -> lockfile.LockedPackage:
+    """Serve a release ZIP for `name` and return its pinned release."""
+    data = zip_bytes({f"{name}.exe": f"{name} {tag}".encode()})
+    server.routes[f"/download/{name}-{tag}.zip"] = [(200, {}, data)]
+    return lockfile.LockedPackage(
+        name,
+        tag,
+        server.url(f"/download/{name}-{tag}.zip"),
+        hashlib.sha256(data).hexdigest(),
+        len(data),
+    )
+
+
+def installed(name: str, tag: str, **overrides) -> InstallResult:
+    fields = dict(
+        package_name=name,
+        version=tag,
+        zip_file_name=f"{name}.zip",
+        asset_url=f"https://example.invalid/{name}.zip",
+        asset_size=10,
+        remote_sha256="ab" * 32,
+    )
+    fields.update(overrides)
+    return make_install_result(**fields)
+
+
+# ---------- lock_installed / write_lockfile / read_lockfile ----------
+
+
+class TestLock:
+    def test_pins_active_versions(self, isolated):
+        registry.add_package(installed("occ", "v1"))
+        registry.add_package(installed("occ", "v2", remote_sha256="cd" * 32))
+        registry.add_package(installed("cpp-cloc", "v3"))
+
+        locked, unresolved = lockfile.lock_installed()
+
+        assert unresolved == {}
+        assert [(p.name, p.tag, p.sha256) for p in locked] == [
+            ("cpp-cloc", "v3", "ab" * 32),
+            ("occ", "v2", "cd" * 32),
+        ]
+        assert isolated.requests == []
+
+    def test_old_entries_are_resolved_by_tag(self, isolated, monkeypatch):
+        registry.add_package(installed("occ", "v1", asset_url="", remote_sha256=None))
+        asked = []
+
+        def resolve_release(package, tag=None):
+            asked.append((package, tag))
+            return installed(package, tag, remote_sha256="ef" * 32)
+
+        monkeypatch.setattr(lockfile.request_url, "resolve_release", resolve_release)
+        locked, unresolved = lockfile.lock_installed()
+
+        assert asked == [("occ", "v1")]
+        assert locked[0].sha256 == "ef" * 32
+
+    def test_release_without_sha256_is_not_pinned(self, isolated, monkeypatch):
+        registry.add_package(installed("occ", "v1", remote_sha256=None))
+        monkeypatch.setattr(
+            lockfile.request_url,
+            "resolve_release",
+            lambda package, tag=None: installed(package, tag, remote_sha256=None),
+        )
+
+        locked, unresolved = lockfile.lock_installed()
+
+        assert locked == []
+        assert "no sha256" in unresolved["occ"]
+
+    def test_round_trip(self, isolated, tmp_path):
+        pinned = [lockfile.LockedPackage("occ", "v1", "https://x/occ.zip", "ab" * 32)]
+        path = tmp_path / "ayushman-lock.json"
+
+        lockfile.write_lockfile(path, pinned)
+        read = lockfile.read_lockfile(path)
+
+        assert [(p.name, p.tag, p.asset_url, p.sha256, p.asset_size) for p in read] == [
+            ("occ", "v1", "https://x/occ.zip", "ab" * 32, None)
+        ]
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_failed_write_keeps_previous_lockfile(self, tmp_path, monkeypatch):
+        path = tmp_path / "ayushman-lock.json"
+        old = [lockfile.LockedPackage("occ", "v1", "https://x/occ.zip", "ab" * 32)]
+        lockfile.write_lockfile(path, old)
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        with monkeypatch.context() as m, pytest.raises(OSError):
+            m.setattr(json, "dump", fail)
+            lockfile.write_lockfile(path, [])
+
+        assert [p.tag for p in lockfile.read_lockfile(path)] == ["v1"]
+        assert list(tmp_path.iterdir()) == [path]
+
+
+class TestReadLockfile:
+    def write(self, tmp_path, data) -> str:
+        path = tmp_path / "lock.json"
+        path.write_text(data if isinstance(data, str) else json.dumps(data))
+        return str(path)
+
+    def entry(self, **overrides) -> dict:
+        entry = {
+            "name": "occ",
+            "tag": "v1",
+            "asset_url": "https://x/occ.zip",
+            "sha256": "ab" * 32,
+        }
+        entry.update(overrides)
+        return entry
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            "{not json",
+            {"packages": []},
+            {"lockfile_version": 99, "packages": []},
+            {"lockfile_version": 1, "packages": [{"name": "occ"}]},
+        ],
+    )
+    def test_malformed_lockfile(self, tmp_path, data):
+        with pytest.raises(lockfile.LockfileError):
+            lockfile.read_lockfile(self.write(tmp_path, data))
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"sha256": "not-a-digest"},
+            {"asset_url": "file:///etc/passwd"},
+            {"asset_size": "big"},
+            {"tag": "../../x"},
+            {"tag": "v1/x"},
+            {"tag": ".."},
+        ],
+    )
+    def test_malformed_entry(self, tmp_path, overrides):
+        path = self.write(
+            tmp_path, {"lockfile_version": 1, "packages": [self.entry(**overrides)]}
+        )
+        with pytest.raises(lockfile.LockfileError):
+            lockfile.read_lockfile(path)
+
+    def test_package_locked_twice(self, tmp_path):
+        path = self.write(
+            tmp_path,
+            {"lockfile_version": 1, "packages": [self.entry(), self.entry(tag="v2")]},
+        )
+        with pytest.raises(lockfile.LockfileError, match="more than once"):
+            lockfile.read_lockfile(path)
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(lockfile.LockfileError, match="cannot read"):
+            lockfile.read_lockfile(tmp_path / "missing.json")
+
+
+# ---------- sync ----------
+
+
+class TestSync:
+    def test_installs_locked_releases_without_api_requests(self, isolated, tmp_path):
+        path = tmp_path / "lock.json"
+        lockfile.write_lockfile(
+            path,
+            [
+                serve_package(isolated, "occ", "v1"),
+                serve_package(isolated, "sweep", "v2"),
+            ],
+        )
+
+        results = lockfile.sync(path, jobs=2)
+
+        assert [(r.package_name, r.version, r.success) for r in results] == [
+            ("occ", "v1", True),
+            ("sweep", "v2", True),
+        ]
+        assert all(r.hash_verified for r in results)
+        assert (tmp_path / "bin" / "occ.exe").read_bytes() == b"occ v1"
+        assert registry.get_installed_version("sweep") == "v2"
+        assert not any(p.startswith("/api") for _, p, _ in isolated.requests)
+
+    def test_hash_mismatch_fails_that_package(self, isolated, tmp_path):
+        occ = serve_package(isolated, "occ", "v1")
+        occ.sha256 = "0" * 64
+        path = tmp_path / "lock.json"
+        lockfile.write_lockfile(path, [occ, serve_package(isolated, "sweep", "v2")])
+
+        occ_result, sweep_result = lockfile.sync(path)
+
+        assert occ_result.success is False
+        assert "sha256 mismatch" in occ_result.error_message
+        assert registry.is_package_installed("occ") is False
+        assert sweep_result.success is True
+
+    def test_synced_lockfile_is_up_to_date(self, isolated, tmp_path):
+        path = tmp_path / "lock.json"
+        lockfile.write_lockfile(path, [serve_package(isolated, "occ", "v1")])
+        lockfile.sync(path)
+        before = len(isolated.requests)
+
+        (again,) = lockfile.sync(path)
+
+        assert again.up_to_date is True
+        assert len(isolated.requests) == before
+
+    def test_unsupported_package_is_rejected(self, isolated, tmp_path):
+        path = tmp_path / "lock.json"
+        lockfile.write_lockfile(path, [serve_package(isolated, "not-a-package", "v1")])
+
+        (rejected,) = lockfile.sync(path)
+
+        assert rejected.success is False
+        assert "not found" in rejected.error_message
+        assert isolated.requests == []
@@ -0,0 +1,123 @@
+"""Tests for ayushman.object_store"""
+
+import hashlib
+import zlib
+
+import pytest
+
+import ayushman.object_store as object_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(object_store.global_paths, "OBJECTS_DIR", tmp_path / "objects")
+    return tmp_path
+
+
+def write(path, content: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def add(path, content: bytes) -> str:
+    return object_store.add(path, zlib.crc32(content), len(content))
+
+
+class TestAdd:
+    def test_new_file_is_linked_into_the_store(self, store):
+        exe = write(store / "v1" / "tool.exe", b"binary")
+
+        sha256 = add(exe, b"binary")
+
+        stored = object_store.object_path(sha256)
+        assert sha256 == hashlib.sha256(b"binary").hexdigest()
+        assert stored.stat().st_ino == exe.stat().st_ino
+        assert stored.stat().st_nlink == 2
+
+    def test_duplicate_is_replaced_by_a_link(self, store):
+        first = write(store / "v1" / "tool.exe", b"binary")
+        second = write(store / "v2" / "tool.exe", b"binary")
+
+        add(first, b"binary")
+        sha256 = add(second, b"binary")
+
+        assert second.stat().st_ino == first.stat().st_ino
+        assert object_store.object_path(sha256).stat().st_nlink == 3
+
+    def test_adding_twice_is_harmless(self, store):
+        exe = write(store / "v1" / "tool.exe", b"binary")
+
+        add(exe, b"binary")
+        sha256 = add(exe, b"binary")
+
+        assert object_store.object_path(sha256).stat().st_nlink == 2
+
+
+class TestLookupAndLink:
+    def test_lookup_by_crc_and_size(self, store):
+        sha256 = add(write(store / "v1" / "tool.exe", b"binary"), b"binary")
+
+        assert object_store.lookup(zlib.crc32(b"binary"), 6) == sha256
+        assert object_store.lookup(zlib.crc32(b"binary"), 7) is None
+        assert object_store.lookup(0, 6) is None
+
+    def test_lookup_ignores_removed_objects(self, store):
+        sha256 = add(write(store / "v1" / "tool.exe", b"binary"), b"binary")
+        object_store.object_path(sha256).unlink()
+
+        assert object_store.lookup(zlib.crc32(b"binary"), 6) is None
+
+    def test_link_replaces_existing_file(self, store):
+        sha256 = add(write(store / "v1" / "tool.exe", b"binary"), b"binary")
+        dest = write(store / "v2" / "tool.exe", b"old")
+
+        assert object_store.link(sha256, dest) is True
+        assert dest.read_bytes() == b"binary"
+        assert not (store / "v2" / "tool.exe.link").exists()
+
+    def test_relinking_the_same_file_leaves_no_temporary(self, store):
+        exe = write(store / "v1" / "tool.exe", b"binary")
+        sha256 = add(exe, b"binary")
+
+        assert object_store.link(sha256, exe) is True
+        assert sorted(p.name for p in exe.parent.iterdir()) == ["tool.exe"]
+
+    def test_link_to_missing_object_fails(self, store):
+        dest = store / "tool.exe"
+
+        assert object_store.link("0" * 64, dest) is False
+        assert not dest.exists()
+
+
+class TestCollect:
+    def test_only_unreferenced_objects_are_removed(self, store):
+        kept = write(store / "v1" / "kept.exe", b"kept")
+        gone = write(store / "v1" / "gone.exe", b"gone")
+        kept_sha = add(kept, b"kept")
+        gone_sha = add(gone, b"gone")
+        gone.unlink()
+
+        removed = object_store.collect()
+
+        assert [obj.sha256 for obj in removed] == [gone_sha]
+        assert object_store.object_path(kept_sha).exists()
+        assert not object_store.object_path(gone_sha).exists()
+        assert object_store.lookup(zlib.crc32(b"gone"), 4) is None
+
+    def test_candidates_limit_what_is_removed(self, store):
+        first = write(store / "first.exe", b"first")
+        second = write(store / "second.exe", b"second")
+        first_sha = add(first, b"first")
+        second_sha = add(second, b"second")
+        first.unlink()
+        second.unlink()
+
+        removed = object_store.collect([first_sha, "f" * 64])
+
+        assert [obj.sha256 for obj in removed] == [first_sha]
+        assert object_store.object_path(second_sha).exists()
+
+    def test_empty_store(self, store):
+        assert object_store.collect() == []
+        assert object_store.list_objects() == []
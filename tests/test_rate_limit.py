@@ -0,0 +1,173 @@
+"""Tests for ayushman.rate_limit"""
+
+import json
+
+import pytest
+
+import ayushman.constants as constants
+import ayushman.http_client as http_client
+import ayushman.rate_limit as rate_limit
+import ayushman.request_url as request_url
+
+
+class FakeClock:
+    """A clock that only moves when something sleeps."""
+
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return rate_limit.RateLimiter(clock=clock.time, sleep=clock.sleep)
+
+
+def headers(limit, remaining, reset):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(reset),
+    }
+
+
+class TestRateLimiter:
+    def test_unknown_budget_never_waits(self, limiter, clock):
+        for _ in range(10):
+            assert limiter.acquire() == 0
+        assert clock.sleeps == []
+
+    def test_plenty_of_budget_never_waits(self, limiter, clock):
+        limiter.update(headers(5000, 4000, 4600))
+
+        for _ in range(10):
+            limiter.acquire()
+
+        assert clock.sleeps == []
+        assert limiter.budget().remaining == 3990
+
+    def test_low_budget_spreads_calls_until_reset(self, limiter, clock):
+        # 4 requests left, 400 seconds to go: one call every 100 seconds
+        limiter.update(headers(100, 4, 1_400))
+
+        waits = [limiter.acquire() for _ in range(3)]
+
+        assert waits == [0, 100, 100]
+
+    def test_exhausted_budget_waits_for_reset(self, limiter, clock):
+        limiter.update(headers(60, 0, 1_030))
+
+        waited = limiter.acquire()
+
+        assert waited == 30 + rate_limit.RESET_GRACE
+        assert limiter.budget().remaining == 59
+
+    def test_reset_too_far_away_raises(self, limiter, clock):
+        limiter.update(headers(60, 0, 1_000 + rate_limit.MAX_WAIT + 60))
+
+        with pytest.raises(rate_limit.RateLimitExceeded, match="resets at"):
+            limiter.acquire()
+        assert clock.sleeps == []
+
+    def test_elapsed_window_refills_budget(self, limiter, clock):
+        limiter.update(headers(60, 0, 900))
+
+        assert limiter.acquire() == 0
+
+    def test_lowest_remaining_wins_within_a_window(self, limiter):
+        limiter.update(headers(5000, 10, 4600))
+        limiter.update(headers(5000, 12, 4600))
+
+        assert limiter.budget().remaining == 10
+
+    def test_new_window_replaces_budget(self, limiter):
+        limiter.update(headers(5000, 10, 4600))
+        limiter.update(headers(5000, 4999, 8200))
+
+        assert limiter.budget().remaining == 4999
+
+    def test_responses_without_headers_are_ignored(self, limiter):
+        limiter.update({"Content-Type": "application/json"})
+
+        assert limiter.budget() is None
+
+
+# ---------- HTTP integration ----------
+
+
+@pytest.fixture
+def api(http_server, monkeypatch, clock, limiter, tmp_path):
+    monkeypatch.setattr(rate_limit, "limiter", limiter)
+    monkeypatch.setattr(http_client, "BACKOFF_FACTOR", 0)
+    monkeypatch.setattr(request_url, "GITHUB_API_URL", http_server.url(""))
+    monkeypatch.setattr(request_url.global_paths, "CACHE_DIR", tmp_path / "cache")
+    http_client.close_session()
+    yield http_server
+    http_client.close_session()
+
+
+class TestApiGet:
+    def test_response_headers_update_the_budget(self, api, limiter):
+        api.routes["/r"] = [(200, headers(5000, 4321, 4600), b"{}")]
+
+        http_client.api_get(api.url("/r"))
+
+        assert limiter.budget().remaining == 4321
+
+    def test_exhausted_response_is_retried_after_reset(self, api, clock):
+        api.routes["/r"] = [
+            (403, headers(60, 0, 1_020), b'{"message": "rate limit exceeded"}'),
+            (200, headers(60, 59, 4_600), b"{}"),
+        ]
+
+        response = http_client.api_get(api.url("/r"))
+
+        assert response.status_code == 200
+        assert clock.sleeps == [20 + rate_limit.RESET_GRACE]
+        assert len(api.requests) == 2
+
+    def test_plain_403_is_not_retried(self, api):
+        api.routes["/r"] = [(403, {}, b"forbidden")]
+
+        response = http_client.api_get(api.url("/r"))
+
+        assert response.status_code == 403
+        assert len(api.requests) == 1
+
+
+class TestBulkEstimate:
+    def test_fetch_rate_limit_reads_core_budget(self, api):
+        body = {"resources": {"core": {"limit": 60, "remaining": 7, "reset": 4600}}}
+        api.routes["/rate_limit"] = [(200, {}, json.dumps(body).encode())]
+
+        budget = request_url.fetch_rate_limit()
+
+        assert (budget.limit, budget.remaining, budget.reset) == (60, 7, 4600)
+
+    def test_fetch_rate_limit_failure_returns_none(self, api):
+        api.routes["/rate_limit"] = [(200, {}, b"not json")]
+
+        assert request_url.fetch_rate_limit() is None
+
+    def test_fresh_releases_are_not_counted(self, api):
+        path = f"/repos/{constants.GITHUB_OWNER}/occ/releases/latest"
+        release = {"tag_name": "v1", "assets": [{"name": "occ.zip", "size": 1}]}
+        api.routes[path] = [(200, {}, json.dumps(release).encode())]
+        request_url.resolve_release("occ")
+
+        assert request_url.api_requests_needed(["occ", "OCC", "pdf", "grep"]) == 2
+
+    def test_only_first_spec_of_a_package_counts(self, api):
+        assert request_url.api_requests_needed(["occ", "occ@v9", "OCC@v8"]) == 1
@@ -1,6 +1,9 @@
 """Tests for ayushman.registry"""
 
 import json
+import multiprocessing
+import os
+import threading
 
 import pytest
 
@@ -36,12 +39,20 @@ def isolated_registry(tmp_path, monkeypatch):
     return fake_path
 
 
+def _append_packages(json_path: str, prefix: str, count: int) -> None:
+    """Worker process: record `count` packages through the journal backend."""
+    os.environ[registry.COMPACT_ENTRIES_ENV] = "7"
+    journaled = registry.JournaledRegistry(json_path)
+    for i in range(count):
+        journaled.add_version(f"{prefix}-{i}", "1.0.0", {})
+
+
 class TestEnsureAndReadMetadata:
-    def test_creates_file_with_empty_list_if_missing(self, isolated_registry):
+    def test_creates_file_with_empty_registry_if_missing(self, isolated_registry):
         assert not isolated_registry.exists()
         data = registry._read_metadata()
         assert isolated_registry.exists()
-        assert data == {"installed_packages": []}
+        assert data == {"schema_version": registry.SCHEMA_VERSION, "packages": {}}
 
     def test_creates_parent_directories_if_missing(self, tmp_path, monkeypatch):
         nested_path = tmp_path / "nested" / "dir" / "metadata.json"
@@ -51,46 +62,105 @@ class TestEnsureAndReadMetadata:
 
     def test_does_not_overwrite_existing_file(self, isolated_registry):
         isolated_registry.write_text(
-            json.dumps({"installed_packages": [{"name": "x", "version": "1"}]})
+            json.dumps(
+                {"schema_version": 2, "packages": {"x": {"versions": {"1": {}}}}}
+            )
         )
-        data = registry._read_metadata()
-        assert data == {"installed_packages": [{"name": "x", "version": "1"}]}
+        assert registry.get_installed_version("x") == "1"
+
+    def test_newer_schema_is_refused(self, isolated_registry):
+        isolated_registry.write_text(json.dumps({"schema_version": 99}))
+        with pytest.raises(ValueError, match="schema 99"):
+            registry.list_package()
+
+
+class TestMigrateV1:
+    V1 = {
+        "installed_packages": [
+            {"name": "pdf-toolkit", "version": "2.0.0", "install_path": "p2"},
+            {"name": "occ", "version": "1.0.0", "install_path": "o1"},
+            {"name": "pdf-toolkit", "version": "1.0.0", "install_path": "p1"},
+        ],
+        "bin_in_path": True,
+    }
+
+    def test_v1_file_is_migrated_on_first_read(self, isolated_registry):
+        isolated_registry.write_text(json.dumps(self.V1))
+
+        assert registry.list_package() == [
+            "pdf-toolkit 2.0.0",
+            "pdf-toolkit 1.0.0",
+            "occ 1.0.0",
+        ]
+        assert registry.get_bin_in_path() is True
+
+        data = json.loads(isolated_registry.read_text())
+        assert data["schema_version"] == 2
+        assert "installed_packages" not in data
+        assert data["packages"]["pdf-toolkit"]["versions"] == {
+            "1.0.0": {"install_path": "p1"},
+            "2.0.0": {"install_path": "p2"},
+        }
+
+    def test_original_is_kept(self, isolated_registry):
+        isolated_registry.write_text(json.dumps(self.V1))
+        registry.list_package()
+
+        backup = isolated_registry.with_name(isolated_registry.name + ".v1")
+        assert json.loads(backup.read_text()) == self.V1
+
+    def test_history_survives_migration(self, isolated_registry):
+        isolated_registry.write_text(json.dumps(self.V1))
+
+        assert registry.get_installed_versions("pdf-toolkit") == ["2.0.0", "1.0.0"]
+        assert registry.get_package_metadata("occ")["install_path"] == "o1"
 
 
 class TestAddPackage:
+    def stored(self, isolated_registry) -> dict:
+        return json.loads(isolated_registry.read_text())["packages"]
+
     def test_adds_new_package_entry(self, isolated_registry):
         registry.add_package(make_install_result())
-        data = json.loads(isolated_registry.read_text())
-        assert len(data["installed_packages"]) == 1
-        entry = data["installed_packages"][0]
-        assert entry["name"] == "pdf-toolkit"
-        assert entry["version"] == "1.0.0"
-        assert entry["install_path"] == r"C:\bin\pdf-toolkit\1.0.0"
+        packages = self.stored(isolated_registry)
+        assert list(packages) == ["pdf-toolkit"]
+        record = packages["pdf-toolkit"]["versions"]["1.0.0"]
+        assert record["install_path"] == r"C:\bin\pdf-toolkit\1.0.0"
 
     def test_replaces_existing_entry_for_same_name_and_version(self, isolated_registry):
         registry.add_package(make_install_result(install_path="old-path"))
         registry.add_package(make_install_result(install_path="new-path"))
 
-        data = json.loads(isolated_registry.read_text())
-        matching = [p for p in data["installed_packages"] if p["name"] == "pdf-toolkit"]
-        assert len(matching) == 1
-        assert matching[0]["install_path"] == "new-path"
+        versions = self.stored(isolated_registry)["pdf-toolkit"]["versions"]
+        assert list(versions) == ["1.0.0"]
+        assert versions["1.0.0"]["install_path"] == "new-path"
 
     def test_keeps_separate_entries_for_different_versions(self, isolated_registry):
         registry.add_package(make_install_result(version="1.0.0"))
         registry.add_package(make_install_result(version="2.0.0"))
 
-        data = json.loads(isolated_registry.read_text())
-        versions = sorted(p["version"] for p in data["installed_packages"])
-        assert versions == ["1.0.0", "2.0.0"]
+        versions = self.stored(isolated_registry)["pdf-toolkit"]["versions"]
+        assert sorted(versions) == ["1.0.0", "2.0.0"]
 
     def test_keeps_separate_entries_for_different_packages(self, isolated_registry):
         registry.add_package(make_install_result(package_name="pdf-toolkit"))
         registry.add_package(make_install_result(package_name="cpp-cloc"))
 
-        data = json.loads(isolated_registry.read_text())
-        names = sorted(p["name"] for p in data["installed_packages"])
-        assert names == ["cpp-cloc", "pdf-toolkit"]
+        assert sorted(self.stored(isolated_registry)) == ["cpp-cloc", "pdf-toolkit"]
+
+    def test_records_release_asset(self, isolated_registry):
+        registry.add_package(
+            make_install_result(
+                asset_url="https://example.invalid/pdf-toolkit.zip",
+                asset_size=2048,
+                remote_sha256="ab" * 32,
+            )
+        )
+
+        entry = registry.get_package_metadata("pdf-toolkit")
+        assert entry["asset_url"] == "https://example.invalid/pdf-toolkit.zip"
+        assert entry["asset_size"] == 2048
+        assert entry["sha256"] == "ab" * 32
 
 
 class TestListPackage:
@@ -114,6 +184,46 @@ class TestGetInstalledVersion:
         )
         assert registry.get_installed_version("pdf-toolkit") == "1.2.3"
 
+    def test_returns_most_recently_added_version(self, isolated_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+        assert registry.get_installed_version("pdf-toolkit") == "2.0.0"
+
+
+class TestVersionHistory:
+    def test_versions_most_recent_first(self, isolated_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+        registry.add_package(make_install_result(package_name="occ"))
+
+        assert registry.get_installed_versions("pdf-toolkit") == ["2.0.0", "1.0.0"]
+        assert registry.get_installed_versions("sweep") == []
+
+    def test_activate_moves_version_to_front(self, isolated_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+
+        assert registry.activate_version("pdf-toolkit", "1.0.0") is True
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+        assert registry.get_installed_versions("pdf-toolkit") == ["1.0.0", "2.0.0"]
+
+    def test_activate_unknown_version(self, isolated_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+
+        assert registry.activate_version("pdf-toolkit", "3.0.0") is False
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+
+    def test_active_packages_one_entry_each(self, isolated_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(package_name="occ"))
+        registry.add_package(make_install_result(version="2.0.0"))
+
+        active = registry.get_active_packages()
+        assert [(p["name"], p["version"]) for p in active] == [
+            ("pdf-toolkit", "2.0.0"),
+            ("occ", "1.0.0"),
+        ]
+
 
 class TestIsPackageInstalled:
     def test_false_if_not_installed(self, isolated_registry):
@@ -176,3 +286,363 @@ class TestBinInPathFlag:
 
         assert registry.get_bin_in_path() is True
         assert registry.is_package_installed("pdf-toolkit") is True
+
+
+class TestRegistryCache:
+    @pytest.fixture
+    def parses(self, monkeypatch):
+        calls: list[int] = []
+        inner = json.load
+
+        def counting_load(f):
+            calls.append(1)
+            return inner(f)
+
+        monkeypatch.setattr(registry.json, "load", counting_load)
+        return calls
+
+    def test_queries_share_one_parse(self, isolated_registry, parses):
+        isolated_registry.write_text(
+            json.dumps(
+                {"schema_version": 2, "packages": {"occ": {"versions": {"1": {}}}}}
+            )
+        )
+
+        registry.get_installed_version("occ")
+        registry.is_package_installed("occ")
+        registry.list_package()
+        registry.get_bin_in_path()
+
+        assert len(parses) == 1
+
+    def test_own_writes_are_not_parsed_again(self, isolated_registry, parses):
+        registry.add_package(make_install_result())
+        registry.set_bin_in_path(True)
+        before = len(parses)
+
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+        assert registry.get_bin_in_path() is True
+        assert len(parses) == before
+
+    def test_external_change_is_picked_up(self, isolated_registry):
+        registry.add_package(make_install_result())
+        isolated_registry.write_text(json.dumps({"schema_version": 2, "packages": {}}))
+
+        assert registry.is_package_installed("pdf-toolkit") is False
+
+    def test_snapshot_is_unaffected_by_later_writes(self, isolated_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        view = registry.snapshot()
+        registry.add_package(make_install_result(version="2.0.0"))
+
+        assert view.get("pdf-toolkit")["version"] == "1.0.0"
+        assert registry.get_installed_version("pdf-toolkit") == "2.0.0"
+
+    def test_returned_entries_are_copies(self, isolated_registry):
+        registry.add_package(make_install_result())
+        registry.get_package_metadata("pdf-toolkit")["version"] = "tampered"
+
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+
+    def test_get_many(self, isolated_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+        registry.add_package(make_install_result(package_name="occ"))
+
+        entries = registry.get_many(["pdf-toolkit", "sweep", "occ"])
+
+        assert list(entries) == ["pdf-toolkit", "sweep", "occ"]
+        assert entries["pdf-toolkit"]["version"] == "2.0.0"
+        assert entries["sweep"] == {}
+        assert entries["occ"]["version"] == "1.0.0"
+
+
+class TestJournal:
+    @pytest.fixture
+    def journaled(self, isolated_registry, monkeypatch):
+        monkeypatch.setenv(registry.BACKEND_ENV, "journal")
+        return isolated_registry.with_name("metadata.json.journal")
+
+    def fresh_process(self):
+        """Forget the cached registries, as a new ayushman process would."""
+        registry._registries.clear()
+
+    def journal_lines(self, journal) -> list[dict]:
+        return [json.loads(line) for line in journal.read_text().splitlines()]
+
+    def test_updates_are_appended_not_rewritten(self, isolated_registry, journaled):
+        registry.list_package()
+        before = isolated_registry.read_bytes()
+
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+        registry.activate_version("pdf-toolkit", "1.0.0")
+        registry.set_bin_in_path(True)
+        registry.remove_package("pdf-toolkit")
+
+        assert isolated_registry.read_bytes() == before
+        assert [(e["seq"], e["op"]) for e in self.journal_lines(journaled)] == [
+            (1, "add"),
+            (2, "add"),
+            (3, "activate"),
+            (4, "set"),
+            (5, "remove"),
+        ]
+
+    def test_journal_is_replayed_on_read(self, journaled):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+        registry.add_package(make_install_result(package_name="occ"))
+        registry.activate_version("pdf-toolkit", "1.0.0")
+        registry.set_bin_in_path(True)
+        self.fresh_process()
+
+        assert registry.list_package() == [
+            "pdf-toolkit 1.0.0",
+            "pdf-toolkit 2.0.0",
+            "occ 1.0.0",
+        ]
+        assert registry.get_bin_in_path() is True
+
+    def test_append_does_not_copy_the_registry(self, journaled, monkeypatch):
+        registry.add_package(make_install_result(package_name="occ"))
+        view = registry.snapshot()
+
+        def no_copy(data):
+            raise AssertionError("updates must not copy every package")
+
+        with monkeypatch.context() as m:
+            m.setattr(registry, "_copy", no_copy)
+            registry.add_package(make_install_result())
+            registry.remove_package("occ")
+
+        assert registry.list_package() == ["pdf-toolkit 1.0.0"]
+        assert view.get("occ")["version"] == "1.0.0"
+        assert view.get("pdf-toolkit") == {}
+
+    def test_other_process_appends_are_picked_up(self, isolated_registry, journaled):
+        registry.add_package(make_install_result())
+        other = registry.JournaledRegistry(isolated_registry)
+        other.add_version("occ", "1.0.0", {})
+
+        assert registry.is_package_installed("occ") is True
+
+    def test_concurrent_appends_get_distinct_seqs(self, isolated_registry, journaled):
+        registry.list_package()
+        other = registry.JournaledRegistry(isolated_registry)
+
+        with registry.transaction():
+            registry.add_package(make_install_result())
+            # Appended while this process's update is still pending
+            other.add_version("occ", "1.0.0", {})
+
+        assert [e["seq"] for e in self.journal_lines(journaled)] == [1, 2]
+        assert registry.list_package() == ["pdf-toolkit 1.0.0", "occ 1.0.0"]
+        self.fresh_process()
+        assert registry.list_package() == ["pdf-toolkit 1.0.0", "occ 1.0.0"]
+
+    def test_processes_do_not_lose_updates(self, isolated_registry, journaled):
+        registry.list_package()
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(
+                target=_append_packages,
+                args=(str(isolated_registry), f"p{n}", 20),
+            )
+            for n in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            assert worker.exitcode == 0
+
+        self.fresh_process()
+        assert len(registry.list_package()) == 60
+
+    def test_torn_last_line_is_ignored(self, journaled):
+        registry.add_package(make_install_result(version="1.0.0"))
+        with open(journaled, "ab") as f:
+            f.write(b'{"seq": 2, "op": "remove", "na')
+        self.fresh_process()
+
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+
+        registry.add_package(make_install_result(package_name="occ"))
+        self.fresh_process()
+        assert registry.list_package() == ["occ 1.0.0", "pdf-toolkit 1.0.0"]
+
+    def test_compacts_at_threshold(self, isolated_registry, journaled, monkeypatch):
+        monkeypatch.setenv(registry.COMPACT_ENTRIES_ENV, "3")
+        for version in ("1.0.0", "2.0.0", "3.0.0"):
+            registry.add_package(make_install_result(version=version))
+
+        assert journaled.read_bytes() == b""
+        data = json.loads(isolated_registry.read_text())
+        assert data["journal_seq"] == 3
+        assert list(data["packages"]["pdf-toolkit"]["versions"]) == [
+            "1.0.0",
+            "2.0.0",
+            "3.0.0",
+        ]
+
+    def test_interrupted_compaction_does_not_reapply(self, journaled):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+        registry.activate_version("pdf-toolkit", "1.0.0")
+        registry.remove_package("pdf-toolkit")
+        registry.add_package(make_install_result(package_name="occ"))
+        journal = journaled.read_bytes()
+
+        registry.get_registry().compact()
+        # Crash after the rename, before the journal was truncated
+        journaled.write_bytes(journal)
+        registry.add_package(make_install_result(version="3.0.0"))
+        self.fresh_process()
+
+        assert registry.list_package() == ["pdf-toolkit 3.0.0", "occ 1.0.0"]
+
+    def test_json_backend_folds_journal_in(
+        self, isolated_registry, journaled, monkeypatch
+    ):
+        registry.add_package(make_install_result(version="1.0.0"))
+        monkeypatch.setenv(registry.BACKEND_ENV, "json")
+        self.fresh_process()
+
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+        registry.add_package(make_install_result(package_name="occ"))
+
+        assert journaled.read_bytes() == b""
+        assert list(json.loads(isolated_registry.read_text())["packages"]) == [
+            "pdf-toolkit",
+            "occ",
+        ]
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            (None, registry.DEFAULT_COMPACT_ENTRIES),
+            ("25", 25),
+            ("0", 1000),
+            ("x", 1000),
+        ],
+    )
+    def test_get_compact_entries(self, monkeypatch, value, expected):
+        if value is None:
+            monkeypatch.delenv(registry.COMPACT_ENTRIES_ENV, raising=False)
+        else:
+            monkeypatch.setenv(registry.COMPACT_ENTRIES_ENV, value)
+        assert registry.get_compact_entries() == expected
+
+
+class TestAtomicWrite:
+    def test_failed_write_keeps_registry(self, isolated_registry):
+        registry.add_package(make_install_result())
+        before = isolated_registry.read_bytes()
+
+        with pytest.raises(TypeError):
+            registry._write_metadata({"packages": {}, "broken": object()})
+
+        assert isolated_registry.read_bytes() == before
+        assert registry.is_package_installed("pdf-toolkit") is True
+        assert sorted(p.name for p in isolated_registry.parent.iterdir()) == [
+            "metadata.json"
+        ]
+
+
+class TestTransaction:
+    @pytest.fixture
+    def writes(self, monkeypatch):
+        """Count whole-file writes of the registry."""
+        calls = []
+        write_json = registry.utils.write_json
+
+        def counting(path, data, indent=4):
+            calls.append(path)
+            write_json(path, data, indent)
+
+        monkeypatch.setattr(registry.utils, "write_json", counting)
+        return calls
+
+    def test_updates_are_written_once(self, isolated_registry, writes):
+        registry.list_package()
+        writes.clear()
+
+        with registry.transaction():
+            registry.add_package(make_install_result(version="1.0.0"))
+            registry.add_package(make_install_result(package_name="occ"))
+            registry.set_bin_in_path(True)
+            # Visible to reads at once, but not written yet
+            assert registry.is_package_installed("occ") is True
+            assert "occ" not in isolated_registry.read_text()
+            assert writes == []
+
+        assert writes == [isolated_registry]
+        data = json.loads(isolated_registry.read_text())
+        assert list(data["packages"]) == ["pdf-toolkit", "occ"]
+        assert data["bin_in_path"] is True
+
+    def test_nested_transactions_join(self, isolated_registry, writes):
+        registry.list_package()
+        writes.clear()
+
+        with registry.transaction():
+            with registry.transaction():
+                registry.add_package(make_install_result())
+            assert writes == []
+
+        assert writes == [isolated_registry]
+
+    def test_updates_are_written_when_block_raises(self, isolated_registry):
+        with pytest.raises(RuntimeError):
+            with registry.transaction():
+                registry.add_package(make_install_result())
+                raise RuntimeError("interrupted")
+
+        registry._registries.clear()
+        assert registry.is_package_installed("pdf-toolkit") is True
+
+    def test_updates_from_other_threads_are_grouped(self, isolated_registry, writes):
+        registry.list_package()
+        writes.clear()
+
+        def add(name: str) -> None:
+            registry.add_package(make_install_result(package_name=name))
+
+        with registry.transaction():
+            threads = [
+                threading.Thread(target=add, args=(f"pkg-{n}",)) for n in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(writes) == 1
+        assert len(json.loads(isolated_registry.read_text())["packages"]) == 4
+
+    def test_journal_appends_once(self, isolated_registry, monkeypatch):
+        monkeypatch.setenv(registry.BACKEND_ENV, "journal")
+        journal = isolated_registry.with_name("metadata.json.journal")
+        registry.list_package()
+        fsyncs = []
+        fsync = registry.os.fsync
+        monkeypatch.setattr(
+            registry.os, "fsync", lambda fd: fsyncs.append(fd) or fsync(fd)
+        )
+
+        with registry.transaction():
+            registry.add_package(make_install_result(version="1.0.0"))
+            registry.add_package(make_install_result(version="2.0.0"))
+            registry.activate_version("pdf-toolkit", "1.0.0")
+
+        assert len(fsyncs) == 1
+        assert [
+            json.loads(line)["seq"] for line in journal.read_text().splitlines()
+        ] == [
+            1,
+            2,
+            3,
+        ]
+        registry._registries.clear()
+        assert registry.get_installed_versions("pdf-toolkit") == ["1.0.0", "2.0.0"]
@@ -0,0 +1,199 @@
+"""Tests for ayushman.registry_sqlite, used through ayushman.registry"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+
+import pytest
+from helpers import make_install_result
+
+import ayushman.registry as registry
+import ayushman.registry_sqlite as registry_sqlite
+
+
+@pytest.fixture
+def sqlite_registry(tmp_path, monkeypatch):
+    """Select the SQLite backend; returns the path of its database."""
+    monkeypatch.setenv(registry.BACKEND_ENV, "sqlite")
+    monkeypatch.setattr(registry, "REGISTRY_PATH", tmp_path / "metadata.json")
+    return tmp_path / "metadata.db"
+
+
+def _add_packages(json_path: str, prefix: str, count: int) -> None:
+    """Worker process: record `count` packages through the registry module."""
+    os.environ[registry.BACKEND_ENV] = "sqlite"
+    registry.REGISTRY_PATH = json_path
+    for i in range(count):
+        registry.add_package(make_install_result(package_name=f"{prefix}-{i}"))
+
+
+class TestBackendSelection:
+    def test_json_by_default(self, monkeypatch):
+        monkeypatch.delenv(registry.BACKEND_ENV, raising=False)
+        assert registry.get_backend() == registry.JSON_BACKEND
+
+    def test_sqlite_when_requested(self, monkeypatch):
+        monkeypatch.setenv(registry.BACKEND_ENV, "SQLite")
+        assert registry.get_backend() == registry.SQLITE_BACKEND
+
+    def test_unknown_value_falls_back_to_json(self, monkeypatch):
+        monkeypatch.setenv(registry.BACKEND_ENV, "postgres")
+        assert registry.get_backend() == registry.JSON_BACKEND
+
+
+class TestSqliteRegistry:
+    def test_uses_database_not_json(self, sqlite_registry, tmp_path):
+        registry.add_package(make_install_result())
+
+        assert sqlite_registry.exists()
+        assert not (tmp_path / "metadata.json").exists()
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+
+    def test_database_is_in_wal_mode(self, sqlite_registry):
+        registry.add_package(make_install_result())
+
+        with sqlite3.connect(sqlite_registry) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_same_behavior_as_json_registry(self, sqlite_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(package_name="occ"))
+        registry.add_package(
+            make_install_result(version="2.0.0", remote_sha256="ab" * 32)
+        )
+
+        assert registry.list_package() == [
+            "pdf-toolkit 2.0.0",
+            "pdf-toolkit 1.0.0",
+            "occ 1.0.0",
+        ]
+        assert registry.get_installed_versions("pdf-toolkit") == ["2.0.0", "1.0.0"]
+        assert registry.get_package_metadata("pdf-toolkit")["sha256"] == "ab" * 32
+        assert [p["name"] for p in registry.get_active_packages()] == [
+            "pdf-toolkit",
+            "occ",
+        ]
+        assert registry.get_many(["occ", "sweep"]) == {
+            "occ": registry.get_package_metadata("occ"),
+            "sweep": {},
+        }
+
+    def test_activate_and_remove(self, sqlite_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+
+        assert registry.activate_version("pdf-toolkit", "1.0.0") is True
+        assert registry.activate_version("pdf-toolkit", "3.0.0") is False
+        assert registry.get_installed_version("pdf-toolkit") == "1.0.0"
+
+        assert registry.remove_package("pdf-toolkit") is True
+        assert registry.remove_package("pdf-toolkit") is False
+        assert registry.is_package_installed("pdf-toolkit") is False
+
+    def test_bin_in_path_flag(self, sqlite_registry):
+        assert registry.get_bin_in_path() is False
+        registry.set_bin_in_path(True)
+        assert registry.get_bin_in_path() is True
+
+    def test_snapshot_matches_json_schema(self, sqlite_registry):
+        registry.add_package(make_install_result(version="1.0.0"))
+        registry.add_package(make_install_result(version="2.0.0"))
+        registry.set_bin_in_path(True)
+
+        view = registry.snapshot()
+
+        assert view.get("pdf-toolkit")["version"] == "2.0.0"
+        assert list(view.data["packages"]["pdf-toolkit"]["versions"]) == [
+            "1.0.0",
+            "2.0.0",
+        ]
+        assert view.bin_in_path() is True
+
+    def test_failed_transaction_is_rolled_back(self, sqlite_registry):
+        registry.add_package(make_install_result())
+        store = registry_sqlite.get_registry(sqlite_registry)
+
+        with pytest.raises(RuntimeError):
+            with store._transaction(write=True) as conn:
+                conn.execute("DELETE FROM versions")
+                raise RuntimeError("interrupted")
+
+        assert registry.is_package_installed("pdf-toolkit") is True
+
+
+class TestImportJson:
+    def test_json_registry_is_imported_once(self, sqlite_registry, tmp_path):
+        json_path = tmp_path / "metadata.json"
+        json_path.write_text(
+            json.dumps(
+                {
+                    "installed_packages": [
+                        {"name": "occ", "version": "2.0.0", "install_path": "o2"},
+                        {"name": "sweep", "version": "1.0.0", "install_path": "s1"},
+                        {"name": "occ", "version": "1.0.0", "install_path": "o1"},
+                    ],
+                    "bin_in_path": True,
+                }
+            )
+        )
+
+        assert registry.list_package() == ["occ 2.0.0", "occ 1.0.0", "sweep 1.0.0"]
+        assert registry.get_bin_in_path() is True
+
+        # Later changes to the JSON file are not imported again
+        registry.remove_package("occ")
+        registry_sqlite._registries.clear()
+        assert registry.list_package() == ["sweep 1.0.0"]
+
+    def test_no_json_registry_starts_empty(self, sqlite_registry, tmp_path):
+        assert registry.list_package() == []
+        assert not (tmp_path / "metadata.json").exists()
+
+
+class TestConcurrentWriters:
+    def test_threads_do_not_lose_updates(self, sqlite_registry):
+        def add(prefix: str) -> None:
+            for i in range(20):
+                registry.add_package(make_install_result(package_name=f"{prefix}-{i}"))
+
+        threads = [threading.Thread(target=add, args=(f"t{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(registry.list_package()) == 80
+
+    def test_processes_do_not_lose_updates(self, sqlite_registry, tmp_path):
+        registry.list_package()  # create the database before the workers start
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(
+                target=_add_packages,
+                args=(
+                    str(tmp_path / "metadata.json"),
+                    f"p{n}",
+                    15,
+                ),
+            )
+            for n in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            assert worker.exitcode == 0
+
+        assert len(registry.list_package()) == 45
+
+
+class TestTransaction:
+    def test_updates_inside_transaction(self, sqlite_registry):
+        with registry.transaction():
+            registry.add_package(make_install_result())
+            registry.set_bin_in_path(True)
+            assert registry.is_package_installed("pdf-toolkit") is True
+
+        assert registry.get_bin_in_path() is True
@@ -0,0 +1,174 @@
+"""Tests for ayushman.release_cache"""
+
+import json
+
+import pytest
+import requests
+
+import ayushman.http_client as http_client
+import ayushman.release_cache as release_cache
+import ayushman.request_url as request_url
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable clock for cache ages."""
+    now = {"t": 1_000_000.0}
+    monkeypatch.setattr(release_cache, "_now", lambda: now["t"])
+    return now
+
+
+@pytest.fixture
+def api(http_server, monkeypatch, tmp_path, clock):
+    monkeypatch.setattr(release_cache.global_paths, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(http_client, "BACKOFF_FACTOR", 0)
+    http_client.close_session()
+    yield http_server
+    http_client.close_session()
+
+
+def json_response(body, status=200, etag='"abc"'):
+    headers = {"Content-Type": "application/json"}
+    if etag:
+        headers["ETag"] = etag
+    return (status, headers, json.dumps(body).encode())
+
+
+def conditional_responder(body, etag='"abc"'):
+    """Answer 304 when If-None-Match matches, else 200 with an ETag."""
+
+    def respond(handler):
+        if handler.headers.get("If-None-Match") == etag:
+            handler._send(304, {"ETag": etag}, b"")
+        else:
+            status, headers, payload = json_response(body, etag=etag)
+            handler._send(status, headers, payload)
+
+    return respond
+
+
+class TestGetJson:
+    def test_first_call_fetches_and_stores(self, api, tmp_path):
+        api.routes["/r"] = [json_response({"tag_name": "v1"})]
+
+        data = release_cache.get_json(api.url("/r"), key="occ-latest")
+
+        assert data == {"tag_name": "v1"}
+        entry = json.loads(
+            (tmp_path / "cache" / "releases" / "occ-latest.json").read_text()
+        )
+        assert entry["etag"] == '"abc"'
+
+    def test_within_ttl_no_request_is_made(self, api, clock):
+        api.routes["/r"] = [json_response({"tag_name": "v1"})]
+        release_cache.get_json(api.url("/r"), key="occ-latest")
+        clock["t"] += release_cache.DEFAULT_TTL - 1
+
+        data = release_cache.get_json(api.url("/r"), key="occ-latest")
+
+        assert data == {"tag_name": "v1"}
+        assert len(api.requests) == 1
+
+    def test_after_ttl_request_is_conditional_and_304_is_served(self, api, clock):
+        api.routes["/r"] = [conditional_responder({"tag_name": "v1"})]
+        release_cache.get_json(api.url("/r"), key="occ-latest")
+        clock["t"] += release_cache.DEFAULT_TTL + 1
+
+        data = release_cache.get_json(api.url("/r"), key="occ-latest")
+
+        assert data == {"tag_name": "v1"}
+        assert api.requests[-1][2]["If-None-Match"] == '"abc"'
+
+    def test_304_refreshes_the_ttl(self, api, clock):
+        api.routes["/r"] = [conditional_responder({"tag_name": "v1"})]
+        release_cache.get_json(api.url("/r"), key="occ-latest")
+        clock["t"] += release_cache.DEFAULT_TTL + 1
+        release_cache.get_json(api.url("/r"), key="occ-latest")
+
+        release_cache.get_json(api.url("/r"), key="occ-latest")
+
+        assert len(api.requests) == 2
+
+    def test_changed_response_replaces_entry(self, api, clock):
+        api.routes["/r"] = [
+            json_response({"tag_name": "v1"}, etag='"one"'),
+            json_response({"tag_name": "v2"}, etag='"two"'),
+        ]
+        release_cache.get_json(api.url("/r"), key="occ-latest")
+        clock["t"] += release_cache.DEFAULT_TTL + 1
+
+        assert release_cache.get_json(api.url("/r"), key="occ-latest") == {
+            "tag_name": "v2"
+        }
+
+    def test_corrupt_entry_is_a_miss(self, api, tmp_path):
+        path = tmp_path / "cache" / "releases" / "occ-latest.json"
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json")
+        api.routes["/r"] = [json_response({"tag_name": "v1"})]
+
+        assert release_cache.get_json(api.url("/r"), key="occ-latest") == {
+            "tag_name": "v1"
+        }
+
+
+class TestNegativeCaching:
+    def test_404_is_cached_briefly(self, api, clock):
+        api.routes["/r"] = [json_response({"message": "Not Found"}, status=404)]
+
+        with pytest.raises(requests.HTTPError):
+            release_cache.get_json(api.url("/r"), key="nope-latest")
+        with pytest.raises(release_cache.CachedFailure, match="404"):
+            release_cache.get_json(api.url("/r"), key="nope-latest")
+
+        assert len(api.requests) == 1
+
+    def test_404_is_retried_after_negative_ttl(self, api, clock):
+        api.routes["/r"] = [
+            json_response({"message": "Not Found"}, status=404),
+            json_response({"tag_name": "v1"}),
+        ]
+        with pytest.raises(requests.HTTPError):
+            release_cache.get_json(api.url("/r"), key="occ-latest")
+        clock["t"] += release_cache.NEGATIVE_TTL + 1
+
+        assert release_cache.get_json(api.url("/r"), key="occ-latest") == {
+            "tag_name": "v1"
+        }
+
+    def test_server_errors_are_not_cached(self, api, monkeypatch):
+        monkeypatch.setattr(http_client, "MAX_RETRIES", 0)
+        http_client.close_session()
+        api.routes["/r"] = [
+            json_response({"message": "boom"}, status=500),
+            json_response({"tag_name": "v1"}),
+        ]
+        with pytest.raises(requests.HTTPError):
+            release_cache.get_json(api.url("/r"), key="occ-latest")
+
+        assert release_cache.get_json(api.url("/r"), key="occ-latest") == {
+            "tag_name": "v1"
+        }
+
+    def test_missing_zip_asset_is_cached(self, api, monkeypatch):
+        monkeypatch.setattr(request_url, "GITHUB_API_URL", api.url(""))
+        path = f"/repos/{request_url.constants.GITHUB_OWNER}/occ/releases/latest"
+        api.routes[path] = [json_response({"tag_name": "v1", "assets": []})]
+
+        first = request_url.resolve_release("occ")
+        second = request_url.resolve_release("occ")
+
+        assert first.error_message == "No zip asset found in latest release"
+        assert second.error_message == "No zip asset found in latest release"
+        assert len(api.requests) == 1
+
+
+def test_clear_removes_all_entries(api, tmp_path):
+    api.routes["/r"] = [json_response({"tag_name": "v1"})]
+    release_cache.get_json(api.url("/r"), key="occ-latest")
+
+    release_cache.clear()
+
+    assert not (tmp_path / "cache" / "releases").exists()
+    release_cache.get_json(api.url("/r"), key="occ-latest")
+    assert len(api.requests) == 2
@@ -0,0 +1,93 @@
+"""Tests for ayushman.release_index"""
+
+import pytest
+
+import ayushman.release_index as release_index
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(release_index.global_paths, "CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "cache"
+
+
+def release(tag, published_at="2025-01-01T00:00:00Z", **extra):
+    return {
+        "tag_name": tag,
+        "published_at": published_at,
+        "author": {"login": "someone", "id": 1},
+        "body": "release notes " * 100,
+        "assets": [
+            {"name": "notes.txt", "browser_download_url": "https://x/notes.txt"},
+            {
+                "name": "tool.zip",
+                "browser_download_url": "https://x/tool.zip",
+                "size": 10,
+                "digest": "sha256:abc",
+                "download_count": 5,
+            },
+        ],
+        **extra,
+    }
+
+
+class TestRecordAndLookup:
+    def test_keeps_only_what_installing_needs(self):
+        release_index.record("occ", [release("v1")])
+
+        assert release_index.lookup("occ", "v1") == {
+            "tag_name": "v1",
+            "published_at": "2025-01-01T00:00:00Z",
+            "author": {"login": "someone"},
+            "assets": [
+                {
+                    "name": "tool.zip",
+                    "browser_download_url": "https://x/tool.zip",
+                    "size": 10,
+                    "digest": "sha256:abc",
+                }
+            ],
+        }
+
+    def test_unknown_tag_or_package(self):
+        release_index.record("occ", [release("v1")])
+
+        assert release_index.lookup("occ", "v2") is None
+        assert release_index.lookup("sweep", "v1") is None
+
+    def test_records_merge_and_newer_data_wins(self):
+        release_index.record("occ", [release("v1"), release("v2")])
+        updated = release("v1")
+        updated["assets"][1]["digest"] = "sha256:def"
+        release_index.record("occ", [updated])
+
+        assert release_index.lookup("occ", "v1")["assets"][0]["digest"] == "sha256:def"
+        assert release_index.lookup("occ", "v2") is not None
+
+    def test_drafts_are_skipped(self):
+        release_index.record("occ", [release("v1", draft=True)])
+
+        assert release_index.lookup("occ", "v1") is None
+
+    def test_corrupt_index_reads_as_empty(self, isolated_cache):
+        path = isolated_cache / "releases" / "occ-index.json"
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json")
+
+        assert release_index.lookup("occ", "v1") is None
+        release_index.record("occ", [release("v1")])
+        assert release_index.lookup("occ", "v1") is not None
+
+
+class TestListTags:
+    def test_most_recent_first(self):
+        release_index.record(
+            "occ",
+            [
+                release("v1", "2024-01-01T00:00:00Z"),
+                release("v3", "2026-01-01T00:00:00Z"),
+                release("v2", "2025-01-01T00:00:00Z"),
+            ],
+        )
+
+        assert release_index.list_tags("occ") == ["v3", "v2", "v1"]
@@ -0,0 +1,175 @@
+"""Tests for ayushman.remote_zip"""
+
+import io
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import ayushman.extract_zip as extract_zip
+import ayushman.http_client as http_client
+import ayushman.remote_zip as remote_zip
+import ayushman.request_url as request_url
+from ayushman.result import InstallResult
+
+EXE = b"MZ" + bytes(range(256)) * 40
+DATA = os.urandom(2_000_000)
+
+
+def build_zip(stream: bool = False) -> bytes:
+    """A release-like archive: a large bundled payload and two executables."""
+    buffer = io.BytesIO()
+    # A non-seekable target makes zipfile write data descriptors
+    target = _Unseekable(buffer) if stream else buffer
+    with zipfile.ZipFile(target, "w") as zf:
+        zf.writestr("occ/README.md", b"docs " * 100, zipfile.ZIP_DEFLATED)
+        zf.writestr("occ/data/assets.bin", DATA, zipfile.ZIP_STORED)
+        zf.writestr("occ/bin/occ.exe", EXE, zipfile.ZIP_DEFLATED)
+        zf.writestr("occ/helper.EXE", EXE[::-1], zipfile.ZIP_STORED)
+    return buffer.getvalue()
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, inner: io.BytesIO) -> None:
+        self.inner = inner
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        return self.inner.write(b)
+
+
+@pytest.fixture
+def served(http_server):
+    http_client.close_session()
+    yield http_server
+    http_client.close_session()
+
+
+def serve(server, body: bytes, **kwargs) -> str:
+    server.routes["/asset.zip"] = [server.file_responder(body, **kwargs)]
+    return server.url("/asset.zip")
+
+
+class TestReadMembers:
+    def test_lists_every_member(self, served):
+        body = build_zip()
+        url = serve(served, body)
+
+        members, transferred = remote_zip.read_members(url, len(body))
+
+        assert [m.filename for m in members] == [
+            "occ/README.md",
+            "occ/data/assets.bin",
+            "occ/bin/occ.exe",
+            "occ/helper.EXE",
+        ]
+        assert transferred < 100_000
+        assert (
+            members[-1].end
+            == len(body) - sum(len(m.central_record) for m in members) - 22
+        )
+
+    def test_not_a_zip_raises(self, served):
+        url = serve(served, b"definitely not a zip file" * 100)
+
+        with pytest.raises(remote_zip.RemoteZipError):
+            remote_zip.read_members(url, 2_500)
+
+    def test_server_without_ranges_raises(self, served):
+        body = build_zip()
+        url = serve(served, body, honor_range=False)
+
+        with pytest.raises(remote_zip.RemoteZipError):
+            remote_zip.read_members(url, len(body))
+
+    def test_full_response_is_not_read(self, served, monkeypatch):
+        body = build_zip()
+        url = serve(served, body, honor_range=False)
+        get = http_client.get
+        responses = []
+
+        def tracking_get(*args, **kwargs):
+            response = get(*args, **kwargs)
+            responses.append(response)
+            return response
+
+        monkeypatch.setattr(http_client, "get", tracking_get)
+        with pytest.raises(remote_zip.RemoteZipError):
+            remote_zip.read_members(url, len(body))
+
+        assert len(responses) == 1
+        assert responses[0].status_code == 200
+        assert responses[0]._content_consumed is False
+        assert responses[0].raw.closed
+
+
+class TestFetchMembers:
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_fetches_only_executables(self, served, tmp_path, stream):
+        body = build_zip(stream=stream)
+        url = serve(served, body)
+        dest = tmp_path / "exe-only.zip"
+
+        transferred = remote_zip.fetch_members(
+            url, len(body), dest, select=extract_zip.is_executable
+        )
+
+        assert transferred < len(body) // 10
+        with zipfile.ZipFile(dest) as zf:
+            assert zf.namelist() == ["occ/bin/occ.exe", "occ/helper.EXE"]
+            assert zf.read("occ/bin/occ.exe") == EXE
+            assert zf.read("occ/helper.EXE") == EXE[::-1]
+
+    def test_crc_mismatch_raises_and_removes_output(self, served, tmp_path):
+        body = bytearray(build_zip())
+        # Flip a byte inside the stored helper.EXE data
+        at = body.index(EXE[::-1][:64]) + 10
+        body[at] ^= 0xFF
+        url = serve(served, bytes(body))
+        dest = tmp_path / "exe-only.zip"
+
+        with pytest.raises(remote_zip.RemoteZipError, match="CRC32"):
+            remote_zip.fetch_members(
+                url, len(body), dest, select=extract_zip.is_executable
+            )
+        assert not dest.exists()
+
+    def test_nothing_selected_gives_empty_zip(self, served, tmp_path):
+        body = build_zip()
+        url = serve(served, body)
+        dest = tmp_path / "none.zip"
+
+        remote_zip.fetch_members(url, len(body), dest, select=lambda name: False)
+
+        with zipfile.ZipFile(dest) as zf:
+            assert zf.namelist() == []
+
+
+class TestDownloadExecutables:
+    def test_sets_partial_fetch(self, served, monkeypatch, tmp_path):
+        monkeypatch.setattr(request_url.global_paths, "CACHE_DIR", tmp_path / "cache")
+        body = build_zip()
+        resolved = InstallResult(
+            package_name="occ",
+            version="v1",
+            zip_file_name="occ.zip",
+            install_path="",
+            success=True,
+            error_message=None,
+            metadata={},
+            metadata_path="",
+            asset_url=serve(served, body),
+            asset_size=len(body),
+        )
+
+        result = request_url.download_executables(resolved)
+
+        assert result.success is True
+        assert result.partial_fetch is True
+        assert result.hash_verified is False
+        zip_path = Path(result.zip_file_name)
+        assert zip_path.name == "occ.exe-only.zip"
+        assert zip_path.parent.parent == tmp_path / "cache" / "downloads"
@@ -0,0 +1,403 @@
+"""Tests for ayushman.request_url"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+import ayushman.constants as constants
+import ayushman.file_lock as file_lock
+import ayushman.http_client as http_client
+import ayushman.request_url as request_url
+from ayushman.result import InstallResult
+
+# ---------- Helpers ----------
+
+
+ASSET = b"PK fake zip payload " * 5_000
+ASSET_SHA256 = hashlib.sha256(ASSET).hexdigest()
+
+
+def release_json(server, digest: str | None = ASSET_SHA256, tag: str = "v1.0.0"):
+    asset = {
+        "name": "pdf-toolkit.zip",
+        "size": len(ASSET),
+        "browser_download_url": server.url("/download/pdf-toolkit.zip"),
+    }
+    if digest is not None:
+        asset["digest"] = f"sha256:{digest}"
+    return {
+        "tag_name": tag,
+        "published_at": "2025-01-01T00:00:00Z",
+        "author": {"login": "someone"},
+        "assets": [asset],
+    }
+
+
+def latest_path(package: str = "pdf-toolkit") -> str:
+    return f"/repos/{constants.GITHUB_OWNER}/{package}/releases/latest"
+
+
+@pytest.fixture
+def github(http_server, monkeypatch, tmp_path):
+    """Point request_url at the local server and download into tmp_path."""
+    monkeypatch.setattr(request_url, "GITHUB_API_URL", http_server.url(""))
+    monkeypatch.setattr(request_url.global_paths, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(http_client, "BACKOFF_FACTOR", 0)
+    # Small chunks so interrupted transfers leave some bytes on disk
+    monkeypatch.setattr(request_url, "DOWNLOAD_CHUNK_SIZE", 8192)
+    http_client.close_session()
+    http_server.routes["/download/pdf-toolkit.zip"] = [(200, {}, ASSET)]
+    yield http_server
+    http_client.close_session()
+
+
+def serve_release(server, body: dict, status: int = 200) -> None:
+    server.routes[latest_path()] = [
+        (status, {"Content-Type": "application/json"}, json.dumps(body).encode())
+    ]
+
+
+# ---------- resolve_release ----------
+
+
+class TestResolveRelease:
+    def test_reads_tag_asset_and_digest(self, github):
+        serve_release(github, release_json(github))
+
+        result = request_url.resolve_release("pdf-toolkit")
+
+        assert result.success is True
+        assert result.version == "v1.0.0"
+        assert result.zip_file_name == "pdf-toolkit.zip"
+        assert result.asset_url == github.url("/download/pdf-toolkit.zip")
+        assert result.asset_size == len(ASSET)
+        assert result.remote_sha256 == ASSET_SHA256
+
+    def test_does_not_download_the_asset(self, github):
+        serve_release(github, release_json(github))
+
+        request_url.resolve_release("pdf-toolkit")
+
+        assert [path for _, path, _ in github.requests] == [latest_path()]
+
+    def test_missing_zip_asset_is_a_failure(self, github):
+        body = release_json(github)
+        body["assets"] = []
+        serve_release(github, body)
+
+        result = request_url.resolve_release("pdf-toolkit")
+
+        assert result.success is False
+        assert result.error_message == "No zip asset found in latest release"
+
+    def test_http_error_is_a_failure(self, github):
+        serve_release(github, {"message": "Not Found"}, status=404)
+
+        result = request_url.resolve_release("pdf-toolkit")
+
+        assert result.success is False
+        assert "404" in result.error_message
+
+
+# ---------- pinned tags ----------
+
+
+def releases_path(page: int = 1, package: str = "pdf-toolkit") -> str:
+    return (
+        f"/repos/{constants.GITHUB_OWNER}/{package}/releases"
+        f"?per_page={request_url.RELEASES_PAGE_SIZE}&page={page}"
+    )
+
+
+def tag_path(tag: str, package: str = "pdf-toolkit") -> str:
+    return f"/repos/{constants.GITHUB_OWNER}/{package}/releases/tags/{tag}"
+
+
+def serve_json(server, path: str, body, status: int = 200) -> None:
+    server.routes[path] = [
+        (status, {"Content-Type": "application/json"}, json.dumps(body).encode())
+    ]
+
+
+class TestResolveTag:
+    def test_pinned_tag_resolves_from_release_listing(self, github):
+        serve_json(
+            github,
+            releases_path(),
+            [release_json(github, tag="v2.0.0"), release_json(github, tag="v1.0.0")],
+        )
+
+        result = request_url.resolve_release("pdf-toolkit", tag="v1.0.0")
+
+        assert result.success is True
+        assert result.version == "v1.0.0"
+        assert result.remote_sha256 == ASSET_SHA256
+        assert result.asset_url == github.url("/download/pdf-toolkit.zip")
+
+    def test_repeated_pins_make_no_request(self, github):
+        serve_json(
+            github,
+            releases_path(),
+            [release_json(github, tag="v2.0.0"), release_json(github, tag="v1.0.0")],
+        )
+        request_url.resolve_release("pdf-toolkit", tag="v1.0.0")
+        before = len(github.requests)
+
+        request_url.resolve_release("pdf-toolkit", tag="v1.0.0")
+        request_url.resolve_release("pdf-toolkit", tag="v2.0.0")
+
+        assert len(github.requests) == before
+        assert request_url.api_requests_needed(["pdf-toolkit@v2.0.0"]) == 0
+
+    def test_listing_follows_full_pages(self, github, monkeypatch):
+        monkeypatch.setattr(request_url, "RELEASES_PAGE_SIZE", 2)
+        serve_json(
+            github,
+            releases_path(1),
+            [release_json(github, tag="v3"), release_json(github, tag="v2")],
+        )
+        serve_json(github, releases_path(2), [release_json(github, tag="v1")])
+
+        result = request_url.resolve_release("pdf-toolkit", tag="v1")
+
+        assert result.success is True
+        assert request_url.release_index.list_tags("pdf-toolkit") == [
+            "v3",
+            "v2",
+            "v1",
+        ]
+
+    def test_unlisted_tag_falls_back_to_tags_endpoint(self, github):
+        serve_json(github, releases_path(), [])
+        serve_json(github, tag_path("v0.9"), release_json(github, tag="v0.9"))
+
+        result = request_url.resolve_release("pdf-toolkit", tag="v0.9")
+
+        assert result.success is True
+        assert github.requests[-1][1] == tag_path("v0.9")
+
+    def test_unknown_tag_is_a_failure(self, github):
+        serve_json(github, releases_path(), [release_json(github, tag="v1.0.0")])
+        serve_json(github, tag_path("v9"), {"message": "Not Found"}, status=404)
+
+        result = request_url.resolve_release("pdf-toolkit", tag="v9")
+
+        assert result.success is False
+        assert result.error_message == "pdf-toolkit has no release tagged v9"
+
+    def test_latest_is_recorded_in_the_index(self, github):
+        serve_release(github, release_json(github, tag="v1.0.0"))
+        request_url.resolve_release("pdf-toolkit", tag="latest")
+        before = len(github.requests)
+
+        result = request_url.resolve_release("pdf-toolkit", tag="v1.0.0")
+
+        assert result.success is True
+        assert len(github.requests) == before
+
+
+# ---------- download_asset ----------
+
+
+def asset_dir(server, package: str = "pdf-toolkit") -> Path:
+    return request_url._asset_dir(package, server.url("/download/pdf-toolkit.zip"))
+
+
+class TestDownloadAsset:
+    def test_hash_is_computed_while_streaming(self, github, monkeypatch, tmp_path):
+        serve_release(github, release_json(github))
+        resolved = request_url.resolve_release("pdf-toolkit")
+
+        def no_reread(*args, **kwargs):
+            raise AssertionError("downloaded file must not be re-read for hashing")
+
+        monkeypatch.setattr("ayushman.utils.get_sha256", no_reread)
+        result = request_url.download_asset(resolved)
+
+        assert result.success is True
+        assert result.local_sha256 == ASSET_SHA256
+        assert result.hash_verified is True
+        assert result.zip_file_name == str(asset_dir(github) / "pdf-toolkit.zip")
+        assert Path(result.zip_file_name).read_bytes() == ASSET
+
+    def test_mismatching_digest_is_not_verified(self, github):
+        serve_release(github, release_json(github, digest="0" * 64))
+        result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is True
+        assert result.local_sha256 == ASSET_SHA256
+        assert result.hash_verified is False
+
+    def test_download_error_is_a_failure(self, github):
+        serve_release(github, release_json(github))
+        github.routes["/download/pdf-toolkit.zip"] = [(404, {}, b"gone")]
+
+        result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is False
+        assert result.error_message.startswith("Failed to download ZIP")
+
+    def test_download_zip_skips_download_when_resolution_fails(self, github):
+        serve_release(github, {"message": "Not Found"}, status=404)
+
+        result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is False
+        assert all(not path.startswith("/download") for _, path, _ in github.requests)
+
+
+# ---------- Resumable downloads ----------
+
+
+class TestResumableDownload:
+    def test_interrupted_download_keeps_part_file(self, github, tmp_path):
+        serve_release(github, release_json(github))
+        github.routes["/download/pdf-toolkit.zip"] = [
+            github.file_responder(ASSET, etag='"v1"', truncate_after=30_000)
+        ]
+
+        result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is False
+        assert "partial download kept" in result.error_message
+        part = asset_dir(github) / "pdf-toolkit.zip.part"
+        assert part.read_bytes() == ASSET[: part.stat().st_size]
+        state = json.loads(
+            (asset_dir(github) / "pdf-toolkit.zip.part.json").read_text()
+        )
+        assert state == {
+            "url": github.url("/download/pdf-toolkit.zip"),
+            "size": len(ASSET),
+            "etag": '"v1"',
+        }
+
+    def test_next_attempt_resumes_with_range(self, github, tmp_path):
+        serve_release(github, release_json(github))
+        github.routes["/download/pdf-toolkit.zip"] = [
+            github.file_responder(ASSET, etag='"v1"', truncate_after=30_000),
+            github.file_responder(ASSET, etag='"v1"'),
+        ]
+        request_url.download_zip("pdf-toolkit")
+        kept = (asset_dir(github) / "pdf-toolkit.zip.part").stat().st_size
+
+        result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is True
+        assert result.hash_verified is True
+        asset_requests = [h for _, p, h in github.requests if p.startswith("/download")]
+        assert asset_requests[-1]["Range"] == f"bytes={kept}-"
+        assert asset_requests[-1]["If-Range"] == '"v1"'
+        assert not (asset_dir(github) / "pdf-toolkit.zip.part").exists()
+        assert not (asset_dir(github) / "pdf-toolkit.zip.part.json").exists()
+
+    def test_changed_etag_restarts_from_zero(self, github, tmp_path):
+        serve_release(github, release_json(github))
+        github.routes["/download/pdf-toolkit.zip"] = [
+            github.file_responder(b"stale" * 10_000, etag='"old"', truncate_after=100),
+            github.file_responder(ASSET, etag='"new"'),
+        ]
+        request_url.download_zip("pdf-toolkit")
+
+        result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is True
+        assert result.hash_verified is True
+        assert Path(result.zip_file_name).read_bytes() == ASSET
+
+    def test_server_without_range_support_restarts_from_zero(self, github, tmp_path):
+        serve_release(github, release_json(github))
+        github.routes["/download/pdf-toolkit.zip"] = [
+            github.file_responder(ASSET, honor_range=False, truncate_after=30_000),
+            github.file_responder(ASSET, honor_range=False),
+        ]
+        request_url.download_zip("pdf-toolkit")
+
+        result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is True
+        assert result.hash_verified is True
+
+    def test_part_for_a_different_asset_is_discarded(self, github, tmp_path):
+        serve_release(github, release_json(github))
+        asset_dir(github).mkdir(parents=True)
+        (asset_dir(github) / "pdf-toolkit.zip.part").write_bytes(b"old bytes")
+        (asset_dir(github) / "pdf-toolkit.zip.part.json").write_text(
+            json.dumps({"url": "https://elsewhere.invalid", "size": 9, "etag": None})
+        )
+
+        result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is True
+        assert result.hash_verified is True
+        asset_requests = [h for _, p, h in github.requests if p.startswith("/download")]
+        assert "Range" not in asset_requests[-1]
+
+
+class TestConcurrentDownloads:
+    def test_assets_with_the_same_name_do_not_share_a_part_file(self):
+        url = "https://example.invalid/download/windows-x64.zip"
+
+        assert request_url._asset_dir("occ", url) != request_url._asset_dir(
+            "sweep", url
+        )
+        assert request_url._asset_dir("occ", url) != request_url._asset_dir(
+            "occ", url.replace("download", "v2")
+        )
+
+    def test_part_file_locked_elsewhere_is_left_alone(self, github, tmp_path):
+        serve_release(github, release_json(github))
+        asset_dir(github).mkdir(parents=True)
+        part = asset_dir(github) / "pdf-toolkit.zip.part"
+        part.write_bytes(ASSET[:1000])
+        (asset_dir(github) / "pdf-toolkit.zip.part.json").write_text(
+            json.dumps(
+                {
+                    "url": github.url("/download/pdf-toolkit.zip"),
+                    "size": len(ASSET),
+                    "etag": None,
+                }
+            )
+        )
+
+        with file_lock.FileLock(asset_dir(github) / "pdf-toolkit.zip.lock"):
+            result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is True
+        assert result.hash_verified is True
+        assert Path(result.zip_file_name).parent != asset_dir(github)
+        assert part.read_bytes() == ASSET[:1000]
+        asset_requests = [h for _, p, h in github.requests if p.startswith("/download")]
+        assert "Range" not in asset_requests[-1]
+
+    def test_failed_private_download_leaves_nothing_behind(self, github, tmp_path):
+        serve_release(github, release_json(github))
+        github.routes["/download/pdf-toolkit.zip"] = [(404, {}, b"gone")]
+        asset_dir(github).mkdir(parents=True)
+
+        with file_lock.FileLock(asset_dir(github) / "pdf-toolkit.zip.lock"):
+            result = request_url.download_zip("pdf-toolkit")
+
+        assert result.success is False
+        assert "partial download kept" not in result.error_message
+        assert [p.name for p in (tmp_path / "cache" / "downloads").iterdir()] == [
+            asset_dir(github).name
+        ]
+
+
+def test_install_result_accepts_asset_fields():
+    result = InstallResult(
+        package_name="x",
+        version="1",
+        zip_file_name="x.zip",
+        install_path="",
+        success=True,
+        error_message=None,
+        metadata={},
+        metadata_path="",
+        asset_url="https://example.invalid/x.zip",
+        asset_size=10,
+    )
+    assert result.asset_url == "https://example.invalid/x.zip"
+    assert result.asset_size == 10
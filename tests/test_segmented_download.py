@@ -0,0 +1,159 @@
+"""Tests for ayushman.segmented_download"""
+
+import hashlib
+
+import pytest
+
+import ayushman.http_client as http_client
+import ayushman.request_url as request_url
+import ayushman.segmented_download as segmented_download
+from ayushman.result import InstallResult
+
+ASSET = bytes(range(256)) * 4_000  # 1,024,000 bytes
+ASSET_SHA256 = hashlib.sha256(ASSET).hexdigest()
+
+
+@pytest.fixture
+def small_segments(monkeypatch):
+    """Allow many small segments so tests stay fast."""
+    monkeypatch.setattr(segmented_download, "MIN_SEGMENT_SIZE", 1024)
+    monkeypatch.setattr(http_client, "BACKOFF_FACTOR", 0)
+    http_client.close_session()
+    yield
+    http_client.close_session()
+
+
+def range_requests(server) -> list[str]:
+    return [h.get("Range") for _, p, h in server.requests if p == "/asset.zip"]
+
+
+class TestSplitRanges:
+    def test_ranges_cover_every_byte_once(self, small_segments):
+        ranges = segmented_download.split_ranges(10_001, 4)
+
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == 10_000
+        for (_, last), (first, _) in zip(ranges, ranges[1:], strict=False):
+            assert first == last + 1
+
+    def test_segment_count_is_capped_by_minimum_size(self, monkeypatch):
+        monkeypatch.setattr(segmented_download, "MIN_SEGMENT_SIZE", 1000)
+        assert len(segmented_download.split_ranges(2_500, 8)) == 2
+
+    def test_small_file_is_one_range(self, monkeypatch):
+        monkeypatch.setattr(segmented_download, "MIN_SEGMENT_SIZE", 1000)
+        assert segmented_download.split_ranges(10, 4) == [(0, 9)]
+
+    def test_empty_file_has_no_ranges(self):
+        assert segmented_download.split_ranges(0, 4) == []
+
+
+class TestDownloadSegmented:
+    def test_reassembles_file_and_hash(self, http_server, small_segments, tmp_path):
+        http_server.routes["/asset.zip"] = [http_server.file_responder(ASSET)]
+        dest = tmp_path / "asset.zip"
+
+        digest = segmented_download.download_segmented(
+            http_server.url("/asset.zip"), dest, len(ASSET), segments=4
+        )
+
+        assert dest.read_bytes() == ASSET
+        assert digest == ASSET_SHA256
+        assert len(range_requests(http_server)) == 4
+        assert all(r is not None for r in range_requests(http_server))
+
+    def test_server_ignoring_range_raises(self, http_server, small_segments, tmp_path):
+        http_server.routes["/asset.zip"] = [
+            http_server.file_responder(ASSET, honor_range=False)
+        ]
+
+        with pytest.raises(segmented_download.RangeNotSupportedError):
+            segmented_download.download_segmented(
+                http_server.url("/asset.zip"), tmp_path / "a.zip", len(ASSET), 4
+            )
+
+
+class TestDownloadAssetIntegration:
+    def make_resolved(self, server, tmp_path) -> InstallResult:
+        return InstallResult(
+            package_name="occ",
+            version="v1",
+            zip_file_name="asset.zip",
+            install_path="",
+            success=True,
+            error_message=None,
+            metadata={},
+            metadata_path="",
+            remote_sha256=ASSET_SHA256,
+            asset_url=server.url("/asset.zip"),
+            asset_size=len(ASSET),
+        )
+
+    @pytest.fixture
+    def downloads(self, small_segments, monkeypatch, tmp_path):
+        monkeypatch.setattr(request_url.global_paths, "CACHE_DIR", tmp_path / "cache")
+        monkeypatch.setattr(segmented_download, "SEGMENT_THRESHOLD", 1024)
+
+    def test_large_asset_uses_segments(self, http_server, downloads, tmp_path):
+        http_server.routes["/asset.zip"] = [http_server.file_responder(ASSET)]
+
+        result = request_url.download_asset(
+            self.make_resolved(http_server, tmp_path), segments=3
+        )
+
+        assert result.success is True
+        assert result.hash_verified is True
+        assert len(range_requests(http_server)) == 3
+
+    def test_falls_back_to_single_stream_without_range(
+        self, http_server, downloads, tmp_path
+    ):
+        http_server.routes["/asset.zip"] = [
+            http_server.file_responder(ASSET, honor_range=False)
+        ]
+
+        result = request_url.download_asset(
+            self.make_resolved(http_server, tmp_path), segments=3
+        )
+
+        assert result.success is True
+        assert result.hash_verified is True
+        assert range_requests(http_server)[-1] is None
+
+    def test_segments_of_one_never_sends_ranges(self, http_server, downloads, tmp_path):
+        http_server.routes["/asset.zip"] = [http_server.file_responder(ASSET)]
+
+        result = request_url.download_asset(self.make_resolved(http_server, tmp_path))
+
+        assert result.success is True
+        assert range_requests(http_server) == [None]
+
+    def test_short_segment_is_a_download_failure(
+        self, http_server, downloads, tmp_path, monkeypatch
+    ):
+        class ShortResponse:
+            status_code = 206
+
+            def __init__(self, first, last):
+                self.headers = {"Content-Range": f"bytes {first}-{last}/{len(ASSET)}"}
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def iter_content(self, chunk_size):
+                yield b"x" * 10  # connection closed early
+
+        def get(url, stream=False, headers=None):
+            first, last = headers["Range"][len("bytes=") :].split("-")
+            return ShortResponse(int(first), int(last))
+
+        monkeypatch.setattr(segmented_download.http_client, "get", get)
+        result = request_url.download_asset(
+            self.make_resolved(http_server, tmp_path), segments=3
+        )
+
+        assert result.success is False
+        assert "incomplete" in result.error_message
@@ -0,0 +1,213 @@
+"""Tests for ayushman.stream_unzip"""
+
+import io
+import os
+import zipfile
+import zlib
+
+import pytest
+
+import ayushman.extract_zip as extract_zip
+import ayushman.http_client as http_client
+import ayushman.request_url as request_url
+import ayushman.stream_unzip as stream_unzip
+from ayushman.result import InstallResult
+
+EXE = b"MZ" + bytes(range(256)) * 200
+HELPER = os.urandom(20_000)
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, inner: io.BytesIO) -> None:
+        self.inner = inner
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        return self.inner.write(b)
+
+
+def build_zip(stream: bool = False, stored=zipfile.ZIP_STORED) -> bytes:
+    buffer = io.BytesIO()
+    # A non-seekable target makes zipfile write data descriptors
+    target = _Unseekable(buffer) if stream else buffer
+    with zipfile.ZipFile(target, "w") as zf:
+        zf.writestr("pkg/README.md", b"docs " * 200, zipfile.ZIP_DEFLATED)
+        zf.writestr("pkg/data.bin", os.urandom(50_000), stored)
+        zf.writestr("pkg/bin/tool.exe", EXE, zipfile.ZIP_DEFLATED)
+        zf.writestr("pkg/helper.EXE", HELPER, stored)
+    return buffer.getvalue()
+
+
+def feed_in_chunks(extractor, data: bytes, size: int) -> None:
+    for start in range(0, len(data), size):
+        extractor.feed(data[start : start + size])
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    return stream_unzip.StreamExtractor(
+        tmp_path / "staging", select=extract_zip.is_executable
+    )
+
+
+class TestStreamExtractor:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096, 1 << 20])
+    def test_stages_executables_from_any_chunking(self, extractor, chunk_size):
+        feed_in_chunks(extractor, build_zip(), chunk_size)
+
+        staged = extractor.staged
+        assert sorted(staged) == ["pkg/bin/tool.exe", "pkg/helper.EXE"]
+        assert staged["pkg/bin/tool.exe"].path.read_bytes() == EXE
+        assert staged["pkg/bin/tool.exe"].crc == zlib.crc32(EXE)
+        assert staged["pkg/helper.EXE"].path.read_bytes() == HELPER
+        assert staged["pkg/helper.EXE"].size == len(HELPER)
+
+    def test_deflated_members_with_data_descriptors(self, extractor):
+        body = build_zip(stream=True, stored=zipfile.ZIP_DEFLATED)
+        feed_in_chunks(extractor, body, 1000)
+
+        assert extractor.active is True
+        assert extractor.staged["pkg/helper.EXE"].path.read_bytes() == HELPER
+
+    def test_stored_member_with_data_descriptor_gives_up(self, extractor):
+        feed_in_chunks(extractor, build_zip(stream=True), 1000)
+
+        assert extractor.active is False
+        assert extractor.staged == {}
+
+    def test_garbage_gives_up_without_raising(self, extractor):
+        extractor.feed(b"<html>not a zip</html>")
+
+        assert extractor.active is False
+
+    def test_corrupt_member_gives_up(self, extractor):
+        body = bytearray(build_zip())
+        body[body.index(HELPER[:64]) + 10] ^= 0xFF
+        feed_in_chunks(extractor, bytes(body), 4096)
+
+        assert extractor.active is False
+
+    def test_reset_starts_over(self, extractor):
+        body = build_zip()
+        extractor.feed(body[:5000])
+        extractor.reset()
+        feed_in_chunks(extractor, body, 4096)
+
+        assert sorted(extractor.staged) == ["pkg/bin/tool.exe", "pkg/helper.EXE"]
+
+
+# ---------- extract_zip integration ----------
+
+
+@pytest.fixture
+def isolated_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_zip.global_paths, "PACKAGE_DIR", tmp_path / "packages")
+    monkeypatch.setattr(extract_zip.global_paths, "BIN_DIR", tmp_path / "bin")
+    monkeypatch.setattr(extract_zip.global_paths, "OBJECTS_DIR", tmp_path / "objects")
+    return tmp_path / "packages" / "tool" / "1.0.0"
+
+
+def staged_install_result(zip_path, staged) -> InstallResult:
+    return InstallResult(
+        package_name="tool",
+        version="1.0.0",
+        zip_file_name=str(zip_path),
+        install_path="",
+        success=True,
+        error_message=None,
+        metadata={},
+        metadata_path="",
+        staged_files=staged,
+    )
+
+
+class TestExtractStaged:
+    def test_staged_members_are_moved_not_extracted(
+        self, tmp_path, extractor, isolated_paths, monkeypatch
+    ):
+        body = build_zip()
+        zip_path = tmp_path / "pkg.zip"
+        zip_path.write_bytes(body)
+        feed_in_chunks(extractor, body, 4096)
+
+        def no_extract(*args, **kwargs):
+            raise AssertionError("staged members must not be extracted again")
+
+        monkeypatch.setattr(extract_zip, "_extract_member", no_extract)
+        result = extract_zip.extract_zip_file(
+            staged_install_result(zip_path, extractor.staged)
+        )
+
+        assert result.success is True
+        assert (isolated_paths / "tool.exe").read_bytes() == EXE
+        assert (isolated_paths / "helper.EXE").read_bytes() == HELPER
+
+    def test_member_disagreeing_with_central_directory_is_extracted(
+        self, tmp_path, extractor, isolated_paths
+    ):
+        body = build_zip()
+        zip_path = tmp_path / "pkg.zip"
+        zip_path.write_bytes(body)
+        feed_in_chunks(extractor, body, 4096)
+        staged = extractor.staged
+        staged["pkg/bin/tool.exe"].crc ^= 1
+
+        result = extract_zip.extract_zip_file(staged_install_result(zip_path, staged))
+
+        assert result.success is True
+        assert (isolated_paths / "tool.exe").read_bytes() == EXE
+
+
+# ---------- download_asset integration ----------
+
+
+class TestDownloadWhileExtracting:
+    @pytest.fixture
+    def resolved(self, http_server, monkeypatch, tmp_path):
+        monkeypatch.setattr(request_url.global_paths, "CACHE_DIR", tmp_path / "cache")
+        monkeypatch.setattr(request_url, "DOWNLOAD_CHUNK_SIZE", 8192)
+        monkeypatch.setattr(http_client, "BACKOFF_FACTOR", 0)
+        http_client.close_session()
+        body = build_zip()
+        yield (
+            http_server,
+            body,
+            InstallResult(
+                package_name="tool",
+                version="1.0.0",
+                zip_file_name="tool.zip",
+                install_path="",
+                success=True,
+                error_message=None,
+                metadata={},
+                metadata_path="",
+                asset_url=http_server.url("/tool.zip"),
+                asset_size=len(body),
+            ),
+        )
+        http_client.close_session()
+
+    def test_members_are_staged_during_download(self, resolved, extractor):
+        server, body, install_result = resolved
+        server.routes["/tool.zip"] = [server.file_responder(body)]
+
+        result = request_url.download_asset(install_result, extractor=extractor)
+
+        assert result.success is True
+        assert sorted(extractor.staged) == ["pkg/bin/tool.exe", "pkg/helper.EXE"]
+
+    def test_resumed_download_replays_kept_bytes(self, resolved, extractor):
+        server, body, install_result = resolved
+        server.routes["/tool.zip"] = [
+            server.file_responder(body, etag='"v1"', truncate_after=40_000),
+            server.file_responder(body, etag='"v1"'),
+        ]
+        request_url.download_asset(install_result, extractor=extractor)
+
+        result = request_url.download_asset(install_result, extractor=extractor)
+
+        assert result.success is True
+        assert server.requests[-1][2]["Range"].startswith("bytes=")
+        assert extractor.staged["pkg/bin/tool.exe"].path.read_bytes() == EXE
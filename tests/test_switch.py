@@ -0,0 +1,163 @@
+"""Tests for ayushman.switch"""
+
+import zipfile
+
+import pytest
+
+import ayushman.extract_zip as extract_zip
+import ayushman.registry as registry
+import ayushman.switch as switch
+from ayushman.result import InstallResult
+
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(switch.global_paths, "PACKAGE_DIR", tmp_path / "packages")
+    monkeypatch.setattr(switch.global_paths, "BIN_DIR", tmp_path / "bin")
+    monkeypatch.setattr(switch.global_paths, "OBJECTS_DIR", tmp_path / "objects")
+    monkeypatch.setattr(registry, "REGISTRY_PATH", tmp_path / "metadata.json")
+    return tmp_path
+
+
+def install(tmp_path, version, entries, package_name="occ"):
+    """Extract and register a version the way install_package does."""
+    zip_path = tmp_path / f"{package_name}-{version}.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for name, content in entries.items():
+            zf.writestr(name, content)
+    install_result = extract_zip.extract_zip_file(
+        InstallResult(
+            package_name=package_name,
+            version=version,
+            zip_file_name=str(zip_path),
+            install_path="",
+            success=False,
+            error_message=None,
+            metadata={"version": version},
+            metadata_path="",
+        )
+    )
+    assert install_result.success
+    registry.add_package(install_result)
+
+
+def bin_exe(tmp_path, package_name="occ"):
+    return tmp_path / "bin" / f"{package_name}.exe"
+
+
+class TestUseVersion:
+    def test_switches_bin_and_registry(self, isolated):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+        install(isolated, "2.0.0", {"occ.exe": b"two"})
+
+        result = switch.use_version("occ", "1.0.0")
+
+        assert result.success is True
+        assert result.previous_version == "2.0.0"
+        assert result.metadata == {"version": "1.0.0"}
+        assert bin_exe(isolated).read_bytes() == b"one"
+        assert registry.get_installed_version("occ") == "1.0.0"
+
+    def test_links_last_executable_in_archive_order(self, isolated):
+        install(isolated, "1.0.0", {"z.exe": b"z1", "a.exe": b"a1"})
+        install(isolated, "2.0.0", {"z.exe": b"z2", "a.exe": b"a2"})
+
+        switch.use_version("occ", "1.0.0")
+
+        assert bin_exe(isolated).read_bytes() == b"a1"
+
+    def test_active_version_is_reported_up_to_date(self, isolated):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+
+        result = switch.use_version("occ", "1.0.0")
+
+        assert result.success is True
+        assert result.up_to_date is True
+
+    def test_missing_version_fails_without_changes(self, isolated):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+
+        result = switch.use_version("occ", "0.9.0")
+
+        assert result.success is False
+        assert "not installed" in result.error_message
+        assert bin_exe(isolated).read_bytes() == b"one"
+
+    def test_path_like_version_is_rejected(self, isolated):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+
+        result = switch.use_version("occ", "../occ")
+
+        assert result.success is False
+        assert "invalid version" in result.error_message
+
+    @pytest.mark.parametrize("package_name", ["../packages/occ", "..", ""])
+    def test_path_like_package_name_is_rejected(self, isolated, package_name):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+        before = sorted(p.relative_to(isolated) for p in isolated.rglob("*"))
+
+        result = switch.use_version(package_name, "1.0.0")
+
+        assert result.success is False
+        assert "invalid package name" in result.error_message
+        assert sorted(p.relative_to(isolated) for p in isolated.rglob("*")) == before
+        assert registry.list_package() == ["occ 1.0.0"]
+
+    def test_unregistered_folder_is_recorded(self, isolated):
+        folder = isolated / "packages" / "occ" / "0.1.0"
+        folder.mkdir(parents=True)
+        (folder / "occ.exe").write_bytes(b"old")
+
+        result = switch.use_version("occ", "0.1.0")
+
+        assert result.success is True
+        assert bin_exe(isolated).read_bytes() == b"old"
+        assert registry.get_installed_version("occ") == "0.1.0"
+
+
+class TestRollback:
+    def test_returns_to_previous_version(self, isolated):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+        install(isolated, "2.0.0", {"occ.exe": b"two"})
+
+        result = switch.rollback("occ")
+
+        assert result.success is True
+        assert result.version == "1.0.0"
+        assert bin_exe(isolated).read_bytes() == b"one"
+
+    def test_rolling_back_twice_undoes_the_rollback(self, isolated):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+        install(isolated, "2.0.0", {"occ.exe": b"two"})
+
+        switch.rollback("occ")
+        result = switch.rollback("occ")
+
+        assert result.version == "2.0.0"
+        assert bin_exe(isolated).read_bytes() == b"two"
+
+    def test_skips_versions_no_longer_on_disk(self, isolated):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+        install(isolated, "2.0.0", {"occ.exe": b"two"})
+        install(isolated, "3.0.0", {"occ.exe": b"three"})
+        for f in (isolated / "packages" / "occ" / "2.0.0").iterdir():
+            f.unlink()
+        (isolated / "packages" / "occ" / "2.0.0").rmdir()
+
+        result = switch.rollback("occ")
+
+        assert result.version == "1.0.0"
+
+    def test_nothing_to_roll_back_to(self, isolated):
+        install(isolated, "1.0.0", {"occ.exe": b"one"})
+
+        result = switch.rollback("occ")
+
+        assert result.success is False
+        assert "no earlier version" in result.error_message
+
+    def test_not_installed(self, isolated):
+        result = switch.rollback("occ")
+
+        assert result.success is False
+        assert "not installed" in result.error_message
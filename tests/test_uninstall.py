@@ -1,7 +1,11 @@
 """Tests for ayushman.uninstall.uninstall_package"""
 
+import json
+import os
+
 import pytest
 
+import ayushman.object_store as object_store
 import ayushman.uninstall as uninstall
 
 
@@ -13,6 +17,7 @@ def isolated_paths(tmp_path, monkeypatch):
     bin_dir.mkdir()
     monkeypatch.setattr(uninstall.global_paths, "PACKAGE_DIR", package_dir)
     monkeypatch.setattr(uninstall.global_paths, "BIN_DIR", bin_dir)
+    monkeypatch.setattr(uninstall.global_paths, "OBJECTS_DIR", tmp_path / "objects")
     return package_dir, bin_dir
 
 
@@ -88,6 +93,56 @@ class TestUninstallExistingPackage:
         assert (package_dir / "cpp-cloc").exists()
 
 
+class TestStoredExecutables:
+    def install(self, package_dir, bin_dir, package_name, content, exe_name=None):
+        """Install one version whose executable lives in the object store."""
+        folder = package_dir / package_name / "1.0.0"
+        folder.mkdir(parents=True)
+        exe_path = folder / (exe_name or f"{package_name}.exe")
+        exe_path.write_bytes(content)
+        sha256 = object_store.add(exe_path, 0, len(content))
+        (folder / "manifest.json").write_text(
+            json.dumps({"files": {exe_path.name: {"sha256": sha256}}})
+        )
+        os.link(exe_path, bin_dir / f"{package_name}.exe")
+        return object_store.object_path(sha256)
+
+    def test_unused_executables_are_freed(self, isolated_paths):
+        package_dir, bin_dir = isolated_paths
+        stored = self.install(package_dir, bin_dir, "pdf-toolkit", b"binary")
+
+        result = uninstall.uninstall_package("pdf-toolkit")
+
+        assert result.freed_bytes == len(b"binary")
+        assert not stored.exists()
+
+    def test_bin_link_is_named_after_the_package(self, isolated_paths):
+        package_dir, bin_dir = isolated_paths
+        stored = self.install(
+            package_dir, bin_dir, "pdf-toolkit", b"binary", exe_name="tool.exe"
+        )
+        # Another package's entry that happens to share the executable's name
+        (bin_dir / "tool.exe").write_bytes(b"other")
+
+        result = uninstall.uninstall_package("pdf-toolkit")
+
+        assert result.removed_bins == [str(bin_dir / "pdf-toolkit.exe")]
+        assert result.freed_bytes == len(b"binary")
+        assert not stored.exists()
+        assert (bin_dir / "tool.exe").read_bytes() == b"other"
+
+    def test_executables_used_elsewhere_are_kept(self, isolated_paths):
+        package_dir, bin_dir = isolated_paths
+        stored = self.install(package_dir, bin_dir, "pdf-toolkit", b"shared")
+        self.install(package_dir, bin_dir, "cpp-cloc", b"shared")
+
+        result = uninstall.uninstall_package("pdf-toolkit")
+
+        assert result.freed_bytes == 0
+        assert stored.exists()
+        assert (bin_dir / "cpp-cloc.exe").read_bytes() == b"shared"
+
+
 class TestUninstallFailureMode:
     def test_failure_during_folder_removal_sets_error_message(
         self, isolated_paths, monkeypatch
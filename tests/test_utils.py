@@ -1,10 +1,11 @@
-"""Tests for ayushman.utils.get_sha256"""
+"""Tests for ayushman.utils"""
 
 import hashlib
+import json
 
 import pytest
 
-from ayushman.utils import get_sha256
+from ayushman.utils import format_size, get_sha256, split_spec, write_json
 
 
 class TestGetSha256:
@@ -17,10 +18,10 @@ class TestGetSha256:
         assert get_sha256(str(file_path)) == expected
 
     def test_matches_hashlib_for_file_larger_than_chunk_size(self, tmp_path):
-        # get_sha256 reads in 4096-byte chunks; use a file larger than that
-        # to make sure the chunked read loop covers multiple iterations.
+        # Use a file larger than the read buffer to make sure the chunked
+        # read loop covers multiple iterations.
         file_path = tmp_path / "large.bin"
-        content = b"x" * 10_000 + b"y" * 5_000
+        content = b"x" * 1_500_000 + b"y" * 700_000
         file_path.write_bytes(content)
 
         expected = hashlib.sha256(content).hexdigest()
@@ -41,7 +42,71 @@ class TestGetSha256:
 
         assert get_sha256(str(file_a)) != get_sha256(str(file_b))
 
+    def test_fallback_without_file_digest_matches_hashlib(self, tmp_path, monkeypatch):
+        file_path = tmp_path / "large.bin"
+        content = b"z" * 2_500_000
+        file_path.write_bytes(content)
+        monkeypatch.delattr(hashlib, "file_digest", raising=False)
+
+        expected = hashlib.sha256(content).hexdigest()
+        assert get_sha256(str(file_path)) == expected
+
     def test_raises_for_missing_file(self, tmp_path):
         missing = tmp_path / "does_not_exist.bin"
         with pytest.raises(FileNotFoundError):
             get_sha256(str(missing))
+
+
+class TestFormatSize:
+    @pytest.mark.parametrize(
+        "num_bytes, expected",
+        [
+            (0, "0 B"),
+            (1023, "1023 B"),
+            (1024, "1.0 KiB"),
+            (512 * 1024 * 1024, "512.0 MiB"),
+            (3 * 1024**4, "3072.0 GiB"),
+        ],
+    )
+    def test_formats_binary_units(self, num_bytes, expected):
+        assert format_size(num_bytes) == expected
+
+
+class TestSplitSpec:
+    @pytest.mark.parametrize(
+        "spec, expected",
+        [
+            ("occ", ("occ", None)),
+            ("OCC@v1.2.0", ("occ", "v1.2.0")),
+            ("occ@", ("occ", None)),
+            (" occ @ 1.0 ", ("occ", "1.0")),
+        ],
+    )
+    def test_splits_name_and_version(self, spec, expected):
+        assert split_spec(spec) == expected
+
+
+class TestWriteJson:
+    def test_replaces_file(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text("old")
+
+        write_json(path, {"a": 1})
+
+        assert json.loads(path.read_text()) == {"a": 1}
+        assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text('{"a": 1}')
+
+        with pytest.raises(TypeError):
+            write_json(path, {"a": object()})
+
+        assert path.read_text() == '{"a": 1}'
+        assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+    def test_indent_none_writes_one_line(self, tmp_path):
+        path = tmp_path / "data.json"
+        write_json(path, {"a": [1, 2]}, indent=None)
+        assert path.read_text() == '{"a": [1, 2]}'